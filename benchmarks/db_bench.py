@@ -0,0 +1,202 @@
+"""Замеры функций utils.database на синтетическом наборе данных.
+
+Каждая функция вызывается --repeat раз со случайными аргументами; подготовка аргументов
+(например, вставка новости для approve_news) в замер не входит. Кэши модуля сбрасываются
+перед каждым вызовом, чтобы мерить именно базу. Результат — JSON, который можно сравнить
+с предыдущим прогоном через --baseline.
+
+    python -m benchmarks.seed --scale 0.05 --db /tmp/bench.db
+    python -m benchmarks.db_bench --db /tmp/bench.db --output after.json --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark utils.database functions on a synthetic dataset")
+    parser.add_argument("--scale", type=float, default=0.01, help="dataset size as a fraction of the full size")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per function")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="comma-separated function names to run")
+    parser.add_argument("--db", help="SQLite file to use (reused if already seeded; a temporary file by default)")
+    parser.add_argument("--output", help="where to write the JSON report (db_bench.json in a temporary directory by default)")
+    parser.add_argument("--baseline", help="previous report to compare p50/p99 against")
+    return parser.parse_args()
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def build_cases(rng: random.Random, sizes: dict, ids: dict) -> list:
+    """(имя, функция, async-фабрика аргументов). Сначала чтение, затем запись."""
+    from config.config import CATEGORIES
+    from utils import database as db
+
+    def user_id():
+        return rng.randint(1, sizes["users"])
+
+    def news_id():
+        return rng.randint(1, ids["max_news_id"])
+
+    def category():
+        return rng.choice(CATEGORIES)
+
+    def args(*factories):
+        async def make():
+            return tuple(factory() if callable(factory) else factory for factory in factories)
+        return make
+
+    async def new_pending():
+        pending_id = await db.insert_pending_news(0, "bench", "bench description", "", category())
+        return (pending_id,)
+
+    async def new_pending_batch():
+        return ([(await new_pending())[0] for _ in range(20)],)
+
+    async def new_payment():
+        payment_id = str(uuid.uuid4())
+        await db.add_payment(payment_id, user_id(), "view_news", 5, 10)
+        return (payment_id,)
+
+    return [
+        # Чтение
+        ("get_user_role", db.get_user_role, args(user_id)),
+        ("get_users_by_role", db.get_users_by_role, args("writer")),
+        ("get_news", db.get_news, args(category, 10)),
+        ("get_news_all_categories", db.get_news, args(None, 10)),
+        ("get_news_by_id", db.get_news_by_id, args(news_id)),
+        ("get_news_by_ids", db.get_news_by_ids, args(lambda: [news_id() for _ in range(10)])),
+        ("get_top_news", db.get_top_news, args(category)),
+        ("search_news", db.search_news, args(lambda: rng.choice(("рынок", "bank", "матч сезон", "report")), 0, 10)),
+        ("get_news_rating", db.get_news_rating, args(news_id)),
+        ("get_user_rating", db.get_user_rating, args(user_id, news_id)),
+        ("check_limit", db.check_limit, args(user_id, "view_news")),
+        ("get_user_stats", db.get_user_stats, args(user_id)),
+        ("get_user_subscriptions", db.get_user_subscriptions, args(user_id)),
+        ("get_subscribers", db.get_subscribers, args(category)),
+        ("get_sources", db.get_sources, args()),
+        ("get_pending_news", db.get_pending_news, args()),
+        ("get_pending_by_id", db.get_pending_by_id, args(lambda: rng.choice(ids["pending"]))),
+        ("list_pending", db.list_pending, args(lambda: rng.choice(ids["pending"]), 10)),
+        ("count_pending", db.count_pending, args()),
+        ("list_pending_ids", db.list_pending_ids, args()),
+        ("get_pending_sources", db.get_pending_sources, args()),
+        ("get_writer_counts", db.get_writer_counts, args(0)),
+        ("list_writer_news", db.list_writer_news, args(0, True, 0, 10)),
+        ("get_writer_item", db.get_writer_item, args(0, news_id, True)),
+        ("get_due_payments", db.get_due_payments, args(50)),
+        # Запись
+        ("set_news_rating", db.set_news_rating, args(user_id, news_id, lambda: rng.choice((1, -1)))),
+        ("increment_limit", db.increment_limit, args(user_id, "view_news")),
+        ("add_limit", db.add_limit, args(user_id, "view_news", 5)),
+        ("subscribe_to_category", db.subscribe_to_category, args(user_id, category)),
+        ("unsubscribe_from_category", db.unsubscribe_from_category, args(user_id, category)),
+        ("insert_pending_news", db.insert_pending_news, args(0, "bench", "bench description", "", category)),
+        ("approve_news", db.approve_news, new_pending),
+        ("reject_news", db.reject_news, new_pending),
+        ("approve_many", db.approve_many, new_pending_batch),
+        ("add_payment", db.add_payment, args(lambda: str(uuid.uuid4()), user_id, "view_news", 5, 10)),
+        ("credit_payment", db.credit_payment, new_payment),
+        ("add_purchase", db.add_purchase, args(user_id, "view_news", 5, 10)),
+    ]
+
+
+async def run(args) -> dict:
+    from benchmarks.seed import scaled_sizes, create_seeded_db
+    from config.config import DB_PATH
+    from utils import database as db
+    from utils.logger import setup_logger
+
+    setup_logger()
+    logging.getLogger("NewsBot").setLevel(logging.WARNING)
+    sizes = scaled_sizes(args.scale)
+    seed_seconds = await create_seeded_db(sizes, args.seed)
+
+    with sqlite3.connect(DB_PATH) as conn:
+        ids = {
+            "max_news_id": conn.execute("SELECT MAX(news_id) FROM news").fetchone()[0] or 1,
+            "pending": [row[0] for row in conn.execute("SELECT pending_id FROM pending_news")] or [0],
+        }
+        sizes = {**sizes, "users": conn.execute("SELECT MAX(user_id) FROM users").fetchone()[0] or 1}
+
+    rng = random.Random(args.seed)
+    only = set(args.only.split(",")) if args.only else None
+    results = {}
+    for name, func, make_args in build_cases(rng, sizes, ids):
+        if only and name not in only:
+            continue
+        latencies = []
+        for _ in range(args.repeat + 1):
+            call_args = await make_args()
+            db.search_cache.clear()
+            db.writer_counts_cache.clear()
+            started = time.perf_counter()
+            await func(*call_args)
+            latencies.append(time.perf_counter() - started)
+        latencies = latencies[1:]  # первый вызов — прогрев
+        results[name] = {
+            "calls": len(latencies),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "max_ms": round(max(latencies) * 1000, 3),
+        }
+        print(f"{name:<28} p50 {results[name]['p50_ms']:>9.3f} ms  p99 {results[name]['p99_ms']:>9.3f} ms")
+
+    return {
+        "dataset": sizes,
+        "seed_seconds": seed_seconds,
+        "repeat": args.repeat,
+        "sqlite_version": sqlite3.sqlite_version,
+        "db_size_mb": round(os.path.getsize(DB_PATH) / 1024 / 1024, 1),
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline_path: str) -> dict:
+    """Отношение p50/p99 к базовому прогону (меньше 1 — стало быстрее)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    comparison = {}
+    for name, result in report["results"].items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        comparison[name] = {
+            metric: round(result[metric] / before[metric], 2) if before[metric] else None
+            for metric in ("p50_ms", "p99_ms")
+        }
+    return comparison
+
+
+def main():
+    args = parse_args()
+    work_dir = tempfile.mkdtemp(prefix="db_bench_")
+    os.environ["NEWS_BOT_DB"] = args.db or os.path.join(work_dir, "bench.db")
+    args.output = args.output or os.path.join(work_dir, "db_bench.json")
+    os.environ.setdefault("METRICS_PORT", "0")
+
+    report = asyncio.run(run(args))
+    if args.baseline:
+        report["compared_to"] = args.baseline
+        report["ratio"] = compare(report, args.baseline)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
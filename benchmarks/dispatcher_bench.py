@@ -0,0 +1,156 @@
+"""Нагрузочный прогон диспетчера синтетическими апдейтами.
+
+Собирает тот же Dispatcher, что и main.py, и прогоняет через feed_update сценарии пользователей:
+/start -> категории -> листание -> лайк -> подписки -> профиль -> меню. Запросы к Bot API уходят
+в поддельную сессию, база — локальный SQLite с синтетическими данными (benchmarks.seed).
+
+    python -m benchmarks.dispatcher_bench --sessions 2000 --concurrency 50 --scale 0.001
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Dispatcher throughput and latency benchmark")
+    parser.add_argument("--sessions", type=int, default=1000, help="user sessions to replay")
+    parser.add_argument("--concurrency", type=int, default=50, help="sessions running at once")
+    parser.add_argument("--scale", type=float, default=0.001, help="dataset size as a fraction of the full size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="SQLite file to use (reused if already seeded; a temporary file by default)")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    return parser.parse_args()
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def summarize(latencies: list) -> dict:
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def session_updates(user_id: int, category: str, news_ids: list) -> list:
+    from benchmarks.fake_telegram import message_update, callback_update
+
+    return [
+        message_update(user_id, "/start"),
+        callback_update(user_id, "view_news"),
+        callback_update(user_id, f"category_{category}"),
+        callback_update(user_id, "next_news_0"),
+        callback_update(user_id, "next_news_1"),
+        callback_update(user_id, "prev_news_2"),
+        callback_update(user_id, f"like_news_{news_ids[1]}"),
+        callback_update(user_id, "manage_subscriptions"),
+        callback_update(user_id, f"subscribe_{category}"),
+        callback_update(user_id, "profile"),
+        callback_update(user_id, "back_to_menu"),
+    ]
+
+
+async def run(args) -> dict:
+    from aiogram import BaseMiddleware
+    from benchmarks.fake_telegram import make_bot
+    from benchmarks.seed import scaled_sizes, create_seeded_db
+    from config.config import CATEGORIES
+    from main import build_dispatcher
+    from utils.database import get_news
+    from utils.metrics import handler_name
+    from utils.logger import setup_logger
+
+    setup_logger()
+    logging.getLogger("NewsBot").setLevel(args.log_level.upper())
+    sizes = scaled_sizes(args.scale)
+    # Лимиты просмотров не должны закончиться посреди прогона
+    seed_seconds = await create_seeded_db(sizes, args.seed, view_limit=10 ** 9)
+
+    handler_latencies = {}
+
+    class LatencyRecorder(BaseMiddleware):
+        async def __call__(self, handler, event, data):
+            name = handler_name(data["handler"].callback)
+            started = time.perf_counter()
+            try:
+                return await handler(event, data)
+            finally:
+                handler_latencies.setdefault(name, []).append(time.perf_counter() - started)
+
+    dp = build_dispatcher()
+    for observer in (dp.message, dp.callback_query):
+        observer.middleware(LatencyRecorder())
+    bot = make_bot()
+
+    news_by_category = {}
+    for category in CATEGORIES:
+        news = await get_news(category=category, limit=10)
+        if len(news) >= 3:
+            news_by_category[category] = [item["news_id"] for item in news]
+    if not news_by_category:
+        raise SystemExit("Seeded database has no category with at least 3 news; increase --scale")
+
+    rng = random.Random(args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    update_latencies = []
+    errors = 0
+
+    async def replay(index: int):
+        nonlocal errors
+        # Одновременно идущие сессии принадлежат разным пользователям, чтобы не делить FSM-состояние
+        user_id = index % sizes["users"] + 1
+        category = rng.choice(list(news_by_category))
+        async with semaphore:
+            for update in session_updates(user_id, category, news_by_category[category]):
+                started = time.perf_counter()
+                try:
+                    await dp.feed_update(bot, update)
+                except Exception:
+                    errors += 1
+                update_latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(replay(index) for index in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "dataset": sizes,
+        "seed_seconds": seed_seconds,
+        "updates": len(update_latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "updates_per_second": round(len(update_latencies) / elapsed, 1) if elapsed else None,
+        "feed_update": summarize(update_latencies),
+        "handlers": {name: summarize(values) for name, values in sorted(handler_latencies.items())},
+        "api_calls": dict(bot.session.calls),
+    }
+
+
+def main():
+    args = parse_args()
+    os.environ["NEWS_BOT_DB"] = args.db or os.path.join(tempfile.mkdtemp(prefix="dispatcher_bench_"), "bench.db")
+    os.environ.setdefault("METRICS_PORT", "0")
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
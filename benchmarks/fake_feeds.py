@@ -0,0 +1,137 @@
+"""Локальный сервер RSS/Atom-лент для офлайн-прогонов сбора новостей.
+
+Отдаёт корпус из benchmarks/fixtures/feeds и сгенерированную огромную ленту:
+    /feeds/rss2/<n>.xml      — обычная RSS 2.0 с картинками, ttl и sy:updatePeriod
+    /feeds/atom/<n>.xml      — Atom с published/updated
+    /feeds/malformed/<n>.xml — битый XML (незакрытые теги, HTML-сущности, обрыв файла)
+    /feeds/huge/<n>.xml      — RSS на --huge-items записей
+    /feeds/slow/<n>.xml      — RSS 2.0, отвечающая через --slow-latency секунд
+
+Запуск отдельно:
+    python -m benchmarks.fake_feeds --port 8082 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from aiohttp import web
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "feeds")
+FEED_KINDS = ["rss2", "atom", "malformed", "huge", "slow"]
+CONTENT_TYPES = {"atom": "application/atom+xml"}
+
+
+def make_huge_feed(items: int) -> bytes:
+    """RSS 2.0 на items записей с описаниями по ~1 КБ."""
+    now = datetime.now(timezone.utc)
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 18
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+        "<title>Huge Archive Feed</title><link>https://archive.example.com/</link>"
+        "<description>Every story ever published</description><ttl>60</ttl>"
+    ]
+    for index in range(items):
+        published = format_datetime(now - timedelta(minutes=index * 7))
+        parts.append(
+            f"<item><title>Archive story {index}</title>"
+            f"<link>https://archive.example.com/story/{index}</link>"
+            f'<guid isPermaLink="false">archive-{index}</guid><pubDate>{published}</pubDate>'
+            f"<description><![CDATA[<p>{paragraph}</p>]]></description></item>"
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+class FakeFeedServer:
+    """latency — диапазон задержки ответа в секундах для всех лент, кроме slow."""
+
+    def __init__(self, latency: tuple = (0.0, 0.0), slow_latency: float = 5.0, huge_items: int = 5000):
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.feeds = {}
+        for kind in ("rss2", "atom", "malformed"):
+            with open(os.path.join(FIXTURES_DIR, f"{kind}.xml"), "rb") as f:
+                self.feeds[kind] = f.read()
+        self.feeds["slow"] = self.feeds["rss2"]
+        self.feeds["huge"] = make_huge_feed(huge_items)
+        self.stats = Counter()
+        self.runner = None
+        self.loop = None
+        self.thread = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/feeds/{kind}/{source}.xml", self.serve_feed)
+        return app
+
+    async def serve_feed(self, request: web.Request) -> web.Response:
+        kind = request.match_info["kind"]
+        if kind not in self.feeds:
+            raise web.HTTPNotFound()
+        self.stats[kind] += 1
+        delay = self.slow_latency if kind == "slow" else random.uniform(*self.latency)
+        await asyncio.sleep(delay)
+        return web.Response(body=self.feeds[kind], content_type=CONTENT_TYPES.get(kind, "application/rss+xml"),
+                            charset="utf-8")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускает сервер и возвращает базовый URL (…/feeds)."""
+        self.runner = web.AppRunner(self.make_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        return f"http://{host}:{port}/feeds"
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускает сервер в отдельном потоке со своим циклом событий.
+
+        Так работа сервера не смешивается с замерами клиента, который идёт в основном цикле.
+        """
+        started = threading.Event()
+        result = {}
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            result["url"] = self.loop.run_until_complete(self.start(host, port))
+            started.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.stop())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name="fake-feeds", daemon=True)
+        self.thread.start()
+        started.wait()
+        return result["url"]
+
+    def stop_thread(self):
+        if self.loop and self.thread:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local RSS/Atom feed server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", type=float, default=0.0, help="maximum response delay, seconds")
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--huge-items", type=int, default=5000)
+    args = parser.parse_args()
+
+    server = FakeFeedServer((0.0, args.latency), args.slow_latency, args.huge_items)
+    web.run_app(server.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Поддельная сессия Bot API и генераторы апдейтов для прогонов диспетчера без сети."""
+import datetime
+import itertools
+from collections import Counter
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage
+from aiogram.types import Message, Chat, User, Update, CallbackQuery
+
+BOT_ID = 42
+_ids = itertools.count(1)
+
+
+class FakeSession(BaseSession):
+    """Ничего не отправляет: запоминает, какие методы API вызывались, и отвечает правдоподобно."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = Counter()
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls[type(method).__name__] += 1
+        if isinstance(method, SendMessage):
+            return Message(
+                message_id=next(_ids), date=datetime.datetime.now(),
+                chat=Chat(id=method.chat_id, type="private"), text=method.text
+            )
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def make_bot() -> Bot:
+    return Bot(f"{BOT_ID}:BENCHMARK", session=FakeSession())
+
+
+def user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name=f"user{user_id}")
+
+
+def message_update(user_id: int, text: str) -> Update:
+    return Update(update_id=next(_ids), message=Message(
+        message_id=next(_ids), date=datetime.datetime.now(), chat=Chat(id=user_id, type="private"),
+        from_user=user(user_id), text=text
+    ))
+
+
+def callback_update(user_id: int, data: str) -> Update:
+    message = Message(
+        message_id=next(_ids), date=datetime.datetime.now(), chat=Chat(id=user_id, type="private"),
+        from_user=User(id=BOT_ID, is_bot=True, first_name="bot"), text="…"
+    )
+    return Update(update_id=next(_ids), callback_query=CallbackQuery(
+        id=str(next(_ids)), from_user=user(user_id), chat_instance=str(user_id), message=message, data=data
+    ))
@@ -0,0 +1,106 @@
+"""Локальная заглушка API ЮKassa для нагрузочных тестов оплаты.
+
+Запуск отдельно:
+    python -m benchmarks.fake_yookassa --port 8081 --latency 0.05 --failure-rate 0.05 --script pending,succeeded
+
+и затем YOOKASSA_API_URL=http://127.0.0.1:8081/v3 для бота.
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from aiohttp import web
+
+
+class FakeYooKassa:
+    """Имитирует POST /v3/payments и GET /v3/payments/{id}.
+
+    latency — диапазон задержки ответа в секундах, failure_rate — доля ответов 503,
+    script — статусы, которые платёж проходит при последовательных GET (последний остаётся навсегда).
+    """
+
+    def __init__(self, latency: tuple = (0.0, 0.0), failure_rate: float = 0.0, script: list = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.script = script or ["pending", "succeeded"]
+        self.payments = {}
+        self.idempotence_keys = {}
+        self.stats = {"create": 0, "check": 0, "failures": 0}
+        self.runner = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v3/payments", self.create_payment)
+        app.router.add_get("/v3/payments/{payment_id}", self.get_payment)
+        return app
+
+    async def delay_or_fail(self):
+        await asyncio.sleep(random.uniform(*self.latency))
+        if random.random() < self.failure_rate:
+            self.stats["failures"] += 1
+            raise web.HTTPServiceUnavailable(text='{"type": "error", "code": "internal_server_error"}')
+
+    async def create_payment(self, request: web.Request) -> web.Response:
+        self.stats["create"] += 1
+        await self.delay_or_fail()
+        key = request.headers.get("Idempotence-Key")
+        if key in self.idempotence_keys:
+            return web.json_response(self.payments[self.idempotence_keys[key]]["body"])
+
+        data = await request.json()
+        payment_id = str(uuid.uuid4())
+        body = {
+            "id": payment_id,
+            "status": self.script[0],
+            "amount": data["amount"],
+            "description": data.get("description"),
+            "metadata": data.get("metadata", {}),
+            "confirmation": {
+                "type": "redirect",
+                "confirmation_url": f"https://yoomoney.example/checkout/{payment_id}",
+            },
+        }
+        self.payments[payment_id] = {"body": body, "step": 0}
+        if key:
+            self.idempotence_keys[key] = payment_id
+        return web.json_response(body)
+
+    async def get_payment(self, request: web.Request) -> web.Response:
+        self.stats["check"] += 1
+        await self.delay_or_fail()
+        payment = self.payments.get(request.match_info["payment_id"])
+        if payment is None:
+            raise web.HTTPNotFound(text='{"type": "error", "code": "not_found"}')
+        payment["step"] = min(payment["step"] + 1, len(self.script) - 1)
+        payment["body"]["status"] = self.script[payment["step"]]
+        return web.json_response(payment["body"])
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускает сервер и возвращает базовый URL API (…/v3)."""
+        self.runner = web.AppRunner(self.make_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        return f"http://{host}:{port}/v3"
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local YooKassa stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="maximum response delay, seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--script", default="pending,succeeded", help="comma-separated status transitions")
+    args = parser.parse_args()
+
+    fake = FakeYooKassa((0.0, args.latency), args.failure_rate, args.script.split(","))
+    web.run_app(fake.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
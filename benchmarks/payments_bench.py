@@ -0,0 +1,141 @@
+"""Нагрузочный тест покупки лимитов через локальную заглушку ЮKassa.
+
+Прогоняет create_payment -> add_payment -> многократные проверки статуса пользователем
+и фоновую сверку платежей, затем проверяет, что ни один платёж не зачислен дважды.
+
+    python -m benchmarks.payments_bench --purchases 2000 --concurrency 100 --taps 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Payment flow load test against a local YooKassa stand-in")
+    parser.add_argument("--purchases", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--taps", type=int, default=5, help="concurrent status checks per purchase")
+    parser.add_argument("--latency", type=float, default=0.02, help="maximum fake API latency, seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--script", default="pending,pending,succeeded")
+    parser.add_argument("--status-ttl", type=float, default=0.5, help="client cache TTL for non-final statuses")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--db", help="SQLite file to use (a temporary file by default)")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    return parser.parse_args()
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(args) -> dict:
+    from cachetools import TTLCache
+    from benchmarks.fake_yookassa import FakeYooKassa
+    from config.config import DB_PATH
+    from utils import payment, payment_reconciler
+    from utils.database import init_db, add_payment
+    from utils.payment import payment_client
+    from utils.payment_reconciler import reconcile_payments, refresh_payment
+    from utils.logger import setup_logger
+
+    setup_logger()
+    logging.getLogger("NewsBot").setLevel(logging.WARNING)
+    await init_db()
+    with sqlite3.connect(DB_PATH) as db:
+        db.executemany("INSERT OR IGNORE INTO users (user_id) VALUES (?)", [(i,) for i in range(1, args.users + 1)])
+
+    fake = FakeYooKassa((0.0, args.latency), args.failure_rate, args.script.split(","))
+    payment_client.base_url = await fake.start()
+    payment_client.recent_statuses = TTLCache(maxsize=100000, ttl=args.status_ttl)
+    payment_client.failed_checks = TTLCache(maxsize=100000, ttl=args.status_ttl)
+    payment.RETRY_BASE_DELAY = 0.01
+    payment_reconciler.BACKOFF_BASE = 0
+    await payment_client.start()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    create_latencies = []
+    payment_ids = []
+
+    async def purchase(user_id: int):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await payment_client.create_payment(user_id, 10, "Покупка 5 просмотров в боте", "view_news", 5)
+            if result:
+                await add_payment(result["id"], user_id, "view_news", 5, 10)
+                payment_ids.append(result["id"])
+            create_latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(purchase(random.randint(1, args.users)) for _ in range(args.purchases)))
+    create_time = time.perf_counter() - started
+
+    async def hammer(payment_id: str):
+        async with semaphore:
+            await asyncio.gather(*(refresh_payment(payment_id) for _ in range(args.taps)))
+
+    async def reconcile_until_done():
+        while time.perf_counter() - started < args.timeout:
+            with sqlite3.connect(DB_PATH) as db:
+                pending = db.execute("SELECT COUNT(*) FROM payments WHERE status = 'pending'").fetchone()[0]
+            if not pending:
+                return
+            await reconcile_payments(None)
+            await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    checks_before = fake.stats["check"]
+    await asyncio.gather(reconcile_until_done(), *(hammer(payment_id) for payment_id in payment_ids))
+    reconcile_time = time.perf_counter() - started
+
+    await payment_client.close()
+    await fake.stop()
+
+    with sqlite3.connect(DB_PATH) as db:
+        statuses = dict(db.execute("SELECT status, COUNT(*) FROM payments GROUP BY status").fetchall())
+        credited = db.execute("SELECT COUNT(*) FROM purchases WHERE payment_id IS NOT NULL").fetchone()[0]
+        over_credited = db.execute(
+            "SELECT COUNT(*) FROM users u WHERE u.view_limit != 10 + 5 * "
+            "(SELECT COUNT(*) FROM payments p WHERE p.user_id = u.user_id AND p.status = 'succeeded')"
+        ).fetchone()[0]
+
+    return {
+        "purchases": args.purchases,
+        "created": len(payment_ids),
+        "create_seconds": round(create_time, 3),
+        "create_per_second": round(len(payment_ids) / create_time, 1) if create_time else None,
+        "create_p50_ms": round(percentile(create_latencies, 0.50) * 1000, 2),
+        "create_p99_ms": round(percentile(create_latencies, 0.99) * 1000, 2),
+        "reconcile_seconds": round(reconcile_time, 3),
+        "user_taps": len(payment_ids) * args.taps,
+        "status_requests": fake.stats["check"] - checks_before,
+        "fake_api_failures": fake.stats["failures"],
+        "statuses": statuses,
+        "credited": credited,
+        "double_credit_safe": credited == statuses.get("succeeded", 0) and over_credited == 0,
+    }
+
+
+def main():
+    args = parse_args()
+    os.environ["NEWS_BOT_DB"] = args.db or os.path.join(tempfile.mkdtemp(prefix="payments_bench_"), "bench.db")
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
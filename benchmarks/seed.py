@@ -0,0 +1,155 @@
+"""Синтетический набор данных для бенчмарков.
+
+Размеры задаются от целевого объёма (1M новостей, 20M оценок, 500k пользователей, 2M подписок)
+множителем --scale. Большие базы удобно собрать один раз и переиспользовать через --db:
+
+    python -m benchmarks.seed --scale 0.05 --db /tmp/bench.db
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+FULL_SIZES = {
+    "users": 500_000,
+    "news": 1_000_000,
+    "ratings": 20_000_000,
+    "subscriptions": 2_000_000,
+    "pending": 10_000,
+}
+# Строк в одном executemany
+INSERT_BATCH = 50_000
+
+WORDS = (
+    "рынок правительство матч технологии компания выборы банк курс спорт фильм сезон "
+    "president market company election bank team season startup model energy report city"
+).split()
+
+
+def scaled_sizes(scale: float) -> dict:
+    return {name: max(1, int(size * scale)) for name, size in FULL_SIZES.items()}
+
+
+def fake_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def batched(rows, size: int = INSERT_BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def populate(path: str, sizes: dict, seed: int = 42, view_limit: int = 10) -> dict:
+    """Заполняет уже созданную схему (init_db) синтетическими данными. Возвращает время по таблицам."""
+    from config.config import CATEGORIES
+
+    rng = random.Random(seed)
+    timings = {}
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA synchronous = OFF")
+    db.execute("PRAGMA journal_mode = MEMORY")
+    sources = db.execute("SELECT source_id, category, url FROM sources").fetchall()
+    by_category = {}
+    for source_id, category, url in sources:
+        by_category.setdefault(category, []).append((source_id, url))
+    now = datetime.now()
+
+    def timed(name: str, sql: str, rows):
+        started = time.perf_counter()
+        for batch in batched(rows):
+            db.executemany(sql, batch)
+            db.commit()
+        timings[name] = round(time.perf_counter() - started, 3)
+
+    timed("users", "INSERT OR IGNORE INTO users (user_id, role, view_limit) VALUES (?, ?, ?)", (
+        (user_id, "writer" if user_id % 1000 == 0 else "user", view_limit)
+        for user_id in range(1, sizes["users"] + 1)
+    ))
+
+    def news_rows():
+        for _ in range(sizes["news"]):
+            category = rng.choice(CATEGORIES)
+            source = rng.choice(by_category.get(category) or [(None, "RSS")])
+            published = now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600))
+            yield (category, fake_text(rng, 8), fake_text(rng, 40), "", 0, source[1],
+                   published.strftime("%Y-%m-%d %H:%M:%S"))
+
+    timed("news", "INSERT INTO news (category, title, description, image_url, writer_id, source, published_at) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?)", news_rows())
+
+    def rating_rows():
+        per_user = max(1, sizes["ratings"] // sizes["users"])
+        news_count = sizes["news"]
+        for user_id in range(1, sizes["users"] + 1):
+            for news_id in rng.sample(range(1, news_count + 1), min(per_user, news_count)):
+                yield user_id, news_id, rng.choice((1, 1, 1, -1))
+
+    timed("ratings", "INSERT OR IGNORE INTO ratings (user_id, news_id, rating) VALUES (?, ?, ?)", rating_rows())
+
+    def subscription_rows():
+        per_user = sizes["subscriptions"] / sizes["users"]
+        for user_id in range(1, sizes["users"] + 1):
+            count = min(len(CATEGORIES), int(per_user) + (rng.random() < per_user % 1))
+            for category in rng.sample(CATEGORIES, count):
+                yield user_id, category
+
+    timed("subscriptions", "INSERT OR IGNORE INTO subscriptions (user_id, category) VALUES (?, ?)",
+          subscription_rows())
+
+    def pending_rows():
+        for _ in range(sizes["pending"]):
+            category = rng.choice(CATEGORIES)
+            source = rng.choice(by_category.get(category) or [(None, "RSS")])
+            yield category, fake_text(rng, 8), fake_text(rng, 40), "", 0, source[0]
+
+    timed("pending", "INSERT INTO pending_news (category, title, description, image_url, writer_id, source_id) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", pending_rows())
+
+    db.execute("ANALYZE")
+    db.commit()
+    db.close()
+    return timings
+
+
+async def create_seeded_db(sizes: dict, seed: int = 42, view_limit: int = 10) -> dict:
+    """Создаёт схему в NEWS_BOT_DB и заполняет её, если база ещё пустая."""
+    from config.config import DB_PATH
+    from utils.database import init_db
+
+    await init_db()
+    with sqlite3.connect(DB_PATH) as db:
+        existing = db.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+    if existing:
+        return {"reused": True, "news": existing}
+    timings = populate(DB_PATH, sizes, seed, view_limit)
+    # Счётчики и статистика пересчитываются при инициализации
+    await init_db()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a synthetic news bot database")
+    parser.add_argument("--scale", type=float, default=0.01, help="fraction of the full-size dataset")
+    parser.add_argument("--db", required=True, help="SQLite file to create")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--view-limit", type=int, default=10)
+    args = parser.parse_args()
+    os.environ["NEWS_BOT_DB"] = args.db
+
+    sizes = scaled_sizes(args.scale)
+    timings = asyncio.run(create_seeded_db(sizes, args.seed, args.view_limit))
+    print(json.dumps({"sizes": sizes, "seconds": timings}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import os
+
 BOT_TOKEN = "8101651301:AAEWGYqOAY6pPnYgXNS_OyRMQ1OrMg2Q4OE"
 ADMIN_ID = 925886929
 
+# Путь к базе SQLite (переопределяется переменной окружения, например для бенчмарков)
+DB_PATH = os.getenv("NEWS_BOT_DB", "news_bot.db")
+
 # Категории новостей
 CATEGORIES = ["general", "business", "technology", "entertainment", "sports"]
 
@@ -1,12 +1,48 @@
 from aiogram import Router
-from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from utils.database import get_user_role, set_user_role, get_users_by_role, get_pending_news, approve_news, reject_news, get_subscribers
-from utils.logger import logger
-from keyboards.inline import get_admin_keyboard, get_role_management_keyboard, get_role_selection_keyboard, get_pending_news_keyboard
+from aiogram.filters import Command, CommandObject
+from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.fsm.context import FSMContext
+from utils.database import get_user_role, set_user_role, get_users_by_role, get_pending_by_id, list_pending, \
+    count_pending, approve_news, reject_news, approve_many, reject_many, list_pending_ids, get_pending_sources, \
+    get_source_health, enable_source
+from utils.db_profiler import format_query_report
+from utils.logger import get_logger
+from utils.news import cluster_approved
+from utils.notifier import schedule_notification
+from keyboards.inline import get_admin_keyboard, get_role_management_keyboard, get_role_selection_keyboard, \
+    get_pending_news_keyboard, get_pending_sources_keyboard, get_source_health_keyboard
 from aiogram.exceptions import TelegramBadRequest
 
+logger = get_logger(__name__)
+
 router = Router()
 
+PENDING_PAGE_SIZE = 10
+
+
+async def render_pending_page(callback: CallbackQuery, state: FSMContext, header: str, cursor: int = 0):
+    """Показывает одну страницу очереди модерации, начиная после pending_id = cursor."""
+    news, next_cursor = await list_pending(cursor, PENDING_PAGE_SIZE)
+    total = await count_pending()
+    # «Одобрить все на странице» одобряет ровно то, что модератор видит, а не текущее содержимое страницы
+    await state.update_data(page_pending_ids=[n["pending_id"] for n in news])
+    if not news:
+        await callback.message.edit_text(
+            f"{header}\n📭 Нет новостей на проверку.",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="🔙 Назад", callback_data="admin_panel")]
+            ])
+        )
+        return
+
+    data = await state.get_data()
+    await state.update_data(review_cursor=cursor)
+    new_text = f"{header}\n📥 В очереди: {total}"
+    new_keyboard = get_pending_news_keyboard(news, next_cursor, is_first_page=(cursor == 0),
+                                             selected=data.get("selected_pending", []))
+    await callback.message.edit_text(new_text, reply_markup=new_keyboard)
+
+
 @router.callback_query(lambda c: c.data == "admin_panel")
 async def admin_panel(callback: CallbackQuery):
     user_id = callback.from_user.id
@@ -24,40 +60,39 @@ async def admin_panel(callback: CallbackQuery):
         if "message is not modified" in str(e):
             await callback.answer("ℹ️ Панель уже открыта.")
         else:
-            logger.error(f"Error in admin_panel for user {user_id}: {str(e)}")
+            logger.error("Error in admin_panel for user %s: %s", user_id, e)
             raise
     except Exception as e:
-        logger.error(f"Error in admin_panel for user {user_id}: {str(e)}")
+        logger.error("Error in admin_panel for user %s: %s", user_id, e)
         raise
 
     await callback.answer()
-    logger.info(f"User {user_id} opened admin panel.")
+    logger.info("User %s opened admin panel.", user_id)
 
 @router.callback_query(lambda c: c.data == "review_news")
-async def review_news(callback: CallbackQuery):
+async def review_news(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     role = await get_user_role(user_id)
     if role not in ["admin", "manager"]:
         await callback.answer("🚫 Доступ запрещён!", show_alert=True)
         return
 
-    news = await get_pending_news()
-    if not news:
-        await callback.message.edit_text(
-            "📭 Нет новостей на проверку.",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="🔙 Назад", callback_data="admin_panel")]
-            ])
-        )
-        await callback.answer()
-        return
+    await render_pending_page(callback, state, "📋 Проверка новостей\nВыберите новость для проверки:")
+    await callback.answer()
+    logger.info("User %s opened news review panel.", user_id)
 
-    new_text = "📋 Проверка новостей\nВыберите новость для проверки:"
-    new_keyboard = get_pending_news_keyboard(news)
+@router.callback_query(lambda c: c.data.startswith("review_page_"))
+async def review_news_page(callback: CallbackQuery, state: FSMContext):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role not in ["admin", "manager"]:
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
 
-    await callback.message.edit_text(new_text, reply_markup=new_keyboard)
+    cursor = int(callback.data.split("_")[2])
+    await render_pending_page(callback, state, "📋 Проверка новостей\nВыберите новость для проверки:", cursor)
     await callback.answer()
-    logger.info(f"User {user_id} opened news review panel.")
+    logger.info("User %s opened news review page after ID %s.", user_id, cursor)
 
 @router.callback_query(lambda c: c.data.startswith("view_pending_"))
 async def view_pending_news(callback: CallbackQuery):
@@ -68,12 +103,7 @@ async def view_pending_news(callback: CallbackQuery):
         return
 
     pending_id = int(callback.data.split("_")[2])
-    news = await get_pending_news()
-    selected_news = None
-    for n in news:
-        if n["pending_id"] == pending_id:
-            selected_news = n
-            break
+    selected_news = await get_pending_by_id(pending_id)
 
     if not selected_news:
         await callback.message.edit_text(
@@ -102,10 +132,10 @@ async def view_pending_news(callback: CallbackQuery):
 
     await callback.message.edit_text(new_text, reply_markup=new_keyboard)
     await callback.answer()
-    logger.info(f"User {user_id} viewed pending news ID {pending_id}.")
+    logger.info("User %s viewed pending news ID %s.", user_id, pending_id)
 
 @router.callback_query(lambda c: c.data.startswith("approve_"))
-async def approve_news_callback(callback: CallbackQuery):
+async def approve_news_callback(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     role = await get_user_role(user_id)
     if role not in ["admin", "manager"]:
@@ -124,29 +154,14 @@ async def approve_news_callback(callback: CallbackQuery):
         await callback.answer()
         return
 
-    news = await get_pending_news()
-    new_text = f"✅ Новость ID {pending_id} одобрена! Опубликована под ID {news_id}."
-    new_keyboard = get_pending_news_keyboard(news)
-
-    await callback.message.edit_text(new_text, reply_markup=new_keyboard)
+    await render_pending_page(callback, state, f"✅ Новость ID {pending_id} одобрена! Опубликована под ID {news_id}.")
     await callback.answer()
+    schedule_notification(callback.message.bot, await cluster_approved([news_id]))
 
-    subscribers = await get_subscribers(news[0]["category"])
-    for subscriber in subscribers:
-        try:
-            await callback.message.bot.send_message(
-                subscriber,
-                f"📰 Новая новость в категории {news[0]['category'].capitalize()}!\n"
-                f"Заголовок: {news[0]['title']}\n"
-                f"Описание: {news[0]['description']}"
-            )
-        except Exception as e:
-            logger.error(f"Error notifying subscriber {subscriber}: {str(e)}")
-
-    logger.info(f"User {user_id} approved news ID {pending_id}, published as {news_id}.")
+    logger.info("User %s approved news ID %s, published as %s.", user_id, pending_id, news_id)
 
 @router.callback_query(lambda c: c.data.startswith("reject_"))
-async def reject_news_callback(callback: CallbackQuery):
+async def reject_news_callback(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     role = await get_user_role(user_id)
     if role not in ["admin", "manager"]:
@@ -165,13 +180,103 @@ async def reject_news_callback(callback: CallbackQuery):
         await callback.answer()
         return
 
-    news = await get_pending_news()
-    new_text = f"❌ Новость ID {pending_id} отклонена."
-    new_keyboard = get_pending_news_keyboard(news)
+    await render_pending_page(callback, state, f"❌ Новость ID {pending_id} отклонена.")
+    await callback.answer()
+    logger.info("User %s rejected news ID %s.", user_id, pending_id)
 
-    await callback.message.edit_text(new_text, reply_markup=new_keyboard)
+@router.callback_query(lambda c: c.data.startswith("toggle_pending_"))
+async def toggle_pending(callback: CallbackQuery, state: FSMContext):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role not in ["admin", "manager"]:
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
+
+    pending_id = int(callback.data.split("_")[2])
+    data = await state.get_data()
+    selected = data.get("selected_pending", [])
+    if pending_id in selected:
+        selected.remove(pending_id)
+    else:
+        selected.append(pending_id)
+    await state.update_data(selected_pending=selected)
+
+    await render_pending_page(callback, state, "📋 Проверка новостей\nОтметьте новости для массовых действий:",
+                              data.get("review_cursor", 0))
     await callback.answer()
-    logger.info(f"User {user_id} rejected news ID {pending_id}.")
+
+@router.callback_query(lambda c: c.data in ["bulk_approve_selected", "bulk_reject_selected"])
+async def bulk_selected(callback: CallbackQuery, state: FSMContext):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role not in ["admin", "manager"]:
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
+
+    data = await state.get_data()
+    selected = data.get("selected_pending", [])
+    await state.update_data(selected_pending=[])
+    if callback.data == "bulk_approve_selected":
+        news_ids = await approve_many(selected)
+        header = f"✅ Одобрено новостей: {len(news_ids)}."
+        schedule_notification(callback.message.bot, await cluster_approved(news_ids))
+    else:
+        deleted = await reject_many(selected)
+        header = f"❌ Отклонено новостей: {deleted}."
+
+    await render_pending_page(callback, state, header)
+    await callback.answer()
+    logger.info("User %s applied %s to %s pending news.", user_id, callback.data, len(selected))
+
+@router.callback_query(lambda c: c.data == "bulk_approve_page")
+async def bulk_approve_page(callback: CallbackQuery, state: FSMContext):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role not in ["admin", "manager"]:
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
+
+    data = await state.get_data()
+    news_ids = await approve_many(data.get("page_pending_ids", []))
+    await state.update_data(selected_pending=[], page_pending_ids=[])
+    schedule_notification(callback.message.bot, await cluster_approved(news_ids))
+
+    await render_pending_page(callback, state, f"✅ Одобрено новостей: {len(news_ids)}.")
+    await callback.answer()
+    logger.info("User %s approved %s pending news from the current page.", user_id, len(news_ids))
+
+@router.callback_query(lambda c: c.data == "review_sources")
+async def review_sources(callback: CallbackQuery):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role not in ["admin", "manager"]:
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
+
+    sources = await get_pending_sources()
+    await callback.message.edit_text(
+        "📡 Одобрить все новости источника:" if sources else "📭 В очереди нет новостей из RSS-источников.",
+        reply_markup=get_pending_sources_keyboard(sources)
+    )
+    await callback.answer()
+    logger.info("User %s opened pending sources list.", user_id)
+
+@router.callback_query(lambda c: c.data.startswith("bulk_approve_source_"))
+async def bulk_approve_source(callback: CallbackQuery, state: FSMContext):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role not in ["admin", "manager"]:
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
+
+    source_id = int(callback.data.split("_")[3])
+    news_ids = await approve_many(await list_pending_ids(source_id))
+    await state.update_data(selected_pending=[])
+    schedule_notification(callback.message.bot, await cluster_approved(news_ids))
+
+    await render_pending_page(callback, state, f"✅ Одобрено новостей источника: {len(news_ids)}.")
+    await callback.answer()
+    logger.info("User %s approved %s pending news from source %s.", user_id, len(news_ids), source_id)
 
 @router.callback_query(lambda c: c.data == "manage_roles")
 async def manage_roles(callback: CallbackQuery):
@@ -187,7 +292,7 @@ async def manage_roles(callback: CallbackQuery):
 
     await callback.message.edit_text(new_text, reply_markup=new_keyboard)
     await callback.answer()
-    logger.info(f"User {user_id} opened role management panel.")
+    logger.info("User %s opened role management panel.", user_id)
 
 @router.callback_query(lambda c: c.data.startswith("set_role_"))
 async def set_role(callback: CallbackQuery):
@@ -203,7 +308,7 @@ async def set_role(callback: CallbackQuery):
 
     await callback.message.edit_text(new_text, reply_markup=new_keyboard)
     await callback.answer()
-    logger.info(f"User {user_id} started role selection for user {target_user_id}.")
+    logger.info("User %s started role selection for user %s.", user_id, target_user_id)
 
 @router.callback_query(lambda c: c.data.startswith("role_"))
 async def assign_role(callback: CallbackQuery):
@@ -224,4 +329,76 @@ async def assign_role(callback: CallbackQuery):
 
     await callback.message.edit_text(new_text, reply_markup=new_keyboard)
     await callback.answer()
-    logger.info(f"User {user_id} set role {new_role} for user {target_user_id}.")
\ No newline at end of file
+    logger.info("User %s set role %s for user %s.", user_id, new_role, target_user_id)
+
+
+def format_source_health(sources: list) -> str:
+    lines = []
+    for source in sources:
+        if not source["is_active"]:
+            icon = "⛔"
+        elif source["consecutive_failures"]:
+            icon = "⚠️"
+        else:
+            icon = "✅"
+        line = f"{icon} {source['source_id']}. {source['url'][:40]}"
+        if source["avg_latency_ms"] is not None:
+            line += f" — {source['avg_latency_ms']:.0f} мс, {source['avg_bytes'] / 1024:.0f} КБ"
+        if source["consecutive_failures"]:
+            line += f"\n    ошибок подряд: {source['consecutive_failures']}, последняя: {(source['last_error'] or '')[:60]}"
+            line += f"\n    последний успех: {source['last_success_at'] or 'никогда'}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+async def render_source_health(callback: CallbackQuery):
+    sources = await get_source_health()
+    working = sum(1 for source in sources if source["is_active"] and not source["consecutive_failures"])
+    text = f"🩺 Источники: {working} из {len(sources)} работают без ошибок\n\n{format_source_health(sources)}"
+    disabled = [source for source in sources if not source["is_active"]]
+    try:
+        await callback.message.edit_text(text[:4096], reply_markup=get_source_health_keyboard(disabled))
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+
+
+@router.callback_query(lambda c: c.data == "source_health")
+async def source_health(callback: CallbackQuery):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role not in ["admin", "manager"]:
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
+
+    await render_source_health(callback)
+    await callback.answer()
+    logger.info("User %s opened source health.", user_id)
+
+@router.callback_query(lambda c: c.data.startswith("enable_source_"))
+async def enable_source_handler(callback: CallbackQuery):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role not in ["admin", "manager"]:
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
+
+    source_id = int(callback.data.split("_")[2])
+    if await enable_source(source_id):
+        await render_source_health(callback)
+        await callback.answer("♻️ Источник снова включён.")
+        logger.info("User %s re-enabled source %s.", user_id, source_id)
+    else:
+        await callback.answer("❌ Источник не найден.", show_alert=True)
+
+
+@router.message(Command("dbprofile"))
+async def cmd_dbprofile(message: Message, command: CommandObject):
+    """/dbprofile [N] — топ-N запросов к базе по суммарному времени (нужен DB_PROFILE=1)."""
+    role = await get_user_role(message.from_user.id)
+    if role != "admin":
+        await message.answer("🚫 Доступ запрещён!")
+        return
+
+    limit = int(command.args) if command.args and command.args.strip().isdigit() else 10
+    await message.answer(f"🐢 Профиль запросов к базе:\n\n{format_query_report(limit)}"[:4096])
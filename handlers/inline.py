@@ -0,0 +1,60 @@
+from aiogram import Router
+from aiogram.types import InlineQuery
+from config.config import CATEGORIES
+from utils.database import search_news
+from utils.inline_cache import get_feed, build_article
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = Router()
+
+INLINE_PAGE_SIZE = 20
+# Время, на которое Telegram кэширует ответ на одинаковый запрос
+INLINE_CACHE_TIME = 30
+
+CATEGORY_ALIASES = {
+    "общее": "general",
+    "бизнес": "business",
+    "технологии": "technology",
+    "развлечения": "entertainment",
+    "спорт": "sports",
+}
+
+
+def parse_inline_query(query: str) -> tuple[str, str]:
+    """Разбирает запрос: "" — свежие, "<категория>" — свежие в категории, "top [категория]" — лучшие, иначе поиск."""
+    words = query.lower().split()
+    kind = "recent"
+    if words and words[0] in ["top", "топ"]:
+        kind = "top"
+        words = words[1:]
+    if not words:
+        return kind, None
+    if len(words) == 1:
+        category = CATEGORY_ALIASES.get(words[0], words[0])
+        if category in CATEGORIES:
+            return kind, category
+    return "search", None
+
+
+@router.inline_query()
+async def inline_news(inline_query: InlineQuery):
+    query = inline_query.query.strip()
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    kind, category = parse_inline_query(query)
+
+    if kind == "search":
+        results, has_more = await search_news(query, offset, INLINE_PAGE_SIZE)
+        articles = [build_article(item, description=item["snippet"]) for item in results]
+    else:
+        feed = await get_feed(kind, category)
+        articles = feed[offset:offset + INLINE_PAGE_SIZE]
+        has_more = offset + INLINE_PAGE_SIZE < len(feed)
+
+    await inline_query.answer(
+        articles,
+        cache_time=INLINE_CACHE_TIME,
+        next_offset=str(offset + INLINE_PAGE_SIZE) if has_more else ""
+    )
+    logger.info("User %s inline query '%s' (%s), offset %s: %s results", inline_query.from_user.id, query, kind, offset, len(articles))
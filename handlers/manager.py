@@ -7,7 +7,9 @@ from aiogram.fsm.state import State, StatesGroup
 from keyboards.inline import get_manager_panel, get_confirmation_keyboard, get_user_selection_keyboard
 from utils.database import get_user_role, set_user_role, get_pending_news, approve_news, reject_news, remove_user_role, \
     get_users_by_role, get_news_by_id, get_subscribers
-from utils.logger import logger
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 router = Router()
 
@@ -38,7 +40,7 @@ async def manager_panel(callback: CallbackQuery):
         reply_markup=get_manager_panel()
     )
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} opened manager panel.")
+    logger.info("Manager %s opened manager panel.", callback.from_user.id)
 
 
 @router.callback_query(lambda c: c.data == "assign_writer")
@@ -53,7 +55,7 @@ async def assign_writer(callback: CallbackQuery, state: FSMContext):
     await state.set_state(AssignRole.waiting_for_id)
     await state.update_data(role="writer")
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} started assigning writer role.")
+    logger.info("Manager %s started assigning writer role.", callback.from_user.id)
 
 
 @router.message(AssignRole.waiting_for_id)
@@ -74,7 +76,8 @@ async def process_role_id(message: Message, state: FSMContext):
             )
             await state.clear()
             logger.warning(
-                f"Manager {message.from_user.id} tried to assign role {new_role} to user {user_id}, but user already has this role.")
+                "Manager %s tried to assign role %s to user %s, but user already has this role.",
+                message.from_user.id, new_role, user_id)
             return
 
         await state.update_data(user_id=user_id)
@@ -84,14 +87,14 @@ async def process_role_id(message: Message, state: FSMContext):
             reply_markup=get_confirmation_keyboard("confirm_role", "cancel_role")
         )
         await state.set_state(AssignRole.waiting_for_confirmation)
-        logger.info(f"Manager {message.from_user.id} selected user {user_id} to assign role {new_role}.")
+        logger.info("Manager %s selected user %s to assign role %s.", message.from_user.id, user_id, new_role)
     except ValueError:
         await message.answer(
             "❌ Пожалуйста, введите корректный ID (целое число).",
             reply_markup=get_manager_panel()
         )
         await state.clear()
-        logger.error(f"Manager {message.from_user.id} entered invalid user ID: {message.text}")
+        logger.error("Manager %s entered invalid user ID: %s", message.from_user.id, message.text)
 
 
 @router.callback_query(lambda c: c.data == "confirm_role")
@@ -113,10 +116,10 @@ async def confirm_role(callback: CallbackQuery, state: FSMContext):
             f"🎉 Вам назначена роль {role}!"
         )
     except:
-        logger.warning(f"Failed to notify user {user_id} about new role {role}.")
+        logger.warning("Failed to notify user %s about new role %s.", user_id, role)
     await state.clear()
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} assigned role {role} to user {user_id}.")
+    logger.info("Manager %s assigned role %s to user %s.", callback.from_user.id, role, user_id)
 
 
 @router.callback_query(lambda c: c.data == "cancel_role")
@@ -127,7 +130,7 @@ async def cancel_role(callback: CallbackQuery, state: FSMContext):
     )
     await state.clear()
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} canceled role assignment.")
+    logger.info("Manager %s canceled role assignment.", callback.from_user.id)
 
 
 @router.callback_query(lambda c: c.data == "remove_writer")
@@ -142,21 +145,21 @@ async def remove_writer(callback: CallbackQuery, state: FSMContext):
             reply_markup=get_manager_panel()
         )
         await callback.answer()
-        logger.info(f"Manager {callback.from_user.id} tried to remove writer, but no writers found.")
+        logger.info("Manager %s tried to remove writer, but no writers found.", callback.from_user.id)
         return
-    logger.info(f"Writers list for removal: {writers}")
+    logger.debug("Writers available for removal: %s", len(writers))
     await callback.message.edit_text(
         "✍️ Выберите писателя для удаления:",
         reply_markup=get_user_selection_keyboard(writers, "remove_writer")
     )
     await state.set_state(RemoveRole.waiting_for_id)
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} started removing writer.")
+    logger.info("Manager %s started removing writer.", callback.from_user.id)
 
 
 @router.callback_query(lambda c: c.data.startswith("select_user_"), RemoveRole.waiting_for_id)
 async def process_remove_user_id(callback: CallbackQuery, state: FSMContext):
-    logger.info(f"Callback data: {callback.data}")
+    logger.info("Callback data: %s", callback.data)
     parts = callback.data.split("_")
     if len(parts) < 5 or not parts[-1].isdigit():
         await callback.message.edit_text(
@@ -164,7 +167,7 @@ async def process_remove_user_id(callback: CallbackQuery, state: FSMContext):
             reply_markup=get_manager_panel()
         )
         await callback.answer()
-        logger.error(f"Manager {callback.from_user.id} provided invalid callback data: {callback.data}")
+        logger.error("Manager %s provided invalid callback data: %s", callback.from_user.id, callback.data)
         return
     user_id = int(parts[-1])
     await state.update_data(user_id=user_id)
@@ -175,7 +178,7 @@ async def process_remove_user_id(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(RemoveRole.waiting_for_reason)
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} selected user {user_id} for role removal.")
+    logger.info("Manager %s selected user %s for role removal.", callback.from_user.id, user_id)
 
 
 @router.message(RemoveRole.waiting_for_reason)
@@ -194,7 +197,7 @@ async def process_remove_reason(message: Message, state: FSMContext):
         reply_markup=get_confirmation_keyboard("confirm_remove_role", "cancel_remove_role")
     )
     await state.set_state(RemoveRole.waiting_for_confirmation)
-    logger.info(f"Manager {message.from_user.id} provided reason for role removal: {reason}")
+    logger.info("Manager %s provided reason for role removal: %s", message.from_user.id, reason)
 
 
 @router.callback_query(lambda c: c.data == "confirm_remove_role")
@@ -216,10 +219,10 @@ async def confirm_remove_role(callback: CallbackQuery, state: FSMContext):
             f"⚠️ Ваша роль была удалена.\nПричина: {reason}"
         )
     except:
-        logger.warning(f"Failed to notify user {user_id} about role removal.")
+        logger.warning("Failed to notify user %s about role removal.", user_id)
     await state.clear()
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} removed role from user {user_id} with reason: {reason}")
+    logger.info("Manager %s removed role from user %s with reason: %s", callback.from_user.id, user_id, reason)
 
 
 @router.callback_query(lambda c: c.data == "cancel_remove_role")
@@ -230,7 +233,7 @@ async def cancel_remove_role(callback: CallbackQuery, state: FSMContext):
     )
     await state.clear()
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} canceled role removal.")
+    logger.info("Manager %s canceled role removal.", callback.from_user.id)
 
 
 @router.callback_query(lambda c: c.data == "review_news")
@@ -245,7 +248,7 @@ async def review_news(callback: CallbackQuery, state: FSMContext):
             reply_markup=get_manager_panel()
         )
         await callback.answer()
-        logger.info(f"Manager {callback.from_user.id} tried to review news, but no pending news found.")
+        logger.info("Manager %s tried to review news, but no pending news found.", callback.from_user.id)
         return
 
     news = pending_news[0]
@@ -270,7 +273,7 @@ async def review_news(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(ReviewNews.waiting_for_action)
     await callback.answer()
-    logger.info(f"Manager {callback.from_user.id} started reviewing news ID {news['pending_id']}.")
+    logger.info("Manager %s started reviewing news ID %s.", callback.from_user.id, news['pending_id'])
 
 
 @router.callback_query(lambda c: c.data.startswith("approve_news_"))
@@ -287,7 +290,7 @@ async def approve_news_action(callback: CallbackQuery, state: FSMContext):
                 f"✅ Ваша новость (ID: {pending_id}) одобрена!"
             )
         except:
-            logger.warning(f"Failed to notify author {author_id} about news approval.")
+            logger.warning("Failed to notify author %s about news approval.", author_id)
 
         # Получаем информацию о новости для уведомления подписчиков
         news = await get_news_by_id(pending_id)
@@ -309,9 +312,9 @@ async def approve_news_action(callback: CallbackQuery, state: FSMContext):
                         user_id,
                         notification
                     )
-                    logger.info(f"Notified user {user_id} about new news in category {news['category']}.")
+                    logger.info("Notified user %s about new news in category %s.", user_id, news['category'])
                 except:
-                    logger.warning(f"Failed to notify user {user_id} about new news in category {news['category']}.")
+                    logger.warning("Failed to notify user %s about new news in category %s.", user_id, news['category'])
 
     data = await state.get_data()
     pending_news = data.get("pending_news", [])
@@ -345,7 +348,7 @@ async def approve_news_action(callback: CallbackQuery, state: FSMContext):
         )
         await state.clear()
     await callback.answer("✅ Новость одобрена!")
-    logger.info(f"Manager {callback.from_user.id} approved news ID {pending_id}.")
+    logger.info("Manager %s approved news ID %s.", callback.from_user.id, pending_id)
 
 
 @router.callback_query(lambda c: c.data.startswith("reject_news_"))
@@ -362,7 +365,7 @@ async def reject_news_action(callback: CallbackQuery, state: FSMContext):
                 f"❌ Ваша новость (ID: {pending_id}) отклонена."
             )
         except:
-            logger.warning(f"Failed to notify author {author_id} about news rejection.")
+            logger.warning("Failed to notify author %s about news rejection.", author_id)
 
     data = await state.get_data()
     pending_news = data.get("pending_news", [])
@@ -396,4 +399,4 @@ async def reject_news_action(callback: CallbackQuery, state: FSMContext):
         )
         await state.clear()
     await callback.answer("❌ Новость отклонена!")
-    logger.info(f"Manager {callback.from_user.id} rejected news ID {pending_id}.")
\ No newline at end of file
+    logger.info("Manager %s rejected news ID %s.", callback.from_user.id, pending_id)
\ No newline at end of file
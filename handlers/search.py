@@ -0,0 +1,156 @@
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.filters import Command, CommandObject
+from keyboards.inline import get_purchase_keyboard
+from utils.database import get_user_role, search_news, get_news_by_id, get_news_rating, check_limit, increment_limit
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = Router()
+
+SEARCH_PAGE_SIZE = 5
+
+
+class NewsSearch(StatesGroup):
+    query = State()
+
+
+def get_search_results_keyboard(results: list, offset: int, has_more: bool) -> InlineKeyboardMarkup:
+    buttons = [
+        [InlineKeyboardButton(text=f"📰 {item['title'][:40]}", callback_data=f"search_open_{item['news_id']}")]
+        for item in results
+    ]
+    navigation = []
+    if offset > 0:
+        navigation.append(InlineKeyboardButton(text="⬅️ Пред",
+                                               callback_data=f"search_page_{max(offset - SEARCH_PAGE_SIZE, 0)}"))
+    if has_more:
+        navigation.append(InlineKeyboardButton(text="След ➡️", callback_data=f"search_page_{offset + SEARCH_PAGE_SIZE}"))
+    if navigation:
+        buttons.append(navigation)
+    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="back_to_menu")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def format_search_results(query: str, results: list, offset: int) -> str:
+    if not results:
+        return f"🔎 По запросу «{query}» ничего не найдено."
+    text = f"🔎 Результаты по запросу «{query}»:\n\n"
+    for number, item in enumerate(results, start=offset + 1):
+        text += f"{number}. {item['title']}\n"
+        text += f"   {item['snippet']}\n"
+        text += f"   {item['category'].capitalize()} · {item['published_at']}\n\n"
+    return text
+
+
+@router.message(Command("search"))
+async def cmd_search(message: Message, command: CommandObject, state: FSMContext):
+    if not command.args:
+        await state.set_state(NewsSearch.query)
+        await message.answer("🔎 Введите текст для поиска новостей:")
+        return
+
+    query = command.args.strip()
+    results, has_more = await search_news(query, 0, SEARCH_PAGE_SIZE)
+    await state.set_state(None)
+    await state.update_data(search_query=query)
+    await message.answer(
+        format_search_results(query, results, 0),
+        reply_markup=get_search_results_keyboard(results, 0, has_more)
+    )
+    logger.info("User %s searched news: %s", message.from_user.id, query)
+
+
+@router.callback_query(F.data == "search_news")
+async def search_prompt(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(NewsSearch.query)
+    await callback.message.edit_text(
+        "🔎 Введите текст для поиска новостей:",
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔙 Назад", callback_data="back_to_menu")]
+        ])
+    )
+    await callback.answer()
+
+
+@router.message(NewsSearch.query, F.text)
+async def process_search_query(message: Message, state: FSMContext):
+    query = message.text.strip()
+    results, has_more = await search_news(query, 0, SEARCH_PAGE_SIZE)
+    await state.set_state(None)
+    await state.update_data(search_query=query)
+    await message.answer(
+        format_search_results(query, results, 0),
+        reply_markup=get_search_results_keyboard(results, 0, has_more)
+    )
+    logger.info("User %s searched news: %s", message.from_user.id, query)
+
+
+@router.callback_query(F.data.startswith("search_page_"))
+async def search_page(callback: CallbackQuery, state: FSMContext):
+    offset = int(callback.data.split("_")[2])
+    data = await state.get_data()
+    query = data.get("search_query")
+    if not query:
+        await callback.answer("ℹ️ Поиск устарел, выполните /search ещё раз.", show_alert=True)
+        return
+
+    results, has_more = await search_news(query, offset, SEARCH_PAGE_SIZE)
+    await state.update_data(search_offset=offset)
+    await callback.message.edit_text(
+        format_search_results(query, results, offset),
+        reply_markup=get_search_results_keyboard(results, offset, has_more)
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("search_open_"))
+async def search_open(callback: CallbackQuery, state: FSMContext):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role != "admin":  # Пропускаем проверку лимитов для админов
+        allowed, current_count, total_limit = await check_limit(user_id, "view_news")
+        if not allowed:
+            await callback.message.edit_text(
+                f"⚠️ У вас закончились лимиты на просмотр новостей ({current_count}/{total_limit})!\n"
+                "Хотите купить дополнительные просмотры? 💎",
+                reply_markup=get_purchase_keyboard("view_news")
+            )
+            await callback.answer()
+            logger.info("User %s reached view limit: %s/%s", user_id, current_count, total_limit)
+            return
+        await increment_limit(user_id, "view_news")
+
+    news_id = int(callback.data.split("_")[2])
+    news_item = await get_news_by_id(news_id)
+    if not news_item:
+        await callback.answer("❌ Новость не найдена.", show_alert=True)
+        return
+
+    data = await state.get_data()
+    likes, dislikes = await get_news_rating(news_id)
+    response = (
+        f"📰 Новость (ID: {news_item['news_id']})\n"
+        f"Категория: {news_item['category'].capitalize()}\n"
+        f"Заголовок: {news_item['title']}\n"
+        f"Описание: {news_item['description']}\n"
+    )
+    if news_item['image_url']:
+        response += f"🖼 Картинка: {news_item['image_url']}\n"
+    response += f"Источник: {news_item['source']}\n"
+    response += f"Опубликовано: {news_item['published_at']}\n"
+    response += f"Рейтинг: 👍 {likes} | 👎 {dislikes}"
+
+    await callback.message.edit_text(
+        response,
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔙 К результатам",
+                                  callback_data=f"search_page_{data.get('search_offset', 0)}")]
+        ])
+    )
+    await callback.answer()
+    logger.info("User %s opened news ID %s from search.", user_id, news_id)
+
@@ -7,13 +7,21 @@ from aiogram.filters import Command
 from keyboards.inline import get_menu_keyboard, get_categories_keyboard, get_news_navigation, get_sources_keyboard, \
     get_subscription_keyboard, get_purchase_keyboard, get_quantity_keyboard, get_profile_keyboard
 from utils.database import get_user_role, get_news, get_news_by_id, set_news_rating, get_news_rating, \
-    get_user_rating, get_user_stats, check_limit, increment_limit, add_limit, add_purchase, get_user_subscriptions, \
-    unsubscribe_from_category, subscribe_to_category, get_sources
-from utils.payment import create_payment, check_payment
-from utils.logger import logger
+    get_user_rating, get_user_stats, check_limit, increment_limit, get_user_subscriptions, \
+    unsubscribe_from_category, subscribe_to_category, get_sources, add_payment, get_payment, get_news_body, \
+    get_also_reported
+from utils.news import translate_body
+from utils.payment import create_payment
+from utils.payment_reconciler import refresh_payment
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 router = Router()
 
+# Максимальная длина текстового сообщения Telegram
+MESSAGE_LIMIT = 4096
+
 class NewsViewing(StatesGroup):
     viewing = State()
 
@@ -36,7 +44,7 @@ async def start(message: Message):
         greeting,
         reply_markup=get_menu_keyboard(role)
     )
-    logger.info(f"User {message.from_user.id} started bot. Role: {role}")
+    logger.info("User %s started bot. Role: %s", message.from_user.id, role)
 
 @router.callback_query(lambda c: c.data == "back_to_menu")
 async def back_to_menu(callback: CallbackQuery, state: FSMContext):
@@ -47,7 +55,7 @@ async def back_to_menu(callback: CallbackQuery, state: FSMContext):
     )
     await state.clear()
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} returned to main menu.")
+    logger.info("User %s returned to main menu.", callback.from_user.id)
 
 @router.callback_query(lambda c: c.data == "view_news")
 async def view_news(callback: CallbackQuery, state: FSMContext):
@@ -62,7 +70,7 @@ async def view_news(callback: CallbackQuery, state: FSMContext):
                 reply_markup=get_purchase_keyboard("view_news")
             )
             await callback.answer()
-            logger.info(f"User {user_id} reached view limit: {current_count}/{total_limit}")
+            logger.info("User %s reached view limit: %s/%s", user_id, current_count, total_limit)
             return
 
     await callback.message.edit_text(
@@ -71,7 +79,7 @@ async def view_news(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(NewsViewing.viewing)
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} started viewing news.")
+    logger.info("User %s started viewing news.", callback.from_user.id)
 
 @router.callback_query(lambda c: c.data.startswith("category_"), NewsViewing.viewing)
 async def select_category(callback: CallbackQuery, state: FSMContext):
@@ -86,7 +94,7 @@ async def select_category(callback: CallbackQuery, state: FSMContext):
                 reply_markup=get_purchase_keyboard("view_news")
             )
             await callback.answer()
-            logger.info(f"User {user_id} reached view limit: {current_count}/{total_limit}")
+            logger.info("User %s reached view limit: %s/%s", user_id, current_count, total_limit)
             return
         await increment_limit(user_id, "view_news")
 
@@ -98,7 +106,7 @@ async def select_category(callback: CallbackQuery, state: FSMContext):
             reply_markup=get_categories_keyboard()
         )
         await callback.answer()
-        logger.info(f"User {callback.from_user.id} found no news in category {category}.")
+        logger.info("User %s found no news in category %s.", callback.from_user.id, category)
         return
 
     await state.update_data(news=news, current_index=0, category=category)
@@ -124,7 +132,7 @@ async def select_category(callback: CallbackQuery, state: FSMContext):
         reply_markup=get_news_navigation(news, 0, category)
     )
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} viewed news ID {news_item['news_id']} in category {category}.")
+    logger.info("User %s viewed news ID %s in category %s.", callback.from_user.id, news_item['news_id'], category)
 
 @router.callback_query(lambda c: c.data.startswith("prev_news_") or c.data.startswith("next_news_"),
                        NewsViewing.viewing)
@@ -140,7 +148,7 @@ async def navigate_news(callback: CallbackQuery, state: FSMContext):
                 reply_markup=get_purchase_keyboard("view_news")
             )
             await callback.answer()
-            logger.info(f"User {user_id} reached view limit: {current_count}/{total_limit}")
+            logger.info("User %s reached view limit: %s/%s", user_id, current_count, total_limit)
             return
         await increment_limit(user_id, "view_news")
 
@@ -177,7 +185,7 @@ async def navigate_news(callback: CallbackQuery, state: FSMContext):
         reply_markup=get_news_navigation(news, current_index, category)
     )
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} navigated to news ID {news_item['news_id']} in category {category}.")
+    logger.info("User %s navigated to news ID %s in category %s.", callback.from_user.id, news_item['news_id'], category)
 
 @router.callback_query(lambda c: c.data.startswith("like_news_"))
 async def like_news(callback: CallbackQuery, state: FSMContext):
@@ -209,7 +217,7 @@ async def like_news(callback: CallbackQuery, state: FSMContext):
         reply_markup=get_news_navigation(news, current_index, category)
     )
     await callback.answer("👍 Вы поставили лайк!")
-    logger.info(f"User {callback.from_user.id} liked news ID {news_id}.")
+    logger.info("User %s liked news ID %s.", callback.from_user.id, news_id)
 
 @router.callback_query(lambda c: c.data.startswith("dislike_news_"))
 async def dislike_news(callback: CallbackQuery, state: FSMContext):
@@ -241,7 +249,39 @@ async def dislike_news(callback: CallbackQuery, state: FSMContext):
         reply_markup=get_news_navigation(news, current_index, category)
     )
     await callback.answer("👎 Вы поставили дизлайк!")
-    logger.info(f"User {callback.from_user.id} disliked news ID {news_id}.")
+    logger.info("User %s disliked news ID %s.", callback.from_user.id, news_id)
+
+@router.callback_query(lambda c: c.data.startswith("full_text_"))
+async def show_full_text(callback: CallbackQuery):
+    news_id = int(callback.data.split("_")[2])
+    body = await get_news_body(news_id)
+    if not body:
+        await callback.answer("📭 Полный текст для этой новости не сохранён.", show_alert=True)
+        return
+    translated = await translate_body(news_id, body)
+    if translated is None:
+        body = f"🌐 Перевести не удалось, текст на языке оригинала:\n\n{body}"
+    else:
+        body = translated
+    # Длинный текст отправляем несколькими сообщениями
+    for start in range(0, len(body), MESSAGE_LIMIT):
+        await callback.message.answer(body[start:start + MESSAGE_LIMIT])
+    await callback.answer()
+    logger.info("User %s opened full text of news ID %s (%s chars).", callback.from_user.id, news_id, len(body))
+
+@router.callback_query(lambda c: c.data.startswith("also_reported_"))
+async def show_also_reported(callback: CallbackQuery):
+    news_id = int(callback.data.split("_")[2])
+    reports = await get_also_reported(news_id)
+    if not reports:
+        await callback.answer("📭 Другие источники об этом не писали.", show_alert=True)
+        return
+    text = "🔁 Об этом также сообщили:\n"
+    for report in reports:
+        text += f"• {report['source']} ({report['published_at']}): {report['title']}\n"
+    await callback.message.answer(text[:MESSAGE_LIMIT])
+    await callback.answer()
+    logger.info("User %s viewed %s other reports of news ID %s.", callback.from_user.id, len(reports), news_id)
 
 @router.callback_query(lambda c: c.data == "filter_sources")
 async def filter_sources(callback: CallbackQuery, state: FSMContext):
@@ -251,7 +291,7 @@ async def filter_sources(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(SourceFiltering.filtering)
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} started filtering sources.")
+    logger.info("User %s started filtering sources.", callback.from_user.id)
 
 @router.callback_query(lambda c: c.data.startswith("category_"), SourceFiltering.filtering)
 async def select_source_category(callback: CallbackQuery, state: FSMContext):
@@ -263,7 +303,7 @@ async def select_source_category(callback: CallbackQuery, state: FSMContext):
             reply_markup=get_categories_keyboard()
         )
         await callback.answer()
-        logger.info(f"User {callback.from_user.id} found no sources in category {category}.")
+        logger.info("User %s found no sources in category %s.", callback.from_user.id, category)
         return
 
     await state.update_data(category=category)
@@ -272,7 +312,7 @@ async def select_source_category(callback: CallbackQuery, state: FSMContext):
         reply_markup=get_sources_keyboard(sources, category)
     )
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} viewed sources in category {category}.")
+    logger.info("User %s viewed sources in category %s.", callback.from_user.id, category)
 
 @router.callback_query(lambda c: c.data.startswith("source_"), SourceFiltering.filtering)
 async def view_source(callback: CallbackQuery, state: FSMContext):
@@ -285,7 +325,7 @@ async def view_source(callback: CallbackQuery, state: FSMContext):
         reply_markup=get_sources_keyboard(sources, category)
     )
     await callback.answer("ℹ️ Это источник новостей.")
-    logger.info(f"User {callback.from_user.id} viewed source ID {source_id} in category {category}.")
+    logger.info("User %s viewed source ID %s in category %s.", callback.from_user.id, source_id, category)
 
 @router.callback_query(lambda c: c.data == "profile")
 async def show_profile(callback: CallbackQuery):
@@ -323,7 +363,7 @@ async def show_profile(callback: CallbackQuery):
         reply_markup=get_profile_keyboard(stats["role"])
     )
     await callback.answer()
-    logger.info(f"User {user_id} viewed their profile.")
+    logger.info("User %s viewed their profile.", user_id)
 
 @router.callback_query(lambda c: c.data == "manage_subscriptions")
 async def manage_subscriptions(callback: CallbackQuery):
@@ -335,7 +375,7 @@ async def manage_subscriptions(callback: CallbackQuery):
         reply_markup=get_subscription_keyboard(subscribed_categories)
     )
     await callback.answer()
-    logger.info(f"User {user_id} opened subscription management.")
+    logger.info("User %s opened subscription management.", user_id)
 
 @router.callback_query(lambda c: c.data.startswith("subscribe_"))
 async def subscribe_category(callback: CallbackQuery):
@@ -348,7 +388,7 @@ async def subscribe_category(callback: CallbackQuery):
             reply_markup=get_subscription_keyboard(subscribed_categories)
         )
         await callback.answer(f"✅ Вы подписались на категорию {category.capitalize()}!")
-        logger.info(f"User {user_id} subscribed to category {category}.")
+        logger.info("User %s subscribed to category %s.", user_id, category)
     else:
         await callback.answer("❌ Ошибка при подписке. Попробуйте снова.", show_alert=True)
 
@@ -363,7 +403,7 @@ async def unsubscribe_category(callback: CallbackQuery):
             reply_markup=get_subscription_keyboard(subscribed_categories)
         )
         await callback.answer(f"❌ Вы отписались от категории {category.capitalize()}!")
-        logger.info(f"User {user_id} unsubscribed from category {category}.")
+        logger.info("User %s unsubscribed from category %s.", user_id, category)
     else:
         await callback.answer("❌ Ошибка при отписке. Попробуйте снова.", show_alert=True)
 
@@ -395,7 +435,7 @@ async def buy_limits(callback: CallbackQuery):
             reply_markup=kb
         )
     await callback.answer()
-    logger.info(f"User {user_id} opened buy limits menu: {action}")
+    logger.info("User %s opened buy limits menu: %s", user_id, action)
 
 @router.callback_query(lambda c: c.data.startswith("purchase_"))
 async def process_purchase(callback: CallbackQuery, state: FSMContext):
@@ -414,11 +454,12 @@ async def process_purchase(callback: CallbackQuery, state: FSMContext):
             reply_markup=get_menu_keyboard(await get_user_role(user_id))
         )
         await callback.answer()
-        logger.error(f"Failed to create payment for user {user_id}")
+        logger.error("Failed to create payment for user %s", user_id)
         return
 
     payment_id = payment["id"]
     confirmation_url = payment["confirmation"]["confirmation_url"]
+    await add_payment(payment_id, user_id, action_type, quantity, cost)
 
     await state.update_data(payment_id=payment_id, action_type=action_type, quantity=quantity, cost=cost)
 
@@ -431,14 +472,16 @@ async def process_purchase(callback: CallbackQuery, state: FSMContext):
         ])
     )
     await callback.answer()
-    logger.info(f"User {user_id} created payment {payment_id} for {quantity} {action_type}.")
+    logger.info("User %s created payment %s for %s %s.", user_id, payment_id, quantity, action_type)
 
 @router.callback_query(lambda c: c.data.startswith("check_payment_"))
 async def check_payment_status(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     payment_id = callback.data.split("_")[2]
-    data = await state.get_data()
-    if data.get("payment_id") != payment_id:
+    # Статус платежа обновляет фоновая сверка (utils/payment_reconciler.py); если запись ещё pending,
+    # проверяем её в ЮKassa сами
+    payment = await get_payment(payment_id)
+    if not payment or payment["user_id"] != user_id:
         await callback.message.edit_text(
             "❌ Неверный ID платежа.",
             reply_markup=get_menu_keyboard(await get_user_role(user_id))
@@ -446,24 +489,17 @@ async def check_payment_status(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    payment = await check_payment(payment_id)
-    if not payment:
-        await callback.message.edit_text(
-            "❌ Ошибка при проверке платежа. Попробуйте позже.",
-            reply_markup=get_menu_keyboard(await get_user_role(user_id))
-        )
-        await callback.answer()
-        return
+    if payment["status"] == "pending":
+        # Частые нажатия дают не больше одного запроса к ЮKassa на платёж за несколько секунд
+        if await refresh_payment(payment_id) in ["succeeded", "canceled"]:
+            payment = await get_payment(payment_id)
 
     if payment["status"] == "succeeded":
-        action_type = data["action_type"]
-        quantity = data["quantity"]
-        cost = data["cost"]
+        action_type = payment["action_type"]
+        quantity = payment["quantity"]
+        cost = payment["cost"]
         action_text = "просмотров" if action_type == "view_news" else "постов"
 
-        await add_limit(user_id, action_type, quantity)
-        await add_purchase(user_id, action_type, quantity, cost)
-
         stats = await get_user_stats(user_id)
         response = f"🎉 Оплата прошла успешно!\n"
         response += f"Вы приобрели {quantity} {action_text} за {cost}₽.\n\n"
@@ -499,7 +535,15 @@ async def check_payment_status(callback: CallbackQuery, state: FSMContext):
         )
         await state.clear()
         await callback.answer()
-        logger.info(f"User {user_id} successfully purchased {quantity} {action_type} for {cost}₽.")
+        logger.info("User %s successfully purchased %s %s for %s₽.", user_id, quantity, action_type, cost)
+    elif payment["status"] in ["canceled", "expired"]:
+        await callback.message.edit_text(
+            "❌ Платёж отменён. Попробуйте оформить покупку заново.",
+            reply_markup=get_menu_keyboard(await get_user_role(user_id))
+        )
+        await state.clear()
+        await callback.answer()
+        logger.info("User %s checked payment %s, status: %s.", user_id, payment_id, payment['status'])
     else:
         await callback.message.edit_text(
             f"⏳ Платёж ещё не завершён (статус: {payment['status']}).\n"
@@ -510,4 +554,4 @@ async def check_payment_status(callback: CallbackQuery, state: FSMContext):
             ])
         )
         await callback.answer()
-        logger.info(f"User {user_id} checked payment {payment_id}, status: {payment['status']}.")
\ No newline at end of file
+        logger.info("User %s checked payment %s, status: %s.", user_id, payment_id, payment['status'])
\ No newline at end of file
@@ -2,14 +2,19 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from keyboards.inline import get_writer_news_keyboard
-from utils.database import get_user_role, insert_pending_news, get_writer_news, update_pending_news, delete_pending_news
-from utils.logger import logger
+from keyboards.inline import get_writer_news_keyboard, get_writer_items_keyboard
+from utils.database import get_user_role, insert_pending_news, update_pending_news, delete_pending_news, \
+    get_writer_counts, list_writer_news, get_writer_item
+from utils.logger import get_logger
 from utils.database import check_limit, increment_limit
 from aiogram.exceptions import TelegramBadRequest
 
+logger = get_logger(__name__)
+
 router = Router()
 
+WRITER_PAGE_SIZE = 10
+
 class NewsCreation(StatesGroup):
     title = State()
     description = State()
@@ -27,7 +32,7 @@ async def writer_panel(callback: CallbackQuery):
         await callback.answer("🚫 Доступ запрещён!", show_alert=True)
         return
 
-    published, pending = await get_writer_news(user_id)
+    published, pending = await get_writer_counts(user_id)
     if not published and not pending:
         new_text = "✍️ Панель писателя\nУ вас пока нет своих новостей 📭\nНажмите 'Создать новость' ниже, чтобы написать статью 👇"
     else:
@@ -44,14 +49,32 @@ async def writer_panel(callback: CallbackQuery):
         if "message is not modified" in str(e):
             await callback.answer("ℹ️ Панель уже открыта.")
         else:
-            logger.error(f"Error in writer_panel for user {user_id}: {str(e)}")
+            logger.error("Error in writer_panel for user %s: %s", user_id, e)
             raise
     except Exception as e:
-        logger.error(f"Error in writer_panel for user {user_id}: {str(e)}")
+        logger.error("Error in writer_panel for user %s: %s", user_id, e)
         raise
 
     await callback.answer()
-    logger.info(f"User {user_id} opened writer panel.")
+    logger.info("User %s opened writer panel.", user_id)
+
+@router.callback_query(lambda c: c.data.startswith("writer_list_"))
+async def writer_list(callback: CallbackQuery):
+    user_id = callback.from_user.id
+    role = await get_user_role(user_id)
+    if role != "writer":
+        await callback.answer("🚫 Доступ запрещён!", show_alert=True)
+        return
+
+    news_type, cursor = callback.data.split("_")[2], int(callback.data.split("_")[3])
+    items, next_cursor = await list_writer_news(user_id, news_type == "published", cursor, WRITER_PAGE_SIZE)
+    title = "📢 Опубликованные новости" if news_type == "published" else "⏳ Новости на проверке"
+    await callback.message.edit_text(
+        title if items else f"{title}\n📭 Новостей нет.",
+        reply_markup=get_writer_items_keyboard(items, news_type, next_cursor, is_first_page=(cursor == 0))
+    )
+    await callback.answer()
+    logger.info("User %s opened %s news list after ID %s.", user_id, news_type, cursor)
 
 @router.callback_query(lambda c: c.data == "create_news")
 async def create_news(callback: CallbackQuery, state: FSMContext):
@@ -69,7 +92,7 @@ async def create_news(callback: CallbackQuery, state: FSMContext):
                 ])
             )
             await callback.answer()
-            logger.info(f"User {user_id} reached create limit: {current_count}/{total_limit}")
+            logger.info("User %s reached create limit: %s/%s", user_id, current_count, total_limit)
             return
 
     await state.clear()
@@ -78,25 +101,25 @@ async def create_news(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(NewsCreation.title)
     current_state = await state.get_state()
-    logger.info(f"User {callback.from_user.id} started creating news. Set state: {current_state}")
+    logger.info("User %s started creating news. Set state: %s", callback.from_user.id, current_state)
     await callback.answer()
 
 @router.message(NewsCreation.title, F.text)
 async def process_title(message: Message, state: FSMContext):
     current_state = await state.get_state()
-    logger.info(f"Processing title for user {message.from_user.id}. Current state: {current_state}")
+    logger.info("Processing title for user %s. Current state: %s", message.from_user.id, current_state)
     await state.update_data(title=message.text)
     await message.answer("Введите описание новости:")
     await state.set_state(NewsCreation.description)
     new_state = await state.get_state()
-    logger.info(f"User {message.from_user.id} set news title: {message.text}. New state: {new_state}")
+    logger.info("User %s set news title: %s. New state: %s", message.from_user.id, message.text, new_state)
 
 @router.message(NewsCreation.description)
 async def process_description(message: Message, state: FSMContext):
     await state.update_data(description=message.text)
     await message.answer("Введите URL картинки (или пропустите, отправив '-'):")
     await state.set_state(NewsCreation.image_url)
-    logger.info(f"User {message.from_user.id} set news description: {message.text}")
+    logger.info("User %s set news description (%s chars)", message.from_user.id, len(message.text or ""))
 
 @router.message(NewsCreation.image_url)
 async def process_image_url(message: Message, state: FSMContext):
@@ -113,7 +136,7 @@ async def process_image_url(message: Message, state: FSMContext):
         ])
     )
     await state.set_state(NewsCreation.category)
-    logger.info(f"User {message.from_user.id} set news image URL: {image_url}")
+    logger.info("User %s set news image URL: %s", message.from_user.id, image_url)
 
 @router.callback_query(lambda c: c.data.startswith("category_"), NewsCreation.category)
 async def process_category(callback: CallbackQuery, state: FSMContext):
@@ -129,7 +152,7 @@ async def process_category(callback: CallbackQuery, state: FSMContext):
     image_url = data["image_url"]
 
     pending_id = await insert_pending_news(user_id, title, description, image_url, category)
-    published, pending = await get_writer_news(user_id)
+    published, pending = await get_writer_counts(user_id)
 
     await callback.message.edit_text(
         f"✅ Новость отправлена на проверку! ID: {pending_id}\n",
@@ -137,19 +160,15 @@ async def process_category(callback: CallbackQuery, state: FSMContext):
     )
     await state.clear()
     await callback.answer()
-    logger.info(f"User {user_id} created pending news ID {pending_id} in category {category}.")
+    logger.info("User %s created pending news ID %s in category %s.", user_id, pending_id, category)
 
 @router.callback_query(lambda c: c.data.startswith("edit_published_") or c.data.startswith("edit_pending_"))
 async def edit_news(callback: CallbackQuery, state: FSMContext):
     news_type, news_id = callback.data.split("_")[1], int(callback.data.split("_")[2])
-    published, pending = await get_writer_news(callback.from_user.id)
-    news = None
-    for item in (published if news_type == "published" else pending):
-        if item[f"{news_type}_id"] == news_id:
-            news = item
-            break
+    news = await get_writer_item(callback.from_user.id, news_id, is_published=(news_type == "published"))
 
     if not news:
+        published, pending = await get_writer_counts(callback.from_user.id)
         await callback.message.edit_text(
             "❌ Новость не найдена.",
             reply_markup=get_writer_news_keyboard(published, pending)
@@ -165,7 +184,7 @@ async def edit_news(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(NewsEditing.editing)
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} started editing {news_type} news ID {news_id}.")
+    logger.info("User %s started editing %s news ID %s.", callback.from_user.id, news_type, news_id)
 
 @router.message(NewsEditing.editing)
 async def process_edit(message: Message, state: FSMContext):
@@ -174,14 +193,10 @@ async def process_edit(message: Message, state: FSMContext):
     news_type = data["news_type"]
     title = message.text if message.text != "-" else None
 
-    published, pending = await get_writer_news(message.from_user.id)
-    news = None
-    for item in (published if news_type == "published" else pending):
-        if item[f"{news_type}_id"] == news_id:
-            news = item
-            break
+    news = await get_writer_item(message.from_user.id, news_id, is_published=(news_type == "published"))
 
     if not news:
+        published, pending = await get_writer_counts(message.from_user.id)
         await message.answer(
             "❌ Новость не найдена.",
             reply_markup=get_writer_news_keyboard(published, pending)
@@ -201,7 +216,7 @@ async def process_edit(message: Message, state: FSMContext):
     )
     await state.update_data(title=news["title"], description=description, image_url=image_url, category=category)
     await state.set_state(NewsEditing.editing)
-    logger.info(f"User {message.from_user.id} updated title for {news_type} news ID {news_id}: {title}")
+    logger.info("User %s updated title for %s news ID %s: %s", message.from_user.id, news_type, news_id, title)
 
 @router.message(NewsEditing.editing)
 async def process_edit_description(message: Message, state: FSMContext):
@@ -213,7 +228,7 @@ async def process_edit_description(message: Message, state: FSMContext):
         f"Введите новый URL (или пропустите, отправив '-'):"
     )
     await state.set_state(NewsEditing.editing)
-    logger.info(f"User {message.from_user.id} updated description: {description}")
+    logger.info("User %s updated description (%s chars)", message.from_user.id, len(description or ""))
 
 @router.message(NewsEditing.editing)
 async def process_edit_image_url(message: Message, state: FSMContext):
@@ -231,7 +246,7 @@ async def process_edit_image_url(message: Message, state: FSMContext):
         ])
     )
     await state.set_state(NewsEditing.editing)
-    logger.info(f"User {message.from_user.id} updated image URL: {image_url}")
+    logger.info("User %s updated image URL: %s", message.from_user.id, image_url)
 
 @router.callback_query(lambda c: c.data.startswith("edit_category_"), NewsEditing.editing)
 async def process_edit_category(callback: CallbackQuery, state: FSMContext):
@@ -249,24 +264,24 @@ async def process_edit_category(callback: CallbackQuery, state: FSMContext):
         is_published=(news_type == "published")
     )
 
-    published, pending = await get_writer_news(callback.from_user.id)
+    published, pending = await get_writer_counts(callback.from_user.id)
     await callback.message.edit_text(
         f"✅ Новость ID {news_id} обновлена!",
         reply_markup=get_writer_news_keyboard(published, pending)
     )
     await state.clear()
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} updated {news_type} news ID {news_id} in category {category}.")
+    logger.info("User %s updated %s news ID %s in category %s.", callback.from_user.id, news_type, news_id, category)
 
 @router.callback_query(lambda c: c.data.startswith("delete_published_") or c.data.startswith("delete_pending_"))
 async def delete_news(callback: CallbackQuery):
     news_type, news_id = callback.data.split("_")[1], int(callback.data.split("_")[2])
     await delete_pending_news(news_id, is_published=(news_type == "published"))
-    published, pending = await get_writer_news(callback.from_user.id)
+    published, pending = await get_writer_counts(callback.from_user.id)
 
     await callback.message.edit_text(
         f"🗑 Новость ID {news_id} удалена!",
         reply_markup=get_writer_news_keyboard(published, pending)
     )
     await callback.answer()
-    logger.info(f"User {callback.from_user.id} deleted {news_type} news ID {news_id}.")
\ No newline at end of file
+    logger.info("User %s deleted %s news ID %s.", callback.from_user.id, news_type, news_id)
\ No newline at end of file
@@ -5,6 +5,7 @@ from config.config import RSS_FEEDS
 def get_menu_keyboard(role: str) -> InlineKeyboardMarkup:
     buttons = [
         [InlineKeyboardButton(text="📖 Посмотреть новости", callback_data="view_news")],
+        [InlineKeyboardButton(text="🔎 Поиск новостей", callback_data="search_news")],
         [InlineKeyboardButton(text="🔔 Управление подписками", callback_data="manage_subscriptions")],
         [InlineKeyboardButton(text="📡 Фильтровать источники", callback_data="filter_sources")],
         [InlineKeyboardButton(text="👤 Личный кабинет", callback_data="profile")],
@@ -54,58 +55,63 @@ def get_news_navigation(news: list, current_index: int, category: str) -> Inline
     row.append(InlineKeyboardButton(text="👍 Лайк", callback_data=f"like_news_{news[current_index]['news_id']}"))
     row.append(InlineKeyboardButton(text="👎 Дизлайк", callback_data=f"dislike_news_{news[current_index]['news_id']}"))
     buttons_row = [row]
+    if news[current_index].get("has_body"):
+        buttons_row.append([InlineKeyboardButton(text="📖 Полный текст",
+                                                 callback_data=f"full_text_{news[current_index]['news_id']}")])
+    if news[current_index].get("also_reported"):
+        buttons_row.append([InlineKeyboardButton(text=f"🔁 Также сообщили ({news[current_index]['also_reported']})",
+                                                 callback_data=f"also_reported_{news[current_index]['news_id']}")])
     buttons_row.append([InlineKeyboardButton(text="🔙 Назад", callback_data=f"category_{category}")])
     return InlineKeyboardMarkup(inline_keyboard=buttons_row)
 
 
-def get_writer_news_keyboard(published: list, pending: list) -> InlineKeyboardMarkup:
+def get_writer_news_keyboard(published_count: int, pending_count: int) -> InlineKeyboardMarkup:
     buttons = []
 
     # Добавляем кнопку "Создать новость" всегда
     buttons.append([InlineKeyboardButton(text="🖌 Создать новость", callback_data="create_news")])
 
-    # Отображаем опубликованные новости
-    if published:
-        buttons.append([InlineKeyboardButton(text="📢 Опубликованные новости", callback_data="view_published")])
-        for news in published:
-            buttons.append([
-                InlineKeyboardButton(
-                    text=f"📰 {news['title'][:20]}...",
-                    callback_data=f"view_published_{news['news_id']}"
-                ),
-                InlineKeyboardButton(
-                    text="✏️ Редактировать",
-                    callback_data=f"edit_published_{news['news_id']}"
-                ),
-                InlineKeyboardButton(
-                    text="🗑 Удалить",
-                    callback_data=f"delete_published_{news['news_id']}"
-                ),
-            ])
-
-    # Отображаем новости на проверке
-    if pending:
-        buttons.append([InlineKeyboardButton(text="⏳ Новости на проверке", callback_data="view_pending")])
-        for news in pending:
-            buttons.append([
-                InlineKeyboardButton(
-                    text=f"📰 {news['title'][:20]}...",
-                    callback_data=f"view_pending_{news['pending_id']}"
-                ),
-                InlineKeyboardButton(
-                    text="✏️ Редактировать",
-                    callback_data=f"edit_pending_{news['pending_id']}"
-                ),
-                InlineKeyboardButton(
-                    text="🗑 Удалить",
-                    callback_data=f"delete_pending_{news['pending_id']}"
-                ),
-            ])
+    if published_count:
+        buttons.append([InlineKeyboardButton(text=f"📢 Опубликованные новости ({published_count})",
+                                             callback_data="writer_list_published_0")])
+    if pending_count:
+        buttons.append([InlineKeyboardButton(text=f"⏳ Новости на проверке ({pending_count})",
+                                             callback_data="writer_list_pending_0")])
 
     buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="back_to_menu")])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+def get_writer_items_keyboard(items: list, news_type: str, next_cursor: int = None,
+                              is_first_page: bool = True) -> InlineKeyboardMarkup:
+    buttons = [
+        [
+            InlineKeyboardButton(
+                text=f"📰 {item['title'][:20]}...",
+                callback_data=f"view_{news_type}_{item['id']}"
+            ),
+            InlineKeyboardButton(
+                text="✏️ Редактировать",
+                callback_data=f"edit_{news_type}_{item['id']}"
+            ),
+            InlineKeyboardButton(
+                text="🗑 Удалить",
+                callback_data=f"delete_{news_type}_{item['id']}"
+            ),
+        ]
+        for item in items
+    ]
+    navigation = []
+    if not is_first_page:
+        navigation.append(InlineKeyboardButton(text="⏮ В начало", callback_data=f"writer_list_{news_type}_0"))
+    if next_cursor is not None:
+        navigation.append(InlineKeyboardButton(text="Далее ➡️", callback_data=f"writer_list_{news_type}_{next_cursor}"))
+    if navigation:
+        buttons.append(navigation)
+    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="writer_panel")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
 def get_sources_keyboard(sources: list, category: str) -> InlineKeyboardMarkup:
     buttons = [
         [InlineKeyboardButton(text=f"🌐 {source['url'][:20]}...",
@@ -155,6 +161,7 @@ def get_admin_keyboard() -> InlineKeyboardMarkup:
     buttons = [
         [InlineKeyboardButton(text="📋 Проверить новости", callback_data="review_news")],
         [InlineKeyboardButton(text="👥 Управление ролями", callback_data="manage_roles")],
+        [InlineKeyboardButton(text="🩺 Состояние источников", callback_data="source_health")],
         [InlineKeyboardButton(text="🔙 Назад", callback_data="back_to_menu")]
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
@@ -188,14 +195,53 @@ def get_role_selection_keyboard(user_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def get_pending_news_keyboard(news: list) -> InlineKeyboardMarkup:
+def get_pending_news_keyboard(news: list, next_cursor: int = None, is_first_page: bool = True,
+                              selected: list = None) -> InlineKeyboardMarkup:
+    selected = set(selected or [])
     buttons = [
         [
+            InlineKeyboardButton(text="☑️" if n['pending_id'] in selected else "⬜",
+                                 callback_data=f"toggle_pending_{n['pending_id']}"),
             InlineKeyboardButton(text=f"📰 {n['title'][:20]}...", callback_data=f"view_pending_{n['pending_id']}"),
             InlineKeyboardButton(text="✅ Одобрить", callback_data=f"approve_{n['pending_id']}"),
             InlineKeyboardButton(text="❌ Отклонить", callback_data=f"reject_{n['pending_id']}")
         ]
         for n in news
     ]
+    if selected:
+        buttons.append([
+            InlineKeyboardButton(text=f"✅ Одобрить выбранные ({len(selected)})", callback_data="bulk_approve_selected"),
+            InlineKeyboardButton(text="❌ Отклонить выбранные", callback_data="bulk_reject_selected"),
+        ])
+    buttons.append([InlineKeyboardButton(text="✅ Одобрить все на странице", callback_data="bulk_approve_page")])
+    buttons.append([InlineKeyboardButton(text="📡 Одобрить по источнику", callback_data="review_sources")])
+    navigation = []
+    if not is_first_page:
+        navigation.append(InlineKeyboardButton(text="⏮ В начало", callback_data="review_news"))
+    if next_cursor is not None:
+        navigation.append(InlineKeyboardButton(text="Далее ➡️", callback_data=f"review_page_{next_cursor}"))
+    if navigation:
+        buttons.append(navigation)
+    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="admin_panel")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def get_pending_sources_keyboard(sources: list) -> InlineKeyboardMarkup:
+    buttons = [
+        [InlineKeyboardButton(text=f"✅ {source['url'][:30]} ({source['count']})",
+                              callback_data=f"bulk_approve_source_{source['source_id']}")]
+        for source in sources
+    ]
+    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="review_news")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def get_source_health_keyboard(disabled_sources: list) -> InlineKeyboardMarkup:
+    buttons = [
+        [InlineKeyboardButton(text=f"♻️ Включить {source['url'][:30]}",
+                              callback_data=f"enable_source_{source['source_id']}")]
+        for source in disabled_sources
+    ]
+    buttons.append([InlineKeyboardButton(text="🔄 Обновить", callback_data="source_health")])
     buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="admin_panel")])
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
\ No newline at end of file
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
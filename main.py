@@ -2,31 +2,73 @@ import asyncio
 from aiogram import Dispatcher, Bot
 from aiogram.fsm.storage.memory import MemoryStorage
 from config.config import BOT_TOKEN, ADMIN_ID
-from handlers import user, admin, writer  # Убрали manager
+from handlers import user, admin, writer, search, inline  # Убрали manager
 from utils.database import init_db
-from utils.logger import logger
-from utils.news import start_news_fetching
+from utils.db_profiler import DB_PROFILE_DUMP, dump_query_report
+from utils.logger import get_logger, setup_logger
+from utils.loop_monitor import start_loop_monitor
+from utils.metrics import setup_metrics_middleware, start_metrics_server
+from utils.ingest import INGEST_IN_BOT, IngestService
+from utils.parse_pool import parse_pool
+from utils.payment import payment_client
+from utils.payment_reconciler import start_payment_reconciler
 
-async def main():
-    bot = Bot(token=BOT_TOKEN)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+logger = get_logger("main")
+
+def build_dispatcher(storage=None) -> Dispatcher:
+    """Собирает диспетчер со всеми роутерами и middleware (используется и бенчмарками)."""
+    dp = Dispatcher(storage=storage or MemoryStorage())
 
     dp.include_router(user.router)
     dp.include_router(admin.router)
     dp.include_router(writer.router)  # Убрали manager.router
+    dp.include_router(search.router)
+    dp.include_router(inline.router)
+    setup_metrics_middleware(dp)
+    return dp
+
+async def main():
+    setup_logger()
+    bot = Bot(token=BOT_TOKEN)
+    dp = build_dispatcher()
+
+    start_loop_monitor()
 
     await init_db()
     logger.info("Database initialized successfully.")
 
-    # Запуск фоновой задачи для получения новостей с переводом
-    asyncio.create_task(start_news_fetching(bot))
-    logger.info("Started background task for fetching news with translation.")
+    await payment_client.start()
+    metrics_runner = await start_metrics_server()
+
+    # Сбор новостей: внутри бота или отдельным процессом (python -m utils.ingest --daemon).
+    # Одновременно собирает только держатель аренды, так что несколько копий бота не дублируют сбор
+    ingest_task = None
+    if INGEST_IN_BOT:
+        await parse_pool.start()
+        ingest_task = asyncio.create_task(IngestService(bot).run_forever())
+        logger.info("Started background task for fetching news with translation.")
+    else:
+        logger.info("In-bot news fetching disabled (INGEST_IN_BOT=0), expecting a separate ingest process.")
+
+    reconciler_task = asyncio.create_task(start_payment_reconciler(bot))
+    logger.info("Started background payment reconciliation.")
 
     try:
         logger.info("Starting bot polling...")
         await dp.start_polling(bot)
     finally:
+        if ingest_task:
+            ingest_task.cancel()
+            await asyncio.gather(ingest_task, return_exceptions=True)
+        # Сверка не должна обращаться к ЮKassa после закрытия клиента
+        reconciler_task.cancel()
+        await asyncio.gather(reconciler_task, return_exceptions=True)
+        await payment_client.close()
+        await parse_pool.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        if DB_PROFILE_DUMP:
+            dump_query_report(DB_PROFILE_DUMP)
         await bot.session.close()
         logger.info("Bot polling stopped and session closed.")
 
@@ -36,4 +78,4 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logger.info("Bot stopped by user.")
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
\ No newline at end of file
+        logger.error("Unexpected error: %s", e)
\ No newline at end of file
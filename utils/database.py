@@ -1,12 +1,44 @@
 import aiosqlite
+import re
 from datetime import datetime
 import logging
-from utils.logger import logger
-from config.config import RSS_FEEDS  # Исправляем импорт
+from cachetools import TTLCache
+from utils.logger import get_logger
+from utils.metrics import db_timed
+from utils.db_profiler import DB_PROFILE, profiled_connect
+from utils.text_normalize import decompress_body
+from config.config import RSS_FEEDS, DB_PATH  # Исправляем импорт
 
+logger = get_logger(__name__)
 
+# Максимум id в одном IN (...), чтобы не упереться в лимит параметров SQLite
+BULK_CHUNK_SIZE = 500
+
+# Кэш количества новостей писателя: writer_id -> (published, pending)
+writer_counts_cache = TTLCache(maxsize=1024, ttl=60)
+# Кэш результатов поиска: (query, offset, limit) -> (results, has_more)
+search_cache = TTLCache(maxsize=256, ttl=60)
+
+
+def connect() -> aiosqlite.Connection:
+    """Соединение с базой; при DB_PROFILE=1 каждый запрос попадает в профилировщик."""
+    if DB_PROFILE:
+        return profiled_connect(DB_PATH)
+    return aiosqlite.connect(DB_PATH)
+
+
+async def add_column_if_missing(db: aiosqlite.Connection, table: str, column: str, definition: str):
+    """Добавляет колонку в существующую таблицу (CREATE TABLE IF NOT EXISTS не меняет старые схемы)."""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if column not in columns:
+        await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info("Added column %s.%s", table, column)
+
+
+@db_timed
 async def init_db():
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         logger.info("Initializing database schema...")
         await db.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -81,6 +113,138 @@ async def init_db():
             )
         """)
 
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS payments (
+                payment_id TEXT PRIMARY KEY,
+                user_id INTEGER,
+                action_type TEXT,
+                quantity INTEGER,
+                cost INTEGER,
+                status TEXT DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                checked_at TIMESTAMP,
+                next_check_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                credited_at TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(user_id)
+            )
+        """)
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_payments_due ON payments(status, next_check_at)")
+        # Один платёж — максимум одна покупка: повторное зачисление отсекается уникальным индексом
+        await add_column_if_missing(db, "purchases", "payment_id", "TEXT")
+        await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_purchases_payment ON purchases(payment_id)")
+
+        await add_column_if_missing(db, "pending_news", "source_id", "INTEGER REFERENCES sources(source_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_pending_news_source ON pending_news(source_id)")
+        # Полный текст RSS-записи, сжатый zlib; в description лежит только отрывок
+        await add_column_if_missing(db, "pending_news", "body", "BLOB")
+        await add_column_if_missing(db, "news", "body", "BLOB")
+        # MinHash-подпись RSS-записи; duplicate_of — новость-представитель, если это та же история
+        # из другого источника
+        await add_column_if_missing(db, "pending_news", "fingerprint", "BLOB")
+        await add_column_if_missing(db, "news", "fingerprint", "BLOB")
+        await add_column_if_missing(db, "news", "duplicate_of", "INTEGER REFERENCES news(news_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_news_duplicate_of ON news(duplicate_of)")
+
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_news_writer ON news(writer_id, news_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_pending_news_writer ON pending_news(writer_id, pending_id)")
+
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_news_category_published ON news(category, published_at)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_news_published ON news(published_at)")
+        # Время публикации из самой RSS-записи; при одобрении оно становится news.published_at
+        await add_column_if_missing(db, "pending_news", "published_at", "TIMESTAMP")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_ratings_news ON ratings(news_id)")
+
+        # Полнотекстовый индекс по заголовкам и описаниям, синхронизируется триггерами
+        cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'news_fts'")
+        fts_exists = await cursor.fetchone() is not None
+        await db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+                title,
+                description,
+                content='news',
+                content_rowid='news_id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS news_fts_ai AFTER INSERT ON news
+            BEGIN
+                INSERT INTO news_fts (rowid, title, description) VALUES (new.news_id, new.title, new.description);
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS news_fts_ad AFTER DELETE ON news
+            BEGIN
+                INSERT INTO news_fts (news_fts, rowid, title, description)
+                VALUES ('delete', old.news_id, old.title, old.description);
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS news_fts_au AFTER UPDATE OF title, description ON news
+            BEGIN
+                INSERT INTO news_fts (news_fts, rowid, title, description)
+                VALUES ('delete', old.news_id, old.title, old.description);
+                INSERT INTO news_fts (rowid, title, description) VALUES (new.news_id, new.title, new.description);
+            END
+        """)
+        if not fts_exists:
+            logger.info("Building full-text index for existing news...")
+            await db.execute("INSERT INTO news_fts (news_fts) VALUES ('rebuild')")
+
+        # Счётчики размера очередей поддерживаются триггерами, чтобы не делать COUNT(*) на каждый экран
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS pending_news_count_ai AFTER INSERT ON pending_news
+            BEGIN
+                UPDATE counters SET value = value + 1 WHERE name = 'pending_news';
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS pending_news_count_ad AFTER DELETE ON pending_news
+            BEGIN
+                UPDATE counters SET value = value - 1 WHERE name = 'pending_news';
+            END
+        """)
+        await db.execute(
+            "INSERT OR REPLACE INTO counters (name, value) VALUES ('pending_news', (SELECT COUNT(*) FROM pending_news))"
+        )
+
+        # Состояние RSS-источников: ошибки подряд, задержка, размер ответа и «автомат» (circuit breaker)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS source_health (
+                source_id INTEGER PRIMARY KEY,
+                consecutive_failures INTEGER DEFAULT 0,
+                total_failures INTEGER DEFAULT 0,
+                total_successes INTEGER DEFAULT 0,
+                last_success_at TIMESTAMP,
+                last_failure_at TIMESTAMP,
+                last_error TEXT,
+                avg_latency_ms REAL,
+                avg_bytes REAL,
+                open_until TIMESTAMP,
+                disabled_at TIMESTAMP,
+                FOREIGN KEY (source_id) REFERENCES sources(source_id)
+            )
+        """)
+        # Время (unix) самой свежей обработанной записи источника: более старые записи больше не разбираются
+        await add_column_if_missing(db, "source_health", "high_water_mark", "INTEGER")
+
+        # Аренды фоновых задач: задачу вроде сбора RSS выполняет только держатель неистёкшей аренды
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP NOT NULL
+            )
+        """)
+
         cursor = await db.execute("SELECT COUNT(*) FROM sources")
         sources_count = (await cursor.fetchone())[0]
 
@@ -99,15 +263,17 @@ async def init_db():
         logger.info("Database schema initialized successfully")
 
 
+@db_timed
 async def get_user_role(user_id: int) -> str:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute("SELECT role FROM users WHERE user_id = ?", (user_id,))
         row = await cursor.fetchone()
         return row[0] if row else "user"
 
 
+@db_timed
 async def set_user_role(user_id: int, role: str):
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         await db.execute(
             "INSERT OR REPLACE INTO users (user_id, role, view_count, view_limit, create_count, create_limit) "
             "VALUES (?, ?, (SELECT view_count FROM users WHERE user_id = ?), "
@@ -119,8 +285,9 @@ async def set_user_role(user_id: int, role: str):
         await db.commit()
 
 
+@db_timed
 async def remove_user_role(user_id: int, role: str) -> bool:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute("SELECT role FROM users WHERE user_id = ?", (user_id,))
         current_role = (await cursor.fetchone())[0]
         if current_role == role:
@@ -130,24 +297,32 @@ async def remove_user_role(user_id: int, role: str) -> bool:
         return False
 
 
+@db_timed
 async def get_users_by_role(role: str) -> list:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute("SELECT user_id FROM users WHERE role = ?", (role,))
         return [{"user_id": row[0]} for row in await cursor.fetchall()]
 
 
-async def insert_pending_news(writer_id: int, title: str, description: str, image_url: str, category: str) -> int:
-    async with aiosqlite.connect("news_bot.db") as db:
+@db_timed
+async def insert_pending_news(writer_id: int, title: str, description: str, image_url: str, category: str,
+                              source_id: int = None, body: bytes = None, fingerprint: bytes = None,
+                              published: int = None) -> int:
+    """published — unix-время публикации из источника; для новостей писателей не задаётся."""
+    async with connect() as db:
         cursor = await db.execute(
-            "INSERT INTO pending_news (category, title, description, image_url, writer_id) VALUES (?, ?, ?, ?, ?)",
-            (category, title, description, image_url, writer_id)
+            "INSERT INTO pending_news (category, title, description, image_url, writer_id, source_id, body, "
+            "fingerprint, published_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime(?, 'unixepoch'))",
+            (category, title, description, image_url, writer_id, source_id, body, fingerprint, published)
         )
         await db.commit()
+        writer_counts_cache.pop(writer_id, None)
         return cursor.lastrowid
 
 
+@db_timed
 async def get_pending_news() -> list:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT pending_id, category, title, description, image_url, writer_id, created_at FROM pending_news"
         )
@@ -165,28 +340,142 @@ async def get_pending_news() -> list:
         ]
 
 
-async def approve_news(pending_id: int) -> int:
-    async with aiosqlite.connect("news_bot.db") as db:
+@db_timed
+async def get_pending_by_id(pending_id: int) -> dict:
+    async with connect() as db:
         cursor = await db.execute(
-            "SELECT category, title, description, image_url, writer_id FROM pending_news WHERE pending_id = ?",
+            "SELECT pending_id, category, title, description, image_url, writer_id, created_at "
+            "FROM pending_news WHERE pending_id = ?",
             (pending_id,)
         )
         row = await cursor.fetchone()
-        if not row:
-            return None
-        category, title, description, image_url, writer_id = row
+        if row:
+            return {
+                "pending_id": row[0],
+                "category": row[1],
+                "title": row[2],
+                "description": row[3],
+                "image_url": row[4],
+                "writer_id": row[5],
+                "created_at": row[6],
+            }
+        return None
+
+
+@db_timed
+async def list_pending(cursor: int = 0, limit: int = 10) -> tuple[list, int]:
+    """Возвращает страницу очереди модерации после pending_id = cursor и курсор следующей страницы (или None)."""
+    async with connect() as db:
+        db_cursor = await db.execute(
+            "SELECT pending_id, category, title, writer_id FROM pending_news "
+            "WHERE pending_id > ? ORDER BY pending_id LIMIT ?",
+            (cursor, limit + 1)
+        )
+        rows = await db_cursor.fetchall()
+        items = [
+            {
+                "pending_id": row[0],
+                "category": row[1],
+                "title": row[2],
+                "writer_id": row[3],
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = items[-1]["pending_id"] if len(rows) > limit else None
+        return items, next_cursor
+
+
+@db_timed
+async def count_pending() -> int:
+    async with connect() as db:
+        cursor = await db.execute("SELECT value FROM counters WHERE name = 'pending_news'")
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+
+@db_timed
+async def list_pending_ids(source_id: int = None) -> list:
+    async with connect() as db:
+        query = "SELECT pending_id FROM pending_news"
+        params = []
+        if source_id is not None:
+            query += " WHERE source_id = ?"
+            params.append(source_id)
+        query += " ORDER BY pending_id"
+        cursor = await db.execute(query, params)
+        return [row[0] for row in await cursor.fetchall()]
+
+
+@db_timed
+async def get_pending_sources() -> list:
+    async with connect() as db:
         cursor = await db.execute(
-            "INSERT INTO news (category, title, description, image_url, writer_id, source) VALUES (?, ?, ?, ?, ?, ?)",
-            (category, title, description, image_url, writer_id, "RSS" if writer_id == 0 else "Manual")
+            "SELECT p.source_id, s.url, COUNT(*) FROM pending_news p "
+            "JOIN sources s ON s.source_id = p.source_id "
+            "GROUP BY p.source_id ORDER BY COUNT(*) DESC"
         )
-        news_id = cursor.lastrowid
-        await db.execute("DELETE FROM pending_news WHERE pending_id = ?", (pending_id,))
+        return [
+            {
+                "source_id": row[0],
+                "url": row[1],
+                "count": row[2],
+            }
+            for row in await cursor.fetchall()
+        ]
+
+
+@db_timed
+async def approve_many(pending_ids: list) -> list:
+    """Переносит новости из очереди в news одним INSERT ... SELECT и одним DELETE в рамках одной транзакции.
+
+    Возвращает id опубликованных новостей.
+    """
+    news_ids = []
+    async with connect() as db:
+        for i in range(0, len(pending_ids), BULK_CHUNK_SIZE):
+            chunk = pending_ids[i:i + BULK_CHUNK_SIZE]
+            placeholders = ",".join("?" for _ in chunk)
+            cursor = await db.execute(
+                "INSERT INTO news (category, title, description, image_url, writer_id, source, body, fingerprint, "
+                "published_at) "
+                "SELECT p.category, p.title, p.description, p.image_url, p.writer_id, "
+                "COALESCE(s.url, CASE WHEN p.writer_id = 0 THEN 'RSS' ELSE 'Manual' END), p.body, p.fingerprint, "
+                "COALESCE(p.published_at, CURRENT_TIMESTAMP) "
+                "FROM pending_news p LEFT JOIN sources s ON s.source_id = p.source_id "
+                f"WHERE p.pending_id IN ({placeholders}) ORDER BY p.pending_id "
+                "RETURNING news_id",
+                chunk
+            )
+            news_ids.extend(row[0] for row in await cursor.fetchall())
+            await db.execute(f"DELETE FROM pending_news WHERE pending_id IN ({placeholders})", chunk)
         await db.commit()
-        return news_id
+    writer_counts_cache.clear()
+    return news_ids
+
+
+@db_timed
+async def reject_many(pending_ids: list) -> int:
+    deleted = 0
+    async with connect() as db:
+        for i in range(0, len(pending_ids), BULK_CHUNK_SIZE):
+            chunk = pending_ids[i:i + BULK_CHUNK_SIZE]
+            placeholders = ",".join("?" for _ in chunk)
+            cursor = await db.execute(f"DELETE FROM pending_news WHERE pending_id IN ({placeholders})", chunk)
+            deleted += cursor.rowcount
+        await db.commit()
+    writer_counts_cache.clear()
+    return deleted
+
 
+# Без @db_timed: время и число вызовов уже учитывает approve_many
+async def approve_news(pending_id: int) -> int:
+    news_ids = await approve_many([pending_id])
+    return news_ids[0] if news_ids else None
 
+
+@db_timed
 async def reject_news(pending_id: int) -> int:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT writer_id FROM pending_news WHERE pending_id = ?", (pending_id,)
         )
@@ -196,19 +485,155 @@ async def reject_news(pending_id: int) -> int:
         writer_id = row[0]
         await db.execute("DELETE FROM pending_news WHERE pending_id = ?", (pending_id,))
         await db.commit()
+        writer_counts_cache.pop(writer_id, None)
         return writer_id
 
 
+@db_timed
 async def get_news(category: str = None, limit: int = 10) -> list:
-    async with aiosqlite.connect("news_bot.db") as db:
-        query = "SELECT news_id, category, title, description, image_url, writer_id, source, published_at FROM news"
+    async with connect() as db:
+        # Повторы одной истории из других источников не показываем, они доступны из карточки представителя
+        query = ("SELECT news_id, category, title, description, image_url, writer_id, source, published_at, "
+                 "body IS NOT NULL, (SELECT COUNT(*) FROM news d WHERE d.duplicate_of = news.news_id) "
+                 "FROM news WHERE duplicate_of IS NULL")
         params = []
         if category:
-            query += " WHERE category = ?"
+            query += " AND category = ?"
             params.append(category)
         query += " ORDER BY published_at DESC LIMIT ?"
         params.append(limit)
         cursor = await db.execute(query, params)
+        return [
+            {
+                "news_id": row[0],
+                "category": row[1],
+                "title": row[2],
+                "description": row[3],
+                "image_url": row[4],
+                "writer_id": row[5],
+                "source": row[6],
+                "published_at": row[7],
+                "has_body": bool(row[8]),
+                "also_reported": row[9],
+            }
+            for row in await cursor.fetchall()
+        ]
+
+
+@db_timed
+async def get_also_reported(news_id: int) -> list:
+    """Та же история из других источников."""
+    async with connect() as db:
+        cursor = await db.execute(
+            "SELECT news_id, title, source, published_at FROM news WHERE duplicate_of = ? ORDER BY news_id",
+            (news_id,)
+        )
+        return [
+            {"news_id": row[0], "title": row[1], "source": row[2], "published_at": row[3]}
+            for row in await cursor.fetchall()
+        ]
+
+
+@db_timed
+async def link_duplicate(news_id: int, representative_id: int):
+    async with connect() as db:
+        await db.execute("UPDATE news SET duplicate_of = ? WHERE news_id = ?", (representative_id, news_id))
+        await db.commit()
+    # Копия уже могла попасть в закэшированную выдачу поиска
+    search_cache.clear()
+
+
+@db_timed
+async def get_recent_fingerprints(window_seconds: int) -> list:
+    """(news_id, категория, подпись, unix-время публикации) новостей-представителей за последние window_seconds."""
+    async with connect() as db:
+        cursor = await db.execute(
+            "SELECT news_id, category, fingerprint, CAST(strftime('%s', published_at) AS INTEGER) FROM news "
+            "WHERE published_at >= datetime('now', ?) AND fingerprint IS NOT NULL AND duplicate_of IS NULL "
+            "ORDER BY published_at",
+            (f"-{int(window_seconds)} seconds",)
+        )
+        return [(row[0], row[1], row[2], row[3]) for row in await cursor.fetchall()]
+
+
+@db_timed
+async def get_news_fingerprints(news_ids: list) -> dict:
+    """news_id -> (категория, подпись) для перечисленных новостей."""
+    if not news_ids:
+        return {}
+    async with connect() as db:
+        placeholders = ",".join("?" for _ in news_ids)
+        cursor = await db.execute(
+            f"SELECT news_id, category, fingerprint FROM news WHERE news_id IN ({placeholders})",
+            news_ids
+        )
+        return {row[0]: (row[1], row[2]) for row in await cursor.fetchall()}
+
+
+@db_timed
+async def get_news_body(news_id: int) -> str:
+    """Полный текст новости (если он сохранён при сборе), иначе None."""
+    async with connect() as db:
+        cursor = await db.execute("SELECT body FROM news WHERE news_id = ?", (news_id,))
+        row = await cursor.fetchone()
+        return decompress_body(row[0]) if row and row[0] else None
+
+
+def build_fts_query(text: str) -> str:
+    """Превращает пользовательский ввод в безопасный запрос FTS5: все слова обязательны, с поиском по префиксу."""
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{word}"*' for word in words[:10])
+
+
+@db_timed
+async def search_news(query: str, offset: int = 0, limit: int = 10) -> tuple[list, bool]:
+    """Ищет новости по заголовку и описанию, сортируя по bm25 (заголовок весит больше).
+
+    Возвращает страницу результатов со сниппетами и признак наличия следующей страницы.
+    """
+    fts_query = build_fts_query(query)
+    if not fts_query:
+        return [], False
+    key = (fts_query, offset, limit)
+    cached = search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async with connect() as db:
+        cursor = await db.execute(
+            "SELECT n.news_id, n.category, n.title, n.source, n.published_at, "
+            "snippet(news_fts, 1, '', '', '…', 16) "
+            "FROM news_fts JOIN news n ON n.news_id = news_fts.rowid "
+            "WHERE news_fts MATCH ? AND n.duplicate_of IS NULL ORDER BY bm25(news_fts, 10.0, 1.0) LIMIT ? OFFSET ?",
+            (fts_query, limit + 1, offset)
+        )
+        rows = await cursor.fetchall()
+    results = [
+        {
+            "news_id": row[0],
+            "category": row[1],
+            "title": row[2],
+            "source": row[3],
+            "published_at": row[4],
+            "snippet": row[5],
+        }
+        for row in rows[:limit]
+    ]
+    search_cache[key] = (results, len(rows) > limit)
+    return results, len(rows) > limit
+
+
+@db_timed
+async def get_news_by_ids(news_ids: list) -> list:
+    if not news_ids:
+        return []
+    async with connect() as db:
+        placeholders = ",".join("?" for _ in news_ids)
+        cursor = await db.execute(
+            "SELECT news_id, category, title, description, image_url, writer_id, source, published_at "
+            f"FROM news WHERE news_id IN ({placeholders}) ORDER BY news_id",
+            news_ids
+        )
         return [
             {
                 "news_id": row[0],
@@ -224,8 +649,41 @@ async def get_news(category: str = None, limit: int = 10) -> list:
         ]
 
 
+@db_timed
+async def get_top_news(category: str = None, days: int = 7, limit: int = 50) -> list:
+    """Самые высоко оценённые новости за последние days дней."""
+    async with connect() as db:
+        query = (
+            "SELECT n.news_id, n.category, n.title, n.description, n.image_url, n.writer_id, n.source, "
+            "n.published_at, COALESCE((SELECT SUM(r.rating) FROM ratings r WHERE r.news_id = n.news_id), 0) AS score "
+            "FROM news n WHERE n.published_at >= datetime('now', ?) AND n.duplicate_of IS NULL"
+        )
+        params = [f"-{days} days"]
+        if category:
+            query += " AND n.category = ?"
+            params.append(category)
+        query += " ORDER BY score DESC, n.published_at DESC LIMIT ?"
+        params.append(limit)
+        cursor = await db.execute(query, params)
+        return [
+            {
+                "news_id": row[0],
+                "category": row[1],
+                "title": row[2],
+                "description": row[3],
+                "image_url": row[4],
+                "writer_id": row[5],
+                "source": row[6],
+                "published_at": row[7],
+                "score": row[8],
+            }
+            for row in await cursor.fetchall()
+        ]
+
+
+@db_timed
 async def get_news_by_id(news_id: int) -> dict:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT news_id, category, title, description, image_url, writer_id, source, published_at FROM news WHERE news_id = ?",
             (news_id,)
@@ -245,8 +703,9 @@ async def get_news_by_id(news_id: int) -> dict:
         return None
 
 
+@db_timed
 async def set_news_rating(user_id: int, news_id: int, rating: int):
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         await db.execute(
             "INSERT OR REPLACE INTO ratings (user_id, news_id, rating) VALUES (?, ?, ?)",
             (user_id, news_id, rating)
@@ -254,8 +713,9 @@ async def set_news_rating(user_id: int, news_id: int, rating: int):
         await db.commit()
 
 
+@db_timed
 async def get_news_rating(news_id: int) -> tuple[int, int]:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT rating FROM ratings WHERE news_id = ?", (news_id,)
         )
@@ -265,8 +725,9 @@ async def get_news_rating(news_id: int) -> tuple[int, int]:
         return likes, dislikes
 
 
+@db_timed
 async def get_user_rating(user_id: int, news_id: int) -> int:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT rating FROM ratings WHERE user_id = ? AND news_id = ?",
             (user_id, news_id)
@@ -275,8 +736,9 @@ async def get_user_rating(user_id: int, news_id: int) -> int:
         return row[0] if row else 0
 
 
+@db_timed
 async def check_limit(user_id: int, action: str) -> tuple[bool, int, int]:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT view_count, view_limit, create_count, create_limit FROM users WHERE user_id = ?",
             (user_id,)
@@ -292,8 +754,9 @@ async def check_limit(user_id: int, action: str) -> tuple[bool, int, int]:
         return False, 0, 0
 
 
+@db_timed
 async def increment_limit(user_id: int, action: str):
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         if action == "view_news":
             await db.execute(
                 "UPDATE users SET view_count = view_count + 1 WHERE user_id = ?",
@@ -307,8 +770,9 @@ async def increment_limit(user_id: int, action: str):
         await db.commit()
 
 
+@db_timed
 async def add_limit(user_id: int, action: str, amount: int):
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         if action == "view_news":
             await db.execute(
                 "UPDATE users SET view_limit = view_limit + ? WHERE user_id = ?",
@@ -322,8 +786,9 @@ async def add_limit(user_id: int, action: str, amount: int):
         await db.commit()
 
 
+@db_timed
 async def add_purchase(user_id: int, action_type: str, amount: int, cost: int):
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         await db.execute(
             "INSERT INTO purchases (user_id, action_type, amount, cost) VALUES (?, ?, ?, ?)",
             (user_id, action_type, amount, cost)
@@ -331,8 +796,119 @@ async def add_purchase(user_id: int, action_type: str, amount: int, cost: int):
         await db.commit()
 
 
+@db_timed
+async def add_payment(payment_id: str, user_id: int, action_type: str, quantity: int, cost: int):
+    async with connect() as db:
+        await db.execute(
+            "INSERT OR IGNORE INTO payments (payment_id, user_id, action_type, quantity, cost) VALUES (?, ?, ?, ?, ?)",
+            (payment_id, user_id, action_type, quantity, cost)
+        )
+        await db.commit()
+
+
+@db_timed
+async def get_payment(payment_id: str) -> dict:
+    async with connect() as db:
+        cursor = await db.execute(
+            "SELECT payment_id, user_id, action_type, quantity, cost, status, attempts, created_at, credited_at "
+            "FROM payments WHERE payment_id = ?",
+            (payment_id,)
+        )
+        row = await cursor.fetchone()
+        if row:
+            return {
+                "payment_id": row[0],
+                "user_id": row[1],
+                "action_type": row[2],
+                "quantity": row[3],
+                "cost": row[4],
+                "status": row[5],
+                "attempts": row[6],
+                "created_at": row[7],
+                "credited_at": row[8],
+            }
+        return None
+
+
+@db_timed
+async def get_due_payments(limit: int = 50) -> list:
+    """Платежи в статусе pending, которые пора проверить, вместе с возрастом в секундах."""
+    async with connect() as db:
+        cursor = await db.execute(
+            "SELECT payment_id, user_id, attempts, "
+            "CAST(strftime('%s', 'now') - strftime('%s', created_at) AS INTEGER) "
+            "FROM payments WHERE status = 'pending' AND next_check_at <= datetime('now') "
+            "ORDER BY next_check_at LIMIT ?",
+            (limit,)
+        )
+        return [
+            {
+                "payment_id": row[0],
+                "user_id": row[1],
+                "attempts": row[2],
+                "age": row[3],
+            }
+            for row in await cursor.fetchall()
+        ]
+
+
+@db_timed
+async def schedule_payment_check(payment_id: str, delay: int, count_attempt: bool = True):
+    async with connect() as db:
+        await db.execute(
+            "UPDATE payments SET next_check_at = datetime('now', ?), "
+            "attempts = attempts + ?, checked_at = CASE WHEN ? THEN datetime('now') ELSE checked_at END "
+            "WHERE payment_id = ? AND status = 'pending'",
+            (f"+{delay} seconds", int(count_attempt), int(count_attempt), payment_id)
+        )
+        await db.commit()
+
+
+@db_timed
+async def set_payment_status(payment_id: str, status: str):
+    async with connect() as db:
+        await db.execute(
+            "UPDATE payments SET status = ?, checked_at = datetime('now') WHERE payment_id = ? AND status = 'pending'",
+            (status, payment_id)
+        )
+        await db.commit()
+
+
+@db_timed
+async def credit_payment(payment_id: str) -> bool:
+    """Зачисляет оплаченные лимиты ровно один раз.
+
+    Покупка и лимиты пишутся в одной транзакции; повторный вызов упирается в уникальный
+    индекс purchases.payment_id и возвращает False.
+    """
+    async with connect() as db:
+        cursor = await db.execute(
+            "INSERT OR IGNORE INTO purchases (user_id, action_type, amount, cost, payment_id) "
+            "SELECT user_id, action_type, quantity, cost, payment_id FROM payments WHERE payment_id = ?",
+            (payment_id,)
+        )
+        if cursor.rowcount == 0:
+            return False
+        cursor = await db.execute(
+            "SELECT user_id, action_type, quantity FROM payments WHERE payment_id = ?", (payment_id,)
+        )
+        user_id, action_type, quantity = await cursor.fetchone()
+        if action_type == "view_news":
+            await db.execute("UPDATE users SET view_limit = view_limit + ? WHERE user_id = ?", (quantity, user_id))
+        elif action_type == "create_news":
+            await db.execute("UPDATE users SET create_limit = create_limit + ? WHERE user_id = ?", (quantity, user_id))
+        await db.execute(
+            "UPDATE payments SET status = 'succeeded', checked_at = datetime('now'), credited_at = datetime('now') "
+            "WHERE payment_id = ?",
+            (payment_id,)
+        )
+        await db.commit()
+        return True
+
+
+@db_timed
 async def get_user_stats(user_id: int) -> dict:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT role, view_count, view_limit, create_count, create_limit FROM users WHERE user_id = ?",
             (user_id,)
@@ -406,46 +982,69 @@ async def get_user_stats(user_id: int) -> dict:
         }
 
 
-async def get_writer_news(writer_id: int) -> tuple[list, list]:
-    async with aiosqlite.connect("news_bot.db") as db:
-        cursor = await db.execute(
-            "SELECT news_id, category, title, description, image_url, writer_id FROM news WHERE writer_id = ?",
-            (writer_id,)
-        )
-        published = [
-            {
-                "news_id": row[0],
-                "category": row[1],
-                "title": row[2],
-                "description": row[3],
-                "image_url": row[4],
-                "writer_id": row[5] if len(row) > 5 else None,
-            }
-            for row in await cursor.fetchall()
-        ]
-
+@db_timed
+async def get_writer_counts(writer_id: int) -> tuple[int, int]:
+    counts = writer_counts_cache.get(writer_id)
+    if counts is not None:
+        return counts
+    async with connect() as db:
+        cursor = await db.execute("SELECT COUNT(*) FROM news WHERE writer_id = ?", (writer_id,))
+        published = (await cursor.fetchone())[0]
+        cursor = await db.execute("SELECT COUNT(*) FROM pending_news WHERE writer_id = ?", (writer_id,))
+        pending = (await cursor.fetchone())[0]
+    writer_counts_cache[writer_id] = (published, pending)
+    return published, pending
+
+
+@db_timed
+async def list_writer_news(writer_id: int, is_published: bool, cursor: int = 0, limit: int = 10) -> tuple[list, int]:
+    """Страница новостей писателя (только id и заголовки), от новых к старым.
+
+    cursor = 0 означает первую страницу, иначе выбираются новости с id меньше cursor.
+    """
+    table = "news" if is_published else "pending_news"
+    id_column = "news_id" if is_published else "pending_id"
+    async with connect() as db:
+        query = f"SELECT {id_column}, title FROM {table} WHERE writer_id = ?"
+        params = [writer_id]
+        if cursor:
+            query += f" AND {id_column} < ?"
+            params.append(cursor)
+        query += f" ORDER BY {id_column} DESC LIMIT ?"
+        params.append(limit + 1)
+        db_cursor = await db.execute(query, params)
+        rows = await db_cursor.fetchall()
+        items = [{"id": row[0], "title": row[1]} for row in rows[:limit]]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return items, next_cursor
+
+
+@db_timed
+async def get_writer_item(writer_id: int, item_id: int, is_published: bool) -> dict:
+    table = "news" if is_published else "pending_news"
+    id_column = "news_id" if is_published else "pending_id"
+    async with connect() as db:
         cursor = await db.execute(
-            "SELECT pending_id, category, title, description, image_url FROM pending_news WHERE writer_id = ?",
-            (writer_id,)
+            f"SELECT {id_column}, category, title, description, image_url FROM {table} "
+            f"WHERE {id_column} = ? AND writer_id = ?",
+            (item_id, writer_id)
         )
-        pending = [
-            {
-                "pending_id": row[0],
+        row = await cursor.fetchone()
+        if row:
+            return {
+                id_column: row[0],
                 "category": row[1],
                 "title": row[2],
                 "description": row[3],
                 "image_url": row[4],
             }
-            for row in await cursor.fetchall()
-        ]
-
-        logger.info(f"Retrieved news for writer {writer_id}: Published={len(published)}, Pending={len(pending)}")
-        return published, pending
+        return None
 
 
+@db_timed
 async def update_pending_news(news_id: int, title: str, description: str, image_url: str, category: str,
                               is_published: bool):
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         table = "news" if is_published else "pending_news"
         id_column = "news_id" if is_published else "pending_id"
         await db.execute(
@@ -453,18 +1052,33 @@ async def update_pending_news(news_id: int, title: str, description: str, image_
             (title, description, image_url, category, news_id)
         )
         await db.commit()
+    if is_published:
+        search_cache.clear()
 
 
+@db_timed
 async def delete_pending_news(news_id: int, is_published: bool):
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         table = "news" if is_published else "pending_news"
         id_column = "news_id" if is_published else "pending_id"
+        if is_published:
+            # Повторы удаляемой истории не должны пропасть вместе с ней: старейший из них становится
+            # представителем, остальные привязываются к нему
+            cursor = await db.execute("SELECT MIN(news_id) FROM news WHERE duplicate_of = ?", (news_id,))
+            successor = (await cursor.fetchone())[0]
+            if successor is not None:
+                await db.execute("UPDATE news SET duplicate_of = NULL WHERE news_id = ?", (successor,))
+                await db.execute("UPDATE news SET duplicate_of = ? WHERE duplicate_of = ?", (successor, news_id))
         await db.execute(f"DELETE FROM {table} WHERE {id_column} = ?", (news_id,))
         await db.commit()
+    writer_counts_cache.clear()
+    if is_published:
+        search_cache.clear()
 
 
+@db_timed
 async def get_sources(category: str = None) -> list:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         query = "SELECT source_id, category, url, is_active FROM sources"
         params = []
         if category:
@@ -482,16 +1096,177 @@ async def get_sources(category: str = None) -> list:
         ]
 
 
+@db_timed
+async def get_source_health() -> list:
+    """Источники вместе с их состоянием, проблемные — первыми."""
+    async with connect() as db:
+        cursor = await db.execute(
+            "SELECT s.source_id, s.category, s.url, s.is_active, COALESCE(h.consecutive_failures, 0), "
+            "COALESCE(h.total_failures, 0), COALESCE(h.total_successes, 0), h.last_success_at, h.last_error, "
+            "h.avg_latency_ms, h.avg_bytes, h.open_until, h.disabled_at "
+            "FROM sources s LEFT JOIN source_health h ON h.source_id = s.source_id "
+            "ORDER BY s.is_active, COALESCE(h.consecutive_failures, 0) DESC, h.avg_latency_ms DESC"
+        )
+        return [
+            {
+                "source_id": row[0],
+                "category": row[1],
+                "url": row[2],
+                "is_active": row[3],
+                "consecutive_failures": row[4],
+                "total_failures": row[5],
+                "total_successes": row[6],
+                "last_success_at": row[7],
+                "last_error": row[8],
+                "avg_latency_ms": row[9],
+                "avg_bytes": row[10],
+                "open_until": row[11],
+                "disabled_at": row[12],
+            }
+            for row in await cursor.fetchall()
+        ]
+
+
+@db_timed
+async def get_open_circuits() -> list:
+    """id источников, которые после серии ошибок пока пропускаются."""
+    async with connect() as db:
+        cursor = await db.execute("SELECT source_id FROM source_health WHERE open_until > CURRENT_TIMESTAMP")
+        return [row[0] for row in await cursor.fetchall()]
+
+
+@db_timed
+async def record_source_success(source_id: int, latency_ms: float, size_bytes: int, weight: float = 0.2):
+    """Успешный опрос: сбрасывает счётчик ошибок, закрывает автомат, обновляет скользящие средние."""
+    async with connect() as db:
+        await db.execute(
+            "INSERT INTO source_health (source_id, total_successes, last_success_at, avg_latency_ms, avg_bytes) "
+            "VALUES (?, 1, CURRENT_TIMESTAMP, ?, ?) "
+            "ON CONFLICT(source_id) DO UPDATE SET consecutive_failures = 0, "
+            "total_successes = total_successes + 1, last_success_at = CURRENT_TIMESTAMP, open_until = NULL, "
+            "avg_latency_ms = COALESCE(avg_latency_ms * (1 - ?) + excluded.avg_latency_ms * ?, excluded.avg_latency_ms), "
+            "avg_bytes = COALESCE(avg_bytes * (1 - ?) + excluded.avg_bytes * ?, excluded.avg_bytes)",
+            (source_id, latency_ms, size_bytes, weight, weight, weight, weight)
+        )
+        await db.commit()
+
+
+@db_timed
+async def get_high_water_marks() -> dict:
+    async with connect() as db:
+        cursor = await db.execute(
+            "SELECT source_id, high_water_mark FROM source_health WHERE high_water_mark IS NOT NULL"
+        )
+        return {row[0]: row[1] for row in await cursor.fetchall()}
+
+
+@db_timed
+async def set_high_water_marks(marks: dict):
+    """Сдвигает отметки источников вперёд (source_id -> unix-время); назад отметка не двигается."""
+    if not marks:
+        return
+    async with connect() as db:
+        await db.executemany(
+            "INSERT INTO source_health (source_id, high_water_mark) VALUES (?, ?) "
+            "ON CONFLICT(source_id) DO UPDATE SET "
+            "high_water_mark = MAX(COALESCE(high_water_mark, 0), excluded.high_water_mark)",
+            list(marks.items())
+        )
+        await db.commit()
+
+
+@db_timed
+async def acquire_lease(name: str, holder: str, ttl_seconds: int) -> bool:
+    """Берёт или продлевает аренду name на ttl_seconds. False, если её держит другой и она не истекла."""
+    async with connect() as db:
+        cursor = await db.execute(
+            "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, datetime('now', ?)) "
+            "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at, "
+            "acquired_at = CASE WHEN leases.holder = excluded.holder THEN leases.acquired_at ELSE CURRENT_TIMESTAMP END "
+            "WHERE leases.holder = excluded.holder OR leases.expires_at <= CURRENT_TIMESTAMP "
+            "RETURNING holder",
+            (name, holder, f"+{int(ttl_seconds)} seconds")
+        )
+        acquired = await cursor.fetchone() is not None
+        await db.commit()
+        return acquired
+
+
+@db_timed
+async def release_lease(name: str, holder: str):
+    async with connect() as db:
+        await db.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
+        await db.commit()
+
+
+@db_timed
+async def get_lease(name: str) -> dict:
+    async with connect() as db:
+        cursor = await db.execute(
+            "SELECT holder, acquired_at, expires_at FROM leases WHERE name = ? AND expires_at > CURRENT_TIMESTAMP",
+            (name,)
+        )
+        row = await cursor.fetchone()
+        return {"holder": row[0], "acquired_at": row[1], "expires_at": row[2]} if row else None
+
+
+@db_timed
+async def record_source_failure(source_id: int, error: str, backoff_base: int, backoff_max: int,
+                                disable_after: int) -> dict:
+    """Ошибка опроса: открывает автомат на backoff_base * 2^(n-1) секунд (не больше backoff_max).
+
+    После disable_after ошибок подряд источник выключается (is_active = 0).
+    """
+    async with connect() as db:
+        cursor = await db.execute(
+            "INSERT INTO source_health (source_id, consecutive_failures, total_failures, last_failure_at, last_error) "
+            "VALUES (?, 1, 1, CURRENT_TIMESTAMP, ?) "
+            "ON CONFLICT(source_id) DO UPDATE SET consecutive_failures = consecutive_failures + 1, "
+            "total_failures = total_failures + 1, last_failure_at = CURRENT_TIMESTAMP, last_error = excluded.last_error "
+            "RETURNING consecutive_failures",
+            (source_id, error[:500])
+        )
+        failures = (await cursor.fetchone())[0]
+        retry_in = min(backoff_base * 2 ** (failures - 1), backoff_max)
+        await db.execute(
+            "UPDATE source_health SET open_until = datetime('now', ?) WHERE source_id = ?",
+            (f"+{retry_in} seconds", source_id)
+        )
+        disabled = failures >= disable_after
+        if disabled:
+            await db.execute("UPDATE sources SET is_active = 0 WHERE source_id = ?", (source_id,))
+            await db.execute(
+                "UPDATE source_health SET disabled_at = CURRENT_TIMESTAMP WHERE source_id = ?", (source_id,)
+            )
+        await db.commit()
+        return {"failures": failures, "retry_in": retry_in, "disabled": disabled}
+
+
+@db_timed
+async def enable_source(source_id: int) -> bool:
+    """Включает источник обратно и даёт ему чистую историю ошибок."""
+    async with connect() as db:
+        cursor = await db.execute("UPDATE sources SET is_active = 1 WHERE source_id = ?", (source_id,))
+        await db.execute(
+            "UPDATE source_health SET consecutive_failures = 0, open_until = NULL, disabled_at = NULL "
+            "WHERE source_id = ?", (source_id,)
+        )
+        await db.commit()
+        return cursor.rowcount > 0
+
+
+@db_timed
 async def get_user_subscriptions(user_id: int) -> list:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT category FROM subscriptions WHERE user_id = ?", (user_id,)
         )
         return [row[0] for row in await cursor.fetchall()]
 
 
+@db_timed
 async def subscribe_to_category(user_id: int, category: str) -> bool:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         try:
             await db.execute(
                 "INSERT INTO subscriptions (user_id, category) VALUES (?, ?)",
@@ -503,8 +1278,9 @@ async def subscribe_to_category(user_id: int, category: str) -> bool:
             return False
 
 
+@db_timed
 async def unsubscribe_from_category(user_id: int, category: str) -> bool:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "DELETE FROM subscriptions WHERE user_id = ? AND category = ?",
             (user_id, category)
@@ -513,8 +1289,9 @@ async def unsubscribe_from_category(user_id: int, category: str) -> bool:
         return cursor.rowcount > 0
 
 
+@db_timed
 async def get_subscribers(category: str) -> list:
-    async with aiosqlite.connect("news_bot.db") as db:
+    async with connect() as db:
         cursor = await db.execute(
             "SELECT user_id FROM subscriptions WHERE category = ?", (category,)
         )
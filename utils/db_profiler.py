@@ -0,0 +1,198 @@
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import deque
+import aiosqlite
+from aiosqlite.context import contextmanager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Профилирование включается переменной окружения DB_PROFILE=1
+DB_PROFILE = os.getenv("DB_PROFILE", "0") == "1"
+# Запросы дольше этого порога (мс) логируются вместе с EXPLAIN QUERY PLAN
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "50"))
+# Если задан путь, отчёт сохраняется туда в JSON при остановке бота
+DB_PROFILE_DUMP = os.getenv("DB_PROFILE_DUMP", "")
+# Сколько последних замеров хранить на запрос для расчёта p99
+SAMPLE_SIZE = 1000
+
+# Нормализованный SQL -> StatementStats
+query_stats = {}
+# Запросы, для которых план уже выведен в лог
+_explained = set()
+
+
+class StatementStats:
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.changed = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def p99(self) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+    def to_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+            "p99_ms": round(self.p99() * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "rows": self.rows,
+            "changed": self.changed,
+        }
+
+
+def normalize_sql(sql: str) -> str:
+    """Схлопывает пробелы и списки плейсхолдеров, чтобы IN (?, ?, ...) разной длины считались одним запросом."""
+    sql = re.sub(r"\s+", " ", sql).strip()
+    return re.sub(r"\?(?:\s*,\s*\?)+", "?, ...", sql)
+
+
+class ProfiledCursor(aiosqlite.Cursor):
+    """Курсор, который досчитывает время выборки и количество строк к своему запросу.
+
+    Время вызова = execute + все fetch*. Вызов записывается после первой выборки
+    (или сразу после execute, если запрос не возвращает строк).
+    """
+
+    def __init__(self, conn, cursor, sql: str, parameters, elapsed: float):
+        super().__init__(conn, cursor)
+        self.sql = sql
+        self.parameters = parameters
+        self.elapsed = elapsed
+        key = normalize_sql(sql)
+        self.stats = query_stats.get(key)
+        if self.stats is None:
+            self.stats = query_stats.setdefault(key, StatementStats(key))
+        self.recorded = False
+
+    async def record(self):
+        if self.recorded:
+            return
+        self.recorded = True
+        stats = self.stats
+        stats.calls += 1
+        stats.total += self.elapsed
+        stats.max = max(stats.max, self.elapsed)
+        stats.samples.append(self.elapsed)
+        if self.rowcount > 0:
+            stats.changed += self.rowcount
+        if self.elapsed * 1000 >= DB_SLOW_QUERY_MS:
+            await self.explain()
+
+    async def explain(self):
+        logger.warning("Slow query (%.1f ms): %s", self.elapsed * 1000, self.stats.sql)
+        if self.stats.sql in _explained:
+            return
+        _explained.add(self.stats.sql)
+        try:
+            cursor = await aiosqlite.Connection.execute(self._conn, f"EXPLAIN QUERY PLAN {self.sql}", self.parameters)
+            plan = "\n".join(f"  {row[3]}" for row in await cursor.fetchall())
+            logger.warning("Query plan for %s:\n%s", self.stats.sql, plan or "  (no plan)")
+        except Exception as e:
+            logger.debug("Could not explain %s: %s", self.stats.sql, e)
+
+    async def fetch(self, method, *args):
+        started = time.perf_counter()
+        rows = await self._execute(method, *args)
+        elapsed = time.perf_counter() - started
+        count = 0 if rows is None else len(rows) if isinstance(rows, list) else 1
+        if self.recorded:
+            self.stats.total += elapsed
+        else:
+            self.elapsed += elapsed
+        self.stats.rows += count
+        await self.record()
+        return rows
+
+    async def fetchone(self):
+        return await self.fetch(self._cursor.fetchone)
+
+    async def fetchmany(self, size: int = None):
+        return await self.fetch(self._cursor.fetchmany, *(() if size is None else (size,)))
+
+    async def fetchall(self):
+        return await self.fetch(self._cursor.fetchall)
+
+
+class ProfiledConnection(aiosqlite.Connection):
+    @contextmanager
+    async def execute(self, sql: str, parameters=None) -> aiosqlite.Cursor:
+        if parameters is None:
+            parameters = []
+        started = time.perf_counter()
+        cursor = await self._execute(self._conn.execute, sql, parameters)
+        profiled = ProfiledCursor(self, cursor, sql, parameters, time.perf_counter() - started)
+        if cursor.description is None:
+            await profiled.record()
+        return profiled
+
+
+def profiled_connect(database: str, **kwargs) -> aiosqlite.Connection:
+    """То же, что aiosqlite.connect, но каждый execute попадает в query_stats."""
+    def connector() -> sqlite3.Connection:
+        return sqlite3.connect(database, **kwargs)
+
+    return ProfiledConnection(connector, 64)
+
+
+def query_report(limit: int = 10, order_by: str = "total_ms") -> list:
+    """Топ запросов по суммарному времени (или другому полю отчёта)."""
+    report = [stats.to_dict() for stats in list(query_stats.values())]
+    report.sort(key=lambda item: item[order_by], reverse=True)
+    return report[:limit]
+
+
+def format_query_report(limit: int = 10) -> str:
+    report = query_report(limit)
+    if not report:
+        return "Нет данных: профилирование выключено (DB_PROFILE=1) или запросов ещё не было."
+    lines = []
+    for index, item in enumerate(report, 1):
+        lines.append(
+            f"{index}. {item['total_ms']:.0f} мс всего, {item['calls']} вызовов, "
+            f"p99 {item['p99_ms']:.1f} мс, строк {item['rows']}\n{item['sql'][:300]}"
+        )
+    return "\n\n".join(lines)
+
+
+def dump_query_report(path: str, limit: int = 100):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(query_report(limit), f, ensure_ascii=False, indent=2)
+    logger.info("DB profile written to %s", path)
+
+
+def reset_query_stats():
+    query_stats.clear()
+    _explained.clear()
+
+
+def main():
+    """python -m utils.db_profiler profile.json [N] — печатает топ-N запросов из сохранённого отчёта."""
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.db_profiler <profile.json> [N]")
+        return
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with open(sys.argv[1], encoding="utf-8") as f:
+        report = json.load(f)
+    print(f"{'total_ms':>10} {'calls':>7} {'avg_ms':>8} {'p99_ms':>8} {'rows':>8}  sql")
+    for item in report[:limit]:
+        print(f"{item['total_ms']:>10.1f} {item['calls']:>7} {item['avg_ms']:>8.2f} {item['p99_ms']:>8.2f} "
+              f"{item['rows']:>8}  {item['sql'][:120]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import calendar
+import feedparser
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import XMLPullParser, ParseError
+from utils.near_duplicates import minhash
+from utils.text_normalize import STORE_FULL_BODY, compress_body, first_image, html_to_text, make_excerpt
+
+# Пространства имён, по которым отличаем картинки и служебные поля лент
+ATOM_NS = "http://www.w3.org/2005/Atom"
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+SY_NS = "http://purl.org/rss/1.0/modules/syndication/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+
+# Сколько байт скармливать парсеру за раз
+PARSE_CHUNK = 16 * 1024
+# Закрывающие теги записей: по ним загрузка понимает, что нужных записей уже хватает
+ENTRY_END_TAGS = (b"</item>", b"</entry>")
+
+
+def split_tag(tag: str) -> tuple[str, str]:
+    if tag.startswith("{"):
+        namespace, name = tag[1:].split("}", 1)
+        return namespace, name
+    return "", tag
+
+
+def count_entry_ends(buffer: bytearray, previous_length: int) -> int:
+    """Сколько закрывающих тегов записей появилось в buffer после previous_length байт."""
+    return sum(
+        buffer.count(tag, max(0, previous_length - len(tag) + 1))
+        for tag in ENTRY_END_TAGS
+    )
+
+
+def text_of(element) -> str:
+    return (element.text or "").strip() if element is not None else ""
+
+
+def parse_timestamp(value: str) -> int:
+    """Дата записи (RFC 822 из RSS или ISO 8601 из Atom и dc:date) -> unix-время UTC или None.
+
+    Даты из будущего (часы источника спешат) заменяются текущим временем.
+    """
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return min(int(parsed.timestamp()), int(time.time()))
+
+
+def struct_timestamp(value) -> int:
+    """published_parsed/updated_parsed из feedparser (struct_time в UTC) -> unix-время или None."""
+    if not value:
+        return None
+    return min(calendar.timegm(value), int(time.time()))
+
+
+def entry_from_element(item) -> dict:
+    """Запись RSS <item> или Atom <entry> -> словарь с guid, title, description, image_url, published."""
+    fields = {}
+    links = []
+    image_url = ""
+    for child in item.iter():
+        if child is item:
+            continue
+        namespace, name = split_tag(child.tag)
+        if name == "link":
+            if child.get("href"):
+                rel = child.get("rel", "alternate")
+                if rel == "enclosure" and child.get("type", "").startswith("image") and not image_url:
+                    image_url = child.get("href")
+                elif rel == "alternate":
+                    links.append(child.get("href"))
+            elif child.text:
+                links.append(child.text.strip())
+        elif name == "enclosure" and child.get("type", "").startswith("image") and not image_url:
+            image_url = child.get("url", "")
+        elif namespace == MEDIA_NS and name == "content" and not image_url:
+            if child.get("medium") == "image" or child.get("type", "").startswith("image"):
+                image_url = child.get("url", "")
+        elif namespace == CONTENT_NS and name == "encoded":
+            fields.setdefault("encoded", text_of(child))
+        elif namespace == DC_NS and name == "date":
+            fields.setdefault("dc_date", text_of(child))
+        elif namespace in ("", ATOM_NS) and name in ("pubDate", "published", "updated"):
+            fields.setdefault(name, text_of(child))
+        elif namespace in ("", ATOM_NS) and name in ("title", "guid", "id", "description", "summary", "content"):
+            fields.setdefault(name, text_of(child))
+
+    link = links[0] if links else ""
+    return {
+        "guid": fields.get("guid") or fields.get("id") or link or fields.get("title", ""),
+        "title": fields.get("title") or "Без заголовка",
+        "description": fields.get("description") or fields.get("summary") or fields.get("encoded")
+        or fields.get("content") or "Без описания",
+        "image_url": image_url,
+        "published": parse_timestamp(
+            fields.get("pubDate") or fields.get("published") or fields.get("dc_date") or fields.get("updated")
+        ),
+    }
+
+
+def is_old(entry: dict, since: int) -> bool:
+    # Строго меньше: в ту же секунду, что и отметка, лента могла выпустить ещё записи.
+    # Уже обработанную запись с этим временем отсеют guid-кэши и дедупликация
+    return bool(since) and entry["published"] is not None and entry["published"] < since
+
+
+def parse_incremental(body: bytes, limit: int, seen_guids: frozenset = frozenset(),
+                      since: int = 0) -> tuple[dict, list]:
+    """Потоковый разбор RSS/Atom: останавливается после limit записей или на первой уже виденной.
+
+    Записи старше since (unix-время) пропускаются; после limit таких записей разбор тоже
+    останавливается — ленты почти всегда идут от новых к старым.
+    Документ дальше нужного места не читается, поэтому время и память не зависят от размера ленты.
+    Бросает ParseError (битый XML, неизвестная кодировка) — тогда нужен запасной feedparser.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    hints = {}
+    entries = []
+    old_entries = 0
+    depth_in_entry = 0
+    for offset in range(0, len(body), PARSE_CHUNK):
+        parser.feed(body[offset:offset + PARSE_CHUNK])
+        for event, element in parser.read_events():
+            namespace, name = split_tag(element.tag)
+            is_entry = name == "item" or (name == "entry" and namespace == ATOM_NS)
+            if event == "start":
+                if is_entry:
+                    depth_in_entry += 1
+                continue
+            if is_entry:
+                depth_in_entry -= 1
+                entry = entry_from_element(element)
+                element.clear()
+                if entry["guid"] in seen_guids:
+                    return hints, entries
+                if is_old(entry, since):
+                    old_entries += 1
+                    if old_entries >= limit:
+                        return hints, entries
+                    continue
+                entries.append(entry)
+                if len(entries) >= limit:
+                    return hints, entries
+            elif depth_in_entry == 0:
+                if name == "ttl":
+                    hints["ttl"] = text_of(element)
+                elif namespace == SY_NS and name in ("updatePeriod", "updateFrequency"):
+                    hints[f"sy_{name.lower()}"] = text_of(element)
+    if not entries and not hints and not old_entries:
+        raise ParseError("no RSS/Atom entries found")
+    return hints, entries
+
+
+def extract_image(entry) -> str:
+    if "enclosures" in entry:
+        for enc in entry.enclosures:
+            if enc.get("type", "").startswith("image"):
+                return enc.get("href", "")
+    elif "media_content" in entry:
+        for media in entry.media_content:
+            if media.get("medium", "") == "image":
+                return media.get("url", "")
+    return ""
+
+
+def parse_with_feedparser(body: bytes, limit: int, seen_guids: frozenset = frozenset(),
+                          since: int = 0) -> tuple[dict, list]:
+    """Запасной разбор: feedparser терпит битый XML, HTML-сущности и любые кодировки."""
+    feed = feedparser.parse(body)
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"not a feed: {feed.get('bozo_exception')}")
+    hints = {key: feed.feed.get(key) for key in ("ttl", "sy_updateperiod", "sy_updatefrequency")}
+    entries = []
+    old_entries = 0
+    for entry in feed.entries:
+        guid = entry.get("id") or entry.get("link") or entry.get("title", "")
+        if guid in seen_guids or len(entries) >= limit or old_entries >= limit:
+            break
+        parsed = {
+            "guid": guid,
+            "title": entry.get("title", "Без заголовка"),
+            "description": entry.get("description", entry.get("summary", "Без описания")),
+            "image_url": extract_image(entry),
+            "published": struct_timestamp(entry.get("published_parsed") or entry.get("updated_parsed")),
+        }
+        if is_old(parsed, since):
+            old_entries += 1
+            continue
+        entries.append(parsed)
+    return hints, entries
+
+
+def parse_feed(body: bytes, limit: int, seen_guids: frozenset = frozenset(), since: int = 0) -> tuple[dict, list]:
+    """Подсказки ленты (ttl, sy:updatePeriod) и до limit новых записей, от свежих к старым."""
+    try:
+        return parse_incremental(body, limit, seen_guids, since)
+    except (ParseError, LookupError, ValueError):
+        return parse_with_feedparser(body, limit, seen_guids, since)
+
+
+# Порядок полей в компактных кортежах записей, которые возвращает parse_entries.
+# description — очищенный от HTML отрывок, body — сжатый полный текст или None,
+# fingerprint — MinHash-подпись заголовка и начала текста для поиска одной истории в разных источниках,
+# published — время публикации из самой записи (unix, UTC) или None
+ENTRY_FIELDS = ("guid", "title", "description", "body", "image_url", "fingerprint", "published")
+
+
+def normalize_entry(entry: dict) -> tuple:
+    title = make_excerpt(html_to_text(entry["title"]))
+    text = html_to_text(entry["description"])
+    excerpt = make_excerpt(text)
+    body = compress_body(text) if STORE_FULL_BODY and len(excerpt) < len(text) else None
+    return (
+        entry["guid"],
+        title or "Без заголовка",
+        excerpt or "Без описания",
+        body,
+        entry["image_url"] or first_image(entry["description"]),
+        minhash(title, text),
+        entry["published"],
+    )
+
+
+def parse_entries(body: bytes, limit: int, seen_guids: frozenset = frozenset(), since: int = 0) -> tuple[dict, list]:
+    """То же, что parse_feed, но записи нормализованы и упакованы в кортежи в порядке ENTRY_FIELDS.
+
+    Выполняется в процессах пула разбора: и XML, и очистка HTML занимают CPU, а кортежи дешевле
+    передавать между процессами, чем словари.
+    """
+    hints, entries = parse_feed(body, limit, seen_guids, since)
+    return hints, [normalize_entry(entry) for entry in entries]
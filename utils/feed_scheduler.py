@@ -0,0 +1,139 @@
+import heapq
+import random
+import time
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_INTERVAL = 15 * 60  # секунд, интервал для новой ленты
+MIN_INTERVAL = 2 * 60
+MAX_INTERVAL = 6 * 60 * 60
+# Интервал подбирается так, чтобы за опрос в среднем приходило столько новых записей
+TARGET_NEW_PER_POLL = 2
+# Вес нового наблюдения в скользящей оценке частоты публикаций
+RATE_ALPHA = 0.3
+JITTER = 0.1  # ±10%, чтобы опросы лент не собирались в одну секунду
+
+UPDATE_PERIODS = {
+    "hourly": 60 * 60,
+    "daily": 24 * 60 * 60,
+    "weekly": 7 * 24 * 60 * 60,
+    "monthly": 30 * 24 * 60 * 60,
+    "yearly": 365 * 24 * 60 * 60,
+}
+
+
+def hint_interval(hints: dict) -> float:
+    """Минимальный интервал опроса, который просит сама лента (<ttl> в минутах или sy:updatePeriod)."""
+    interval = 0.0
+    try:
+        if hints.get("ttl"):
+            interval = max(interval, float(hints["ttl"]) * 60)
+        period = UPDATE_PERIODS.get(str(hints.get("sy_updateperiod", "")).strip().lower())
+        if period:
+            frequency = max(1, int(hints.get("sy_updatefrequency") or 1))
+            interval = max(interval, period / frequency)
+    except (TypeError, ValueError):
+        pass
+    return interval
+
+
+class SourceSchedule:
+    def __init__(self, source: dict, now: float):
+        self.source = source
+        self.interval = DEFAULT_INTERVAL
+        self.next_due = now  # новую ленту опрашиваем сразу
+        self.rate = None  # новых записей в секунду
+        self.failures = 0
+        self.last_poll = None
+        self.min_interval = 0.0
+
+
+class FeedScheduler:
+    """Очередь опроса лент: куча по времени следующего опроса.
+
+    Для каждой ленты оценивается частота публикаций, и интервал подбирается под неё:
+    активные ленты опрашиваются чаще, тихие и сбойные — всё реже (экспоненциально).
+    Интервал не бывает меньше того, что лента указала в ttl / sy:updatePeriod.
+    """
+
+    def __init__(self, entries_per_poll: int):
+        self.entries_per_poll = entries_per_poll
+        self.schedules = {}
+        self.heap = []
+
+    def push(self, schedule: SourceSchedule):
+        heapq.heappush(self.heap, (schedule.next_due, schedule.source["source_id"]))
+
+    def sync(self, sources: list, now: float = None):
+        """Добавляет новые активные источники и забывает удалённые или выключенные."""
+        now = time.time() if now is None else now
+        active = {source["source_id"]: source for source in sources if source["is_active"]}
+        for source_id in list(self.schedules):
+            if source_id not in active:
+                del self.schedules[source_id]
+        for source_id, source in active.items():
+            schedule = self.schedules.get(source_id)
+            if schedule is None:
+                self.schedules[source_id] = schedule = SourceSchedule(source, now)
+                self.push(schedule)
+            else:
+                schedule.source = source
+
+    def pop_due(self, now: float = None) -> list:
+        """Источники, которым пора на опрос."""
+        now = time.time() if now is None else now
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            next_due, source_id = heapq.heappop(self.heap)
+            schedule = self.schedules.get(source_id)
+            # В куче могут остаться устаревшие записи (источник удалён или перепланирован)
+            if schedule is None or schedule.next_due != next_due:
+                continue
+            due.append(schedule.source)
+        return due
+
+    def seconds_until_next(self, now: float = None) -> float:
+        now = time.time() if now is None else now
+        while self.heap:
+            next_due, source_id = self.heap[0]
+            schedule = self.schedules.get(source_id)
+            if schedule is None or schedule.next_due != next_due:
+                heapq.heappop(self.heap)
+                continue
+            return max(0.0, next_due - now)
+        return DEFAULT_INTERVAL
+
+    def record(self, source_id: int, ok: bool, new_entries: int = 0, hints: dict = None, now: float = None):
+        """Учитывает результат опроса и планирует следующий."""
+        schedule = self.schedules.get(source_id)
+        if schedule is None:
+            return
+        now = time.time() if now is None else now
+        if hints:
+            schedule.min_interval = hint_interval(hints)
+
+        if not ok:
+            schedule.failures += 1
+            interval = DEFAULT_INTERVAL * 2 ** schedule.failures
+        else:
+            schedule.failures = 0
+            if schedule.last_poll is not None:
+                observed = new_entries / max(1.0, now - schedule.last_poll)
+                schedule.rate = observed if schedule.rate is None else \
+                    RATE_ALPHA * observed + (1 - RATE_ALPHA) * schedule.rate
+            schedule.last_poll = now
+
+            if new_entries >= self.entries_per_poll:
+                # Забрали максимум записей за опрос — часть могла не поместиться, ускоряемся
+                interval = schedule.interval / 2
+            elif schedule.rate:
+                interval = TARGET_NEW_PER_POLL / schedule.rate
+            else:
+                interval = schedule.interval * 2
+
+        schedule.interval = min(MAX_INTERVAL, max(MIN_INTERVAL, schedule.min_interval, interval))
+        schedule.next_due = now + schedule.interval * random.uniform(1 - JITTER, 1 + JITTER)
+        self.push(schedule)
+        logger.debug("Source %s: next poll in %.0fs (rate %s/s, failures %s)",
+                     source_id, schedule.next_due - now, schedule.rate, schedule.failures)
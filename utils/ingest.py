@@ -0,0 +1,167 @@
+"""Сбор RSS-новостей как отдельный сервис.
+
+Сбор можно запускать внутри бота (INGEST_IN_BOT=1, по умолчанию) или отдельным процессом,
+чтобы разбор и перевод лент не делили ресурсы с обработчиками:
+
+    python -m utils.ingest --daemon   # постоянный сбор по расписанию лент
+    python -m utils.ingest --once     # один проход по всем активным источникам (например, из cron)
+
+В любой момент собирает только один процесс — держатель аренды "rss_ingest" в таблице leases.
+Остальные ждут и подхватывают сбор, если держатель пропал и аренда истекла.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+import uuid
+from aiogram import Bot
+from config.config import BOT_TOKEN
+from utils.database import init_db, acquire_lease, release_lease, get_lease
+from utils.logger import get_logger, setup_logger
+from utils.loop_monitor import start_loop_monitor
+from utils.metrics import start_metrics_server
+from utils.news import fetch_news, start_news_fetching
+from utils.notifier import wait_for_notifications
+from utils.parse_pool import parse_pool
+
+logger = get_logger(__name__)
+
+# 0 — бот не собирает новости сам, сбор запущен отдельно через python -m utils.ingest --daemon
+INGEST_IN_BOT = os.getenv("INGEST_IN_BOT", "1") == "1"
+# Порт /metrics отдельного процесса сбора (у бота свой METRICS_PORT); 0 — не запускать
+INGEST_METRICS_PORT = int(os.getenv("INGEST_METRICS_PORT", "9109"))
+
+LEASE_NAME = "rss_ingest"
+LEASE_TTL = 120  # секунд; держатель продлевает аренду каждые LEASE_RENEW_INTERVAL секунд
+LEASE_RENEW_INTERVAL = 30
+# Как часто ожидающий процесс проверяет, не освободилась ли аренда
+LEASE_RETRY_INTERVAL = 60
+
+
+def make_holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class IngestService:
+    """Единственный цикл сбора новостей под арендой в SQLite.
+
+    Пока аренда у этого процесса, работает start_news_fetching, а аренда продлевается в фоне.
+    Если продлить не удалось (аренду забрал другой процесс, пока этот стоял), сбор останавливается
+    и процесс снова ждёт своей очереди.
+    """
+
+    def __init__(self, bot: Bot = None, holder: str = None):
+        self.bot = bot
+        self.holder = holder or make_holder_id()
+
+    async def keep_lease(self, ingest: asyncio.Task):
+        """Продлевает аренду, пока идёт сбор; при потере аренды отменяет сбор."""
+        renewed_at = time.monotonic()
+        while not ingest.done():
+            await asyncio.wait({ingest}, timeout=LEASE_RENEW_INTERVAL)
+            if ingest.done():
+                return
+            try:
+                if not await acquire_lease(LEASE_NAME, self.holder, LEASE_TTL):
+                    logger.warning("Ingest lease was taken over by another process, stopping ingest.")
+                    ingest.cancel()
+                    return
+                renewed_at = time.monotonic()
+            except Exception as e:
+                # Временная ошибка базы (например, locked) — аренда ещё действует, попробуем снова
+                logger.error("Failed to renew ingest lease: %s", e)
+                if time.monotonic() - renewed_at >= LEASE_TTL:
+                    logger.warning("Ingest lease expired while renewing, stopping ingest.")
+                    ingest.cancel()
+                    return
+
+    async def run_forever(self):
+        """Ждёт аренду и собирает новости, пока держит её."""
+        try:
+            while True:
+                try:
+                    acquired = await acquire_lease(LEASE_NAME, self.holder, LEASE_TTL)
+                    lease = None if acquired else await get_lease(LEASE_NAME)
+                except Exception as e:
+                    logger.error("Failed to acquire ingest lease: %s", e)
+                    acquired, lease = False, None
+                if acquired:
+                    logger.info("Ingest lease acquired by %s.", self.holder)
+                    ingest = asyncio.create_task(start_news_fetching(self.bot))
+                    try:
+                        await self.keep_lease(ingest)
+                    finally:
+                        ingest.cancel()
+                        await asyncio.gather(ingest, return_exceptions=True)
+                else:
+                    logger.info("Ingest is running elsewhere (%s), standing by.", lease["holder"] if lease else "?")
+                await asyncio.sleep(LEASE_RETRY_INTERVAL)
+        finally:
+            await release_lease(LEASE_NAME, self.holder)
+            logger.info("Ingest lease released by %s.", self.holder)
+
+    async def run_once(self) -> list:
+        """Один проход по всем активным источникам. None, если сбор ведёт другой процесс или аренда потеряна."""
+        if not await acquire_lease(LEASE_NAME, self.holder, LEASE_TTL):
+            lease = await get_lease(LEASE_NAME)
+            logger.warning("Ingest is already running in %s, skipping.", lease["holder"] if lease else "?")
+            return None
+        ingest = asyncio.create_task(fetch_news(self.bot))
+        try:
+            await self.keep_lease(ingest)
+            # keep_lease возвращается, когда проход закончился или был отменён из-за потери аренды
+            if ingest.cancelled():
+                return None
+            published = ingest.result()
+            await wait_for_notifications()
+            return published
+        finally:
+            ingest.cancel()
+            await asyncio.gather(ingest, return_exceptions=True)
+            await release_lease(LEASE_NAME, self.holder)
+
+
+async def run(args) -> int:
+    setup_logger()
+    start_loop_monitor()
+    await init_db()
+    bot = None if args.no_notify else Bot(token=BOT_TOKEN)
+    metrics_runner = await start_metrics_server(port=args.metrics_port) if args.daemon else None
+    await parse_pool.start()
+    service = IngestService(bot)
+    try:
+        if args.daemon:
+            await service.run_forever()
+            return 0
+        published = await service.run_once()
+        if published is None:
+            return 2
+        logger.info("Ingest pass finished: %s news published.", len(published))
+        return 0
+    finally:
+        await parse_pool.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        if bot:
+            await bot.session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS ingest service for the news bot")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--once", action="store_true", help="poll every active source once and exit")
+    mode.add_argument("--daemon", action="store_true", help="keep polling sources on their own schedules")
+    parser.add_argument("--no-notify", action="store_true", help="do not message subscribers about new news")
+    parser.add_argument("--metrics-port", type=int, default=INGEST_METRICS_PORT,
+                        help="port for /metrics in daemon mode, 0 to disable")
+    args = parser.parse_args()
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except KeyboardInterrupt:
+        logger.info("Ingest stopped by user.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import asyncio
+from cachetools import TTLCache
+from aiogram.types import InlineQueryResultArticle, InputTextMessageContent
+from utils.database import get_news, get_top_news
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Сколько новостей держим в ленте одной категории
+FEED_SIZE = 50
+# Время жизни готовых лент в секундах
+FEED_TTL = 30
+
+# (kind, category) -> список готовых InlineQueryResultArticle
+feed_cache = TTLCache(maxsize=64, ttl=FEED_TTL)
+_feed_locks = {}
+
+
+def build_article(item: dict, result_id: str = None, description: str = None) -> InlineQueryResultArticle:
+    text = f"📰 {item['title']}\n\n{(description or item.get('description') or '')[:1000]}"
+    if item.get("source"):
+        text += f"\n\nИсточник: {item['source']}"
+    return InlineQueryResultArticle(
+        id=result_id or str(item["news_id"]),
+        title=item["title"] or "Без заголовка",
+        description=(description or item.get("description") or "")[:100],
+        input_message_content=InputTextMessageContent(message_text=text)
+    )
+
+
+async def get_feed(kind: str, category: str = None) -> list:
+    """Возвращает ленту "recent" или "top" для категории (None — все категории).
+
+    Лента строится один раз за FEED_TTL: одновременные запросы ждут одного обращения к базе.
+    """
+    key = (kind, category)
+    articles = feed_cache.get(key)
+    if articles is not None:
+        return articles
+
+    lock = _feed_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        articles = feed_cache.get(key)
+        if articles is not None:
+            return articles
+        if kind == "top":
+            news = await get_top_news(category, limit=FEED_SIZE)
+        else:
+            news = await get_news(category=category, limit=FEED_SIZE)
+        articles = [build_article(item) for item in news]
+        feed_cache[key] = articles
+        logger.info("Built inline feed %s/%s: %s items", kind, category or 'all', len(articles))
+        return articles
@@ -1,35 +1,117 @@
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+# Уровни и формат задаются переменными окружения:
+#   LOG_LEVEL=INFO                                              — общий уровень
+#   LOG_LEVELS=NewsBot.utils.payment=DEBUG,NewsBot.utils.news=WARNING — уровни отдельных модулей
+#   LOG_FORMAT=json                                             — писать логи в JSON
+LOG_DIR = "logs"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+_listener: QueueListener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-запись на строку, удобно для сборщиков логов."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class LocalQueueHandler(QueueHandler):
+    """QueueHandler для очереди внутри процесса.
+
+    Стандартный prepare() форматирует запись ещё в потоке бота и обнуляет exc_info — трейсбек
+    тогда оказывается внутри "message", а JsonFormatter не видит исключения. Здесь на месте
+    подставляются только аргументы сообщения, а трейсбек форматирует обработчик в QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def apply_module_levels(levels: str):
+    """Разбирает строку вида "NewsBot.utils.payment=DEBUG,NewsBot.utils.news=WARNING"."""
+    for item in levels.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
 
 # Настройка логирования
 def setup_logger():
+    """Подключает обработчики к логгеру NewsBot. Вызывается точками входа (main.py, utils/ingest.py),
+    а не при импорте: процессы пула разбора импортируют модули бота, но писать в logs/bot.log не должны.
+    """
+    global _listener
     logger = logging.getLogger("NewsBot")
-    logger.setLevel(logging.INFO)
+    if _listener is not None:
+        return logger
+    logger.setLevel(LOG_LEVEL.upper())
 
     # Создаём директорию для логов, если её нет
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    if not os.path.exists(LOG_DIR):
+        os.makedirs(LOG_DIR)
+
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
 
     # Ротация логов: максимум 5 МБ, храним до 5 резервных копий
-    handler = RotatingFileHandler(
-        filename=os.path.join(log_dir, "bot.log"),
+    file_handler = RotatingFileHandler(
+        filename=os.path.join(LOG_DIR, "bot.log"),
         maxBytes=5 * 1024 * 1024,  # 5 МБ
         backupCount=5
     )
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    file_handler.setFormatter(formatter)
 
     # Также выводим логи в консоль
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
+    # Обработчики бота только кладут запись в очередь, форматирование и запись
+    # на диск/в консоль выполняет фоновый поток QueueListener
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(LocalQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    apply_module_levels(LOG_LEVELS)
     return logger
 
-# Инициализируем логгер
-logger = setup_logger()
\ No newline at end of file
+
+def stop_logging():
+    """Дописывает оставшиеся записи из очереди и останавливает фоновый поток."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Логгер модуля (например, NewsBot.utils.payment) — его уровень можно задать через LOG_LEVELS."""
+    return logging.getLogger(f"NewsBot.{name}")
+
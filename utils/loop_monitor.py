@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from utils.logger import get_logger
+from utils.metrics import EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_STALLS
+
+logger = get_logger(__name__)
+
+# Как часто замеряем задержку цикла событий (секунд)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+# Задержка, после которой считаем, что цикл заблокирован (секунд)
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.25"))
+# LOOP_DEBUG=1 включает режим отладки asyncio: он сам логирует колбэки дольше порога
+LOOP_DEBUG = os.getenv("LOOP_DEBUG", "0") == "1"
+
+_monitor_tasks = set()
+
+
+class LoopWatchdog(threading.Thread):
+    """Фоновый поток: если цикл событий давно не обновлял heartbeat, снимает стек его потока.
+
+    Сам цикл в это время заблокирован, поэтому увидеть виновника изнутри нельзя —
+    стек берётся из sys._current_frames() по id потока цикла.
+    """
+
+    def __init__(self, loop_thread_id: int, threshold: float):
+        super().__init__(name="loop-watchdog", daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self.threshold = threshold
+        self.heartbeat = time.monotonic()
+        self.reported = False
+        self.stopped = threading.Event()
+
+    def beat(self):
+        self.heartbeat = time.monotonic()
+        self.reported = False
+
+    def run(self):
+        while not self.stopped.wait(self.threshold / 2):
+            stalled_for = time.monotonic() - self.heartbeat
+            if stalled_for < LOOP_LAG_INTERVAL + self.threshold or self.reported:
+                continue
+            self.reported = True
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "(stack unavailable)"
+            logger.warning("Event loop blocked for %.2fs, loop thread stack:\n%s", stalled_for, stack)
+
+    def stop(self):
+        self.stopped.set()
+
+
+async def monitor_loop_lag(watchdog: LoopWatchdog = None, interval: float = LOOP_LAG_INTERVAL,
+                           threshold: float = LOOP_LAG_THRESHOLD):
+    """Засыпает на interval и измеряет, насколько позже цикл нас разбудил."""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            EVENT_LOOP_LAG_SECONDS.set(lag)
+            if watchdog:
+                watchdog.beat()
+            if lag >= threshold:
+                EVENT_LOOP_STALLS.inc()
+                logger.warning("Event loop lag %.3fs exceeded threshold %.3fs", lag, threshold)
+    finally:
+        if watchdog:
+            watchdog.stop()
+
+
+def start_loop_monitor(threshold: float = LOOP_LAG_THRESHOLD) -> LoopWatchdog:
+    """Запускает замер задержки и поток-сторож. Вызывать из работающего цикла событий."""
+    loop = asyncio.get_running_loop()
+    if LOOP_DEBUG:
+        loop.set_debug(True)
+        loop.slow_callback_duration = threshold
+        # Сообщения asyncio о медленных колбэках пишем в те же обработчики, что и логи бота
+        asyncio_logger = logging.getLogger("asyncio")
+        for handler in logging.getLogger("NewsBot").handlers:
+            asyncio_logger.addHandler(handler)
+
+    watchdog = LoopWatchdog(threading.get_ident(), threshold)
+    watchdog.start()
+    task = asyncio.create_task(monitor_loop_lag(watchdog, threshold=threshold))
+    _monitor_tasks.add(task)
+    task.add_done_callback(_monitor_tasks.discard)
+    logger.info("Event loop monitor started (threshold %.3fs, debug=%s).", threshold, LOOP_DEBUG)
+    return watchdog
@@ -0,0 +1,239 @@
+import functools
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict
+from aiohttp import web
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Адрес, на котором отдаётся /metrics. METRICS_PORT=0 отключает сервер
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Границы корзин гистограмм по умолчанию, секунды
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REGISTRY = []
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Базовая метрика. Значения хранятся в dict по кортежу значений меток.
+
+    Все обновления идут из потока event loop, поэтому блокировки на горячем пути не нужны:
+    обновление — это поиск в dict и сложение.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        REGISTRY.append(self)
+
+    def key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, value in list(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[self.key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными корзинами: для каждого набора меток — [счётчики корзин, сумма, количество]."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        state = self.values.get(key)
+        if state is None:
+            state = self.values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, (counts, total, count) in list(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    """Текстовый формат экспозиции Prometheus (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Метрики бота
+UPDATES_TOTAL = Counter("newsbot_updates_total", "Telegram updates received by event type", ("event",))
+HANDLER_SECONDS = Histogram("newsbot_handler_seconds", "Handler execution time", ("handler",))
+HANDLER_ERRORS = Counter("newsbot_handler_errors_total", "Handlers that raised an exception", ("handler",))
+DB_CALL_SECONDS = Histogram("newsbot_db_call_seconds", "utils.database call time", ("function",))
+DB_CALL_ERRORS = Counter("newsbot_db_call_errors_total", "utils.database calls that raised", ("function",))
+RSS_FETCH_SECONDS = Histogram("newsbot_rss_fetch_seconds", "Time to download and parse one RSS source", ("source_id",))
+RSS_FETCH_ERRORS = Counter("newsbot_rss_fetch_errors_total", "RSS sources that failed to fetch", ("source_id",))
+INGEST_CYCLE_SECONDS = Histogram(
+    "newsbot_ingest_cycle_seconds", "Duration of a full news fetching cycle",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 900)
+)
+INGEST_STAGE_SECONDS = Histogram("newsbot_ingest_stage_seconds", "Time one ingest stage spends on an item", ("stage",))
+INGEST_STAGE_ITEMS = Counter("newsbot_ingest_stage_items_total", "Items processed by ingest stage", ("stage",))
+INGEST_STAGE_ERRORS = Counter("newsbot_ingest_stage_errors_total", "Ingest stage failures", ("stage",))
+INGEST_QUEUE_DEPTH = Gauge("newsbot_ingest_queue_depth", "Items waiting in front of an ingest stage", ("stage",))
+INGEST_DUPLICATES = Counter("newsbot_ingest_duplicates_total", "RSS items linked to an earlier report of the same story")
+TRANSLATION_SECONDS = Histogram("newsbot_translation_seconds", "Translation call time")
+TRANSLATION_ERRORS = Counter("newsbot_translation_errors_total", "Translation calls that failed")
+NOTIFICATIONS_TOTAL = Counter("newsbot_notifications_total", "Subscriber notifications by result", ("status",))
+NOTIFICATIONS_PENDING = Gauge("newsbot_notifications_pending", "Subscriber notifications waiting to be sent")
+EVENT_LOOP_LAG_SECONDS = Gauge("newsbot_event_loop_lag_seconds", "Last measured event loop scheduling lag")
+EVENT_LOOP_STALLS = Counter("newsbot_event_loop_stalls_total", "Times the event loop lag exceeded the threshold")
+
+
+def timed(histogram: Histogram, errors: Counter = None):
+    """Декоратор корутины: время вызова пишется в histogram с меткой function=<имя функции>."""
+    def decorator(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(function=name)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started, function=name)
+        return wrapper
+    return decorator
+
+
+db_timed = timed(DB_CALL_SECONDS, DB_CALL_ERRORS)
+
+
+def handler_name(callback) -> str:
+    """Короткое имя обработчика для меток: "user.show_profile"."""
+    return f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """Inner middleware: к этому моменту aiogram уже выбрал обработчик и положил его в data["handler"]."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        name = handler_name(data["handler"].callback)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(handler=name)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - started, handler=name)
+
+
+class UpdateCounterMiddleware(BaseMiddleware):
+    """Outer middleware на update: считает все апдейты, включая те, для которых нет обработчика."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        UPDATES_TOTAL.inc(event=event.event_type)
+        return await handler(event, data)
+
+
+def setup_metrics_middleware(dp):
+    dp.update.outer_middleware(UpdateCounterMiddleware())
+    for observer in (dp.message, dp.callback_query, dp.inline_query):
+        observer.middleware(MetricsMiddleware())
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(text=render_metrics(), content_type="text/plain", charset="utf-8",
+                        headers={"X-Content-Type-Options": "nosniff"})
+
+
+async def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> web.AppRunner:
+    """Поднимает HTTP-сервер с /metrics. Возвращает runner (None, если сервер отключён)."""
+    if not port:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("Metrics endpoint listening on http://%s:%s/metrics", host, port)
+    return runner
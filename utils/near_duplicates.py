@@ -0,0 +1,106 @@
+import random
+import re
+import struct
+import time
+from collections import deque
+from hashlib import blake2b
+
+# Сходство текстов — доля общих слов (Jaccard), оценённая по MinHash-подписи из NUM_PERM чисел.
+# Переписанные разными редакциями заметки об одном событии дают 0.6+, разные истории на одну тему — до 0.35
+NUM_PERM = 64
+SIMILARITY_THRESHOLD = 0.5
+# LSH: подпись режется на BANDS полос по ROWS чисел; кандидаты — новости хотя бы с одной совпавшей полосой.
+# При сходстве 0.5 вероятность не найти кандидата (1 - 0.5²)^32 ≈ 1e-4
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Слова обрезаются до STEM_CHARS букв — грубый стемминг, чтобы «ставку» и «ставки» совпадали
+STEM_CHARS = 5
+# Сколько текста описания участвует в подписи вместе с заголовком
+LEAD_CHARS = 300
+# Новости сравниваются только с теми, что опубликованы за это окно, секунд
+CLUSTER_WINDOW = 6 * 60 * 60
+
+WORD_RE = re.compile(r"\w{3,}")
+MERSENNE_PRIME = (1 << 61) - 1
+SIGNATURE_FORMAT = f"<{NUM_PERM}I"
+# Перестановки фиксированы: подписи из разных процессов и после перезапуска должны быть сравнимы
+_rng = random.Random(20250601)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+
+def text_shingles(title: str, lead: str) -> set:
+    return {word[:STEM_CHARS] for word in WORD_RE.findall(f"{title} {lead[:LEAD_CHARS]}".lower())}
+
+
+def minhash(title: str, lead: str) -> bytes:
+    """Упакованная MinHash-подпись заголовка и начала текста (NUM_PERM * 4 байта) или None для пустого текста."""
+    hashes = [
+        int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in text_shingles(title, lead)
+    ]
+    if not hashes:
+        return None
+    return struct.pack(SIGNATURE_FORMAT, *(
+        min((a * value + b) % MERSENNE_PRIME for value in hashes) & 0xFFFFFFFF
+        for a, b in PERMUTATIONS
+    ))
+
+
+def similarity(first: tuple, second: tuple) -> float:
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """Подписи новостей-представителей за последние window секунд, разложенные по LSH-полосам.
+
+    find() сравнивает подпись только с новостями, у которых совпала хотя бы одна полоса, поэтому
+    на тысячах новостей в окне поиск — это несколько десятков обращений к словарям.
+    """
+
+    def __init__(self, window: float = CLUSTER_WINDOW, threshold: float = SIMILARITY_THRESHOLD):
+        self.window = window
+        self.threshold = threshold
+        # Для каждой полосы: значения полосы -> {news_id: подпись}
+        self.bands = [{} for _ in range(BANDS)]
+        # (время, news_id, подпись) в порядке добавления — для вытеснения старых
+        self.entries = deque()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def band_keys(self, signature: tuple) -> list:
+        return [signature[band * ROWS:(band + 1) * ROWS] for band in range(BANDS)]
+
+    def evict(self, now: float):
+        while self.entries and self.entries[0][0] < now - self.window:
+            _, news_id, signature = self.entries.popleft()
+            for band, key in zip(self.bands, self.band_keys(signature)):
+                bucket = band.get(key)
+                if bucket is not None:
+                    bucket.pop(news_id, None)
+                    if not bucket:
+                        del band[key]
+
+    def find(self, fingerprint: bytes, now: float = None) -> int:
+        """news_id самого похожего представителя со сходством не ниже threshold или None."""
+        self.evict(time.time() if now is None else now)
+        if not fingerprint:
+            return None
+        signature = struct.unpack(SIGNATURE_FORMAT, fingerprint)
+        candidates = {}
+        for band, key in zip(self.bands, self.band_keys(signature)):
+            candidates.update(band.get(key, {}))
+        best, best_similarity = None, self.threshold
+        for news_id, candidate in candidates.items():
+            score = similarity(signature, candidate)
+            if score >= best_similarity:
+                best, best_similarity = news_id, score
+        return best
+
+    def add(self, fingerprint: bytes, news_id: int, added_at: float = None):
+        if not fingerprint:
+            return
+        signature = struct.unpack(SIGNATURE_FORMAT, fingerprint)
+        self.entries.append((time.time() if added_at is None else added_at, news_id, signature))
+        for band, key in zip(self.bands, self.band_keys(signature)):
+            band.setdefault(key, {})[news_id] = signature
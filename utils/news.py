@@ -1,62 +1,436 @@
-import feedparser
 import asyncio
+import os
+import time
+import aiohttp
 from aiogram import Bot
-from utils.database import get_sources, insert_pending_news, approve_news
-from utils.logger import logger
+from cachetools import TTLCache
+from utils.database import get_sources, insert_pending_news, approve_news, get_open_circuits, \
+    record_source_success, record_source_failure, get_recent_fingerprints, link_duplicate, get_high_water_marks, \
+    set_high_water_marks, get_news_fingerprints
+from utils.feed_parser import ENTRY_FIELDS, count_entry_ends
+from utils.feed_scheduler import FeedScheduler
+from utils.logger import get_logger
+from utils.metrics import (
+    RSS_FETCH_SECONDS, RSS_FETCH_ERRORS, INGEST_CYCLE_SECONDS, TRANSLATION_SECONDS, TRANSLATION_ERRORS,
+    INGEST_STAGE_SECONDS, INGEST_STAGE_ITEMS, INGEST_STAGE_ERRORS, INGEST_QUEUE_DEPTH, INGEST_DUPLICATES
+)
+from utils.near_duplicates import CLUSTER_WINDOW, NearDuplicateIndex
+from utils.notifier import schedule_notification
+from utils.parse_pool import PARSE_WORKERS, parse_pool
 from deep_translator import GoogleTranslator
 
+logger = get_logger(__name__)
+
+# Как часто планировщик просыпается проверить новые/выключенные источники, секунд
+SCHEDULER_TICK = 60
+FETCH_TIMEOUT = 20  # секунд на загрузку одной ленты
+ENTRIES_PER_SOURCE = 5
+# Больше этого ленту не качаем: разбираем то, что успели получить
+MAX_FEED_BYTES = 2 * 1024 * 1024
+READ_CHUNK = 64 * 1024
+# Ёмкость очереди перед каждой стадией: когда она заполнена, предыдущая стадия ждёт
+QUEUE_SIZE = 100
+# Параллельность стадий. Разбор идёт в пуле процессов, перевод — в потоках, запись — одна
+# (SQLite пишет по одному)
+STAGE_WORKERS = {
+    "fetch": 8,
+    "parse": PARSE_WORKERS,
+    "dedup": 1,
+    "translate": 4,
+    "persist": 1,
+    "cluster": 1,  # индекс повторов общий: поиск и добавление идут по одному
+    "fanout": 1,
+}
+
+# 1 — RSS-новости публикуются сразу и рассылаются подписчикам; 0 — попадают в очередь модерации
+# (pending_news), публикует и рассылает их администратор. Повторы одной истории тогда ищутся при
+# одобрении (cluster_approved): в очереди модератор видит каждую копию, но уведомление уходит одно
+INGEST_AUTO_APPROVE = os.getenv("INGEST_AUTO_APPROVE", "1") == "1"
+
+# Автомат для сбойных источников: после ошибки источник пропускается BREAKER_BACKOFF_BASE секунд,
+# с каждой следующей ошибкой подряд вдвое дольше; после AUTO_DISABLE_FAILURES ошибок подряд выключается
+BREAKER_BACKOFF_BASE = 5 * 60
+BREAKER_BACKOFF_MAX = 24 * 60 * 60
+AUTO_DISABLE_FAILURES = 10
+
+# Уже обработанные записи лент: (source_id, guid) -> True
+seen_entries = TTLCache(maxsize=50000, ttl=7 * 24 * 60 * 60)
+# Полные тексты переводятся только по кнопке «Полный текст»: news_id -> перевод
+body_translations = TTLCache(maxsize=256, ttl=24 * 60 * 60)
+_body_translations_inflight = {}
+# GoogleTranslator принимает не больше 5000 символов за запрос
+TRANSLATE_CHUNK = 4500
+# Последние сохранённые guid каждого источника: разбор ленты останавливается на первом из них
+recent_guids = {}
+RECENT_GUIDS_PER_SOURCE = 200
+
+
 async def translate_to_russian(text: str) -> str:
+    """Переводит текст в отдельном потоке: GoogleTranslator делает блокирующий HTTP-запрос.
+    При ошибке возвращает исходный текст."""
     try:
-        translated = GoogleTranslator(source='auto', target='ru').translate(text)
+        with TRANSLATION_SECONDS.time():
+            translated = await asyncio.to_thread(GoogleTranslator(source='auto', target='ru').translate, text)
         return translated if translated else text
     except Exception as e:
-        logger.error(f"Translation error: {str(e)}")
+        TRANSLATION_ERRORS.inc()
+        logger.error("Translation error: %s", e)
         return text
 
-async def fetch_news(bot: Bot):
-    sources = await get_sources()
-    for source in sources:
-        if not source["is_active"]:
-            continue
+
+def split_for_translation(text: str, limit: int = TRANSLATE_CHUNK) -> list:
+    """Режет текст на куски не длиннее limit, по возможности по границе абзаца или слова."""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut < limit // 2:
+            cut = text.rfind(" ", 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip()
+    if text:
+        parts.append(text)
+    return parts
+
+
+async def translate_long_text(text: str) -> str:
+    """Перевод текста любой длины по кускам; бросает исключение, если не удалось перевести хотя бы один кусок."""
+    translator = GoogleTranslator(source='auto', target='ru')
+    translated = []
+    for part in split_for_translation(text):
+        with TRANSLATION_SECONDS.time():
+            translated.append(await asyncio.to_thread(translator.translate, part) or part)
+    return "\n".join(translated)
+
+
+async def translate_body(news_id: int, text: str) -> str:
+    """Полный текст новости на русском или None, если перевести не удалось.
+
+    Переводится при первом открытии и кэшируется: одновременные нажатия ждут один перевод.
+    """
+    translated = body_translations.get(news_id)
+    if translated is not None:
+        return translated
+    task = _body_translations_inflight.get(news_id)
+    if task is None:
+        task = asyncio.create_task(translate_long_text(text))
+        _body_translations_inflight[news_id] = task
+        task.add_done_callback(lambda _: _body_translations_inflight.pop(news_id, None))
+    try:
+        translated = await asyncio.shield(task)
+    except Exception as e:
+        TRANSLATION_ERRORS.inc()
+        logger.error("Full text translation error for news ID %s: %s", news_id, e)
+        return None
+    body_translations[news_id] = translated
+    return translated
+
+
+async def link_if_duplicate(index: NearDuplicateIndex, news_id: int, fingerprint: bytes) -> bool:
+    """Привязывает новость к похожему представителю из index; если такого нет, сама становится представителем."""
+    representative = index.find(fingerprint)
+    if representative is None:
+        index.add(fingerprint, news_id)
+        return False
+    await link_duplicate(news_id, representative)
+    INGEST_DUPLICATES.inc()
+    logger.info("News ID %s is the same story as News ID %s, not notifying.", news_id, representative)
+    return True
+
+
+async def cluster_approved(news_ids: list) -> list:
+    """Стадия cluster для новостей, одобренных модератором: сверяет их с недавними представителями
+    из базы и между собой. Возвращает id новостей, о которых нужно уведомить подписчиков."""
+    if not news_ids:
+        return []
+    approved = set(news_ids)
+    indexes = {}
+    for news_id, category, fingerprint, published in await get_recent_fingerprints(CLUSTER_WINDOW):
+        if news_id not in approved:
+            indexes.setdefault(category, NearDuplicateIndex()).add(fingerprint, news_id, published)
+    fingerprints = await get_news_fingerprints(news_ids)
+    notify = []
+    for news_id in news_ids:
+        category, fingerprint = fingerprints.get(news_id, (None, None))
+        if not await link_if_duplicate(indexes.setdefault(category, NearDuplicateIndex()), news_id, fingerprint):
+            notify.append(news_id)
+    return notify
+
+
+def remember_guid(source_id: int, guid: str):
+    guids = recent_guids.setdefault(source_id, {})
+    guids[guid] = True
+    if len(guids) > RECENT_GUIDS_PER_SOURCE:
+        del guids[next(iter(guids))]
+
+
+class IngestPipeline:
+    """Сбор новостей как конвейер стадий: fetch → parse → dedup → translate → persist → cluster → fanout.
+
+    Стадии связаны ограниченными asyncio.Queue и у каждой свой пул воркеров, поэтому медленный
+    перевод одной новости не задерживает загрузку остальных лент, а скорость цикла определяется
+    самой медленной стадией, а не суммой задержек.
+    """
+
+    def __init__(self, bot: Bot = None, workers: dict = None, queue_size: int = QUEUE_SIZE,
+                 auto_approve: bool = INGEST_AUTO_APPROVE):
+        self.bot = bot
+        self.auto_approve = auto_approve
+        self.workers = {**STAGE_WORKERS, **(workers or {})}
+        self.queue_size = queue_size
+        self.session: aiohttp.ClientSession = None
+        self.stages = [
+            ("fetch", self.fetch),
+            ("parse", self.parse),
+            ("dedup", self.dedup),
+            ("translate", self.translate),
+            ("persist", self.persist),
+            ("cluster", self.cluster),
+            ("fanout", self.fanout),
+        ]
+        self.published = []
+        # source_id -> {"ok", "new", "hints"}: итог опроса для планировщика;
+        # "newest" и "complete" — для сдвига отметки источника в конце цикла
+        self.results = {}
+        # source_id -> unix-время самой свежей уже обработанной записи
+        self.marks = {}
+        # Подписи недавних новостей по категориям: одна история из разных источников уведомляется один раз.
+        # Между категориями не сравниваем, иначе подписчики второй категории не узнали бы о новости
+        self.duplicates = {}
+        self.duplicates_loaded = False
+
+    async def start(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT))
+        if not self.duplicates_loaded:
+            for news_id, category, fingerprint, published in await get_recent_fingerprints(CLUSTER_WINDOW):
+                self.duplicates.setdefault(category, NearDuplicateIndex()).add(fingerprint, news_id, published)
+            self.duplicates_loaded = True
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def source_failed(self, source: dict, error: str):
+        RSS_FETCH_ERRORS.inc(source_id=source["source_id"])
+        self.results[source["source_id"]]["ok"] = False
+        health = await record_source_failure(
+            source["source_id"], error, BREAKER_BACKOFF_BASE, BREAKER_BACKOFF_MAX, AUTO_DISABLE_FAILURES
+        )
+        if health["disabled"]:
+            logger.warning("Source %s (%s) disabled after %s consecutive failures.",
+                           source["source_id"], source["url"], health["failures"])
+        else:
+            logger.info("Source %s skipped for %ss after %s consecutive failures.",
+                        source["source_id"], health["retry_in"], health["failures"])
+
+    async def read_feed(self, response: aiohttp.ClientResponse, source: dict) -> bytes:
+        """Читает ленту кусками и обрывает загрузку, как только пришли ENTRIES_PER_SOURCE записей
+        или набралось MAX_FEED_BYTES: остальная часть ленты всё равно не будет разобрана."""
+        body = bytearray()
+        entries = 0
+        async for chunk in response.content.iter_chunked(READ_CHUNK):
+            previous = len(body)
+            body += chunk
+            entries += count_entry_ends(body, previous)
+            if entries >= ENTRIES_PER_SOURCE:
+                break
+            if len(body) >= MAX_FEED_BYTES:
+                logger.warning("Feed %s exceeds %s bytes, parsing the first part only.",
+                               source["url"], MAX_FEED_BYTES)
+                del body[MAX_FEED_BYTES:]
+                break
+        return bytes(body)
+
+    async def fetch(self, source: dict) -> list:
+        started = time.perf_counter()
+        try:
+            with RSS_FETCH_SECONDS.time(source_id=source["source_id"]):
+                async with self.session.get(source["url"]) as response:
+                    response.raise_for_status()
+                    body = await self.read_feed(response, source)
+        except Exception as e:
+            logger.error("Error fetching news from %s: %s", source['url'], e)
+            await self.source_failed(source, f"{type(e).__name__}: {e}")
+            return []
+        return [(source, body, time.perf_counter() - started)]
+
+    async def parse(self, item: tuple) -> list:
+        source, body, latency = item
         try:
-            feed = feedparser.parse(source["url"])
-            for entry in feed.entries[:5]:
-                news = {
-                    "category": source["category"],
-                    "title": entry.get("title", "Без заголовка"),
-                    "description": entry.get("description", entry.get("summary", "Без описания")),
-                    "image_url": "",
-                    "writer_id": 0,
-                    "source": source["url"],
-                }
-                news["title"] = await translate_to_russian(news["title"])
-                news["description"] = await translate_to_russian(news["description"])
-                if "enclosures" in entry:
-                    for enc in entry.enclosures:
-                        if enc.get("type", "").startswith("image"):
-                            news["image_url"] = enc.get("href", "")
-                            break
-                elif "media_content" in entry:
-                    for media in entry.media_content:
-                        if media.get("medium", "") == "image":
-                            news["image_url"] = media.get("url", "")
-                            break
-                pending_id = await insert_pending_news(
-                    writer_id=0,
-                    title=news["title"],
-                    description=news["description"],
-                    image_url=news["image_url"],
-                    category=news["category"]
-                )
-                news_id = await approve_news(pending_id)
-                logger.info(f"Fetched and approved RSS news: ID {pending_id} -> News ID {news_id}")
+            seen = frozenset(recent_guids.get(source["source_id"], ()))
+            since = self.marks.get(source["source_id"], 0)
+            hints, entries = await parse_pool.parse(body, ENTRIES_PER_SOURCE, seen, since)
         except Exception as e:
-            logger.error(f"Error fetching news from {source['url']}: {str(e)}")
+            logger.error("Error parsing feed %s: %s", source['url'], e)
+            await self.source_failed(source, f"{type(e).__name__}: {e}")
+            return []
+        await record_source_success(source["source_id"], latency * 1000, len(body))
+        self.results[source["source_id"]]["hints"] = hints
+        return [
+            dict(zip(ENTRY_FIELDS, entry), source_id=source["source_id"], category=source["category"])
+            for entry in entries
+        ]
+
+    def advance_mark(self, entry: dict):
+        result = self.results[entry["source_id"]]
+        if entry["published"] and entry["published"] > (result["newest"] or 0):
+            result["newest"] = entry["published"]
+
+    async def dedup(self, entry: dict) -> list:
+        key = (entry["source_id"], entry["guid"])
+        if seen_entries.get(key):
+            self.advance_mark(entry)
+            return []
+        seen_entries[key] = True
+        self.results[entry["source_id"]]["new"] += 1
+        return [entry]
+
+    async def translate(self, entry: dict) -> list:
+        # Полный текст (body) переводится только когда его открывают — см. translate_body
+        entry["title"], entry["description"] = await asyncio.gather(
+            translate_to_russian(entry["title"]),
+            translate_to_russian(entry["description"])
+        )
+        return [entry]
+
+    async def persist(self, entry: dict) -> list:
+        try:
+            pending_id = await insert_pending_news(
+                writer_id=0,
+                title=entry["title"],
+                description=entry["description"],
+                image_url=entry["image_url"],
+                category=entry["category"],
+                source_id=entry["source_id"],
+                body=entry["body"],
+                fingerprint=entry["fingerprint"],
+                published=entry["published"]
+            )
+            news_id = await approve_news(pending_id) if self.auto_approve else None
+        except Exception:
+            # Не сохранили — пусть запись снова пройдёт дедупликацию в следующем цикле,
+            # а отметка источника не уйдёт дальше неё
+            seen_entries.pop((entry["source_id"], entry["guid"]), None)
+            self.results[entry["source_id"]]["complete"] = False
+            raise
+        remember_guid(entry["source_id"], entry["guid"])
+        self.advance_mark(entry)
+        if news_id is None:
+            logger.info("Queued RSS news for moderation: ID %s", pending_id)
+            return []
+        logger.info("Fetched and approved RSS news: ID %s -> News ID %s", pending_id, news_id)
+        return [(news_id, entry["category"], entry["fingerprint"])]
+
+    async def cluster(self, item: tuple) -> list:
+        """Повтор уже опубликованной истории привязывается к ней и дальше (в уведомления) не идёт."""
+        news_id, category, fingerprint = item
+        if await link_if_duplicate(self.duplicates.setdefault(category, NearDuplicateIndex()), news_id, fingerprint):
+            return []
+        return [news_id]
+
+    async def fanout(self, news_id: int) -> list:
+        # Уведомления отправляются одной рассылкой в конце цикла, сгруппированные по категориям
+        self.published.append(news_id)
+        return []
+
+    async def worker(self, name: str, handler, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        while True:
+            item = await inbox.get()
+            INGEST_QUEUE_DEPTH.set(inbox.qsize(), stage=name)
+            started = time.perf_counter()
+            try:
+                results = await handler(item)
+                INGEST_STAGE_SECONDS.observe(time.perf_counter() - started, stage=name)
+                INGEST_STAGE_ITEMS.inc(stage=name)
+                # Если следующая очередь заполнена, ждём здесь — это и есть обратное давление
+                for result in results:
+                    if outbox is not None:
+                        await outbox.put(result)
+            except Exception as e:
+                INGEST_STAGE_ERRORS.inc(stage=name)
+                logger.error("Ingest stage %s failed: %s", name, e)
+            finally:
+                inbox.task_done()
+
+    async def run_cycle(self, sources: list) -> list:
+        """Прогоняет источники через все стадии и ждёт, пока конвейер опустеет. Возвращает id новостей."""
+        await self.start()
+        self.published = []
+        self.results = {
+            source["source_id"]: {"ok": True, "new": 0, "hints": None, "newest": None, "complete": True}
+            for source in sources
+        }
+        self.marks = await get_high_water_marks()
+        # Источники с открытым автоматом в этот цикл не опрашиваем
+        open_circuits = set(await get_open_circuits())
+        for source_id in open_circuits & set(self.results):
+            self.results[source_id]["ok"] = False
+        sources = [source for source in sources if source["source_id"] not in open_circuits]
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        tasks = []
+        for index, (name, handler) in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            for _ in range(self.workers[name]):
+                tasks.append(asyncio.create_task(self.worker(name, handler, queues[index], outbox)))
+
+        try:
+            for source in sources:
+                await queues[0].put(source)
+            # Стадия кладёт результат в следующую очередь до task_done, поэтому join по порядку
+            # гарантирует, что после последнего join в конвейере ничего не осталось
+            for queue in queues:
+                await queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        await set_high_water_marks({
+            source_id: result["newest"] for source_id, result in self.results.items()
+            if result["newest"] and result["complete"]
+        })
+        if self.bot and self.published:
+            schedule_notification(self.bot, self.published)
+        return self.published
+
+
+async def fetch_news(bot: Bot, pipeline: IngestPipeline = None) -> list:
+    """Один цикл сбора по всем активным источникам."""
+    sources = [source for source in await get_sources() if source["is_active"]]
+    own_pipeline = pipeline is None
+    pipeline = pipeline or IngestPipeline(bot)
+    try:
+        return await pipeline.run_cycle(sources)
+    finally:
+        if own_pipeline:
+            await pipeline.close()
+
 
 async def start_news_fetching(bot: Bot):
-    """Запускает периодический парсинг новостей из RSS-лент каждые 15 минут."""
-    while True:
-        logger.info("Starting news fetching cycle...")
-        await fetch_news(bot)
-        logger.info("News fetching cycle completed. Waiting for next cycle...")
-        await asyncio.sleep(15 * 60)  # Ждём 15 минут перед следующим циклом
\ No newline at end of file
+    """Фоновый сбор новостей: каждую ленту опрашиваем, когда ей подошло время по планировщику."""
+    pipeline = IngestPipeline(bot)
+    scheduler = FeedScheduler(ENTRIES_PER_SOURCE)
+    try:
+        while True:
+            due = []
+            try:
+                scheduler.sync(await get_sources())
+                due = scheduler.pop_due()
+                if due:
+                    logger.info("Polling %s due sources...", len(due))
+                    with INGEST_CYCLE_SECONDS.time():
+                        published = await pipeline.run_cycle(due)
+                    for source_id, result in pipeline.results.items():
+                        scheduler.record(source_id, result["ok"], result["new"], result["hints"])
+                    logger.info("Polled %s sources: %s new items.", len(due), len(published))
+            except Exception as e:
+                logger.error("News fetching cycle failed: %s", e)
+                # Иначе выпавшие из кучи источники больше никогда не будут опрошены
+                for source in due:
+                    scheduler.record(source["source_id"], False)
+            await asyncio.sleep(max(1.0, min(scheduler.seconds_until_next(), SCHEDULER_TICK)))
+    finally:
+        await pipeline.close()
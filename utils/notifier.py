@@ -0,0 +1,73 @@
+import asyncio
+from aiogram import Bot
+from utils.database import get_news_by_ids, get_subscribers
+from utils.logger import get_logger
+from utils.metrics import NOTIFICATIONS_TOTAL, NOTIFICATIONS_PENDING
+
+logger = get_logger(__name__)
+
+# Одновременно отправляемых сообщений (лимит Telegram ~30 сообщений в секунду)
+SEND_CONCURRENCY = 20
+# Сколько заголовков показывать в сводном уведомлении
+DIGEST_SIZE = 10
+
+_background_tasks = set()
+
+
+def format_notification(category: str, news: list) -> str:
+    if len(news) == 1:
+        item = news[0]
+        return (
+            f"📰 Новая новость в категории {category.capitalize()}!\n"
+            f"Заголовок: {item['title']}\n"
+            f"Описание: {item['description']}"
+        )
+    text = f"📰 {len(news)} новых новостей в категории {category.capitalize()}!\n"
+    for item in news[:DIGEST_SIZE]:
+        text += f"• {item['title']}\n"
+    if len(news) > DIGEST_SIZE:
+        text += f"…и ещё {len(news) - DIGEST_SIZE}"
+    return text
+
+
+async def notify_subscribers(bot: Bot, news_ids: list):
+    """Уведомляет подписчиков о новых новостях: одно сообщение на подписчика и категорию."""
+    news = await get_news_by_ids(news_ids)
+    by_category = {}
+    for item in news:
+        by_category.setdefault(item["category"], []).append(item)
+
+    semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    async def send(user_id: int, text: str):
+        async with semaphore:
+            try:
+                await bot.send_message(user_id, text)
+                NOTIFICATIONS_TOTAL.inc(status="sent")
+            except Exception as e:
+                NOTIFICATIONS_TOTAL.inc(status="failed")
+                logger.error("Error notifying subscriber %s: %s", user_id, e)
+            finally:
+                NOTIFICATIONS_PENDING.dec()
+
+    for category, items in by_category.items():
+        subscribers = await get_subscribers(category)
+        text = format_notification(category, items)
+        NOTIFICATIONS_PENDING.inc(len(subscribers))
+        await asyncio.gather(*(send(user_id, text) for user_id in subscribers))
+        logger.info("Notified %s subscribers about %s news in category %s.", len(subscribers), len(items), category)
+
+
+def schedule_notification(bot: Bot, news_ids: list):
+    """Запускает рассылку в фоне, чтобы обработчик не ждал отправки сообщений."""
+    if not news_ids:
+        return
+    task = asyncio.create_task(notify_subscribers(bot, news_ids))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def wait_for_notifications():
+    """Дожидается фоновых рассылок — нужно процессу, который завершается сразу после сбора (ingest --once)."""
+    if _background_tasks:
+        await asyncio.gather(*list(_background_tasks), return_exceptions=True)
@@ -0,0 +1,73 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.feed_parser import parse_entries
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Процессов разбора; по умолчанию по числу ядер
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0")) or os.cpu_count() or 1
+# Крошечная лента, которой прогреваются процессы при старте
+WARMUP_FEED = (
+    b'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>warm-up</title>'
+    b"<item><title>warm-up</title><guid>warm-up</guid><description>warm-up</description></item>"
+    b"</channel></rss>"
+)
+
+
+class ParsePool:
+    """Разбор лент в пуле процессов: XML и очистка текста занимают CPU и не должны
+    делить GIL с обработчиками бота.
+
+    Процессы запускаются через spawn (в процессе бота уже работают потоки, fork с ними небезопасен)
+    и прогреваются в start(), чтобы первый цикл сбора не ждал их запуска. Пока пул не запущен,
+    разбор идёт в потоке.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS):
+        self.workers = workers
+        self.executor: ProcessPoolExecutor = None
+
+    async def start(self):
+        if self.executor is not None:
+            return
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        loop = asyncio.get_running_loop()
+        # Одновременные задачи заставляют пул поднять все процессы сразу
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, parse_entries, WARMUP_FEED, 1)
+            for _ in range(self.workers)
+        ))
+        logger.info("Feed parsing pool started with %s processes.", self.workers)
+
+    async def close(self):
+        if self.executor is None:
+            return
+        executor, self.executor = self.executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        logger.info("Feed parsing pool stopped.")
+
+    async def parse(self, body: bytes, limit: int, seen_guids: frozenset = frozenset(),
+                    since: int = 0) -> tuple[dict, list]:
+        """Подсказки ленты и записи-кортежи (см. feed_parser.ENTRY_FIELDS)."""
+        executor = self.executor
+        if executor is None:
+            return await asyncio.to_thread(parse_entries, body, limit, seen_guids, since)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, parse_entries, body, limit, seen_guids, since
+            )
+        except BrokenProcessPool:
+            # Процесс упал (например, OOM) — пересоздаём пул один раз, текущая лента считается ошибкой
+            if self.executor is executor:
+                logger.error("Feed parsing pool is broken, restarting it.")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+                await self.start()
+            raise
+
+
+parse_pool = ParsePool()
@@ -1,65 +1,164 @@
+import asyncio
+import os
+import random
 import uuid
 import aiohttp
 from aiogram import Bot
-from utils.logger import logger
+from cachetools import TTLCache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Замените на ваш реальный shopId из ЮKassa
 YOOKASSA_SHOP_ID = "1062538"  # Пример тестового shopId, замените на ваш
 YOOKASSA_SECRET_KEY = "test_PHmgyB5z-RvgKcf1jiX0s5uj8Cho1noprxl7SIGdDf0"
+# Адрес API можно переопределить, например чтобы направить запросы на локальную заглушку
+YOOKASSA_API_URL = os.getenv("YOOKASSA_API_URL", "https://api.yookassa.ru/v3")
 
+# Сетевые настройки клиента
+REQUEST_TIMEOUT = 10  # секунд на весь запрос
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5  # секунд, удваивается с каждой попыткой
+MAX_CONNECTIONS = 20
+# Не чаще одного запроса статуса на платёж за этот интервал (секунд)
+STATUS_CACHE_TTL = 5
+# Сколько секунд помнить неудачную проверку: во время сбоя ЮKassa нажатия не запускают новые циклы повторов
+FAILED_CHECK_TTL = 10
+TERMINAL_STATUSES = ["succeeded", "canceled"]
 
-async def create_payment(user_id: int, amount: int, description: str, action_type: str, quantity: int) -> dict:
-    idempotence_key = str(uuid.uuid4())
-    url = "https://api.yookassa.ru/v3/payments"
-    headers = {
-        "Idempotence-Key": idempotence_key,
-        "Content-Type": "application/json",
-    }
-    auth = aiohttp.BasicAuth(YOOKASSA_SHOP_ID, YOOKASSA_SECRET_KEY)
-    payment_data = {
-        "amount": {
-            "value": str(amount),
-            "currency": "RUB"
-        },
-        "confirmation": {
-            "type": "redirect",
-            "return_url": "https://t.me/your_bot_username"  # Замените на ссылку на ваш бот
-        },
-        "capture": True,
-        "description": description,
-        "metadata": {
-            "user_id": str(user_id),
-            "action_type": action_type,
-            "quantity": str(quantity)
+
+class YooKassaClient:
+    """Клиент ЮKassa с одной keep-alive сессией на всё время работы процесса.
+
+    Повторяет запросы при сетевых ошибках, 429 и 5xx с экспоненциальной задержкой и джиттером.
+    Для создания платежа один и тот же Idempotence-Key используется во всех попытках,
+    поэтому повтор не создаёт второй платёж.
+    """
+
+    def __init__(self, shop_id: str, secret_key: str, base_url: str = YOOKASSA_API_URL):
+        self.shop_id = shop_id
+        self.secret_key = secret_key
+        self.base_url = base_url
+        self.session: aiohttp.ClientSession = None
+        # Запросы статуса, выполняющиеся прямо сейчас: payment_id -> Task
+        self.inflight_checks = {}
+        # Недавние нефинальные ответы и финальные статусы, которые уже не изменятся
+        self.recent_statuses = TTLCache(maxsize=10000, ttl=STATUS_CACHE_TTL)
+        self.final_statuses = TTLCache(maxsize=10000, ttl=24 * 60 * 60)
+        # Платежи, статус которых недавно не удалось получить: payment_id -> True
+        self.failed_checks = TTLCache(maxsize=10000, ttl=FAILED_CHECK_TTL)
+
+    async def start(self):
+        if self.session is not None and not self.session.closed:
+            return
+        self.session = aiohttp.ClientSession(
+            auth=aiohttp.BasicAuth(self.shop_id, self.secret_key),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS, keepalive_timeout=60),
+            headers={"Content-Type": "application/json"},
+        )
+        logger.info("YooKassa client session opened.")
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            logger.info("YooKassa client session closed.")
+        self.session = None
+
+    async def request(self, method: str, path: str, json: dict = None, idempotence_key: str = None) -> dict:
+        """Выполняет запрос к API и возвращает JSON ответа или None при ошибке."""
+        if self.session is None or self.session.closed:
+            await self.start()
+        headers = {"Idempotence-Key": idempotence_key} if idempotence_key else None
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with self.session.request(method, url, json=json, headers=headers) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    error_text = await response.text()
+                    if response.status != 429 and response.status < 500:
+                        logger.error("YooKassa %s %s failed with %s: %s", method, path, response.status, error_text)
+                        return None
+                    logger.warning("YooKassa %s %s returned %s (attempt %s)", method, path, response.status, attempt + 1)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning("YooKassa %s %s error (attempt %s): %s", method, path, attempt + 1, e)
+
+            if attempt < MAX_RETRIES:
+                delay = RETRY_BASE_DELAY * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+        logger.error("YooKassa %s %s failed after %s attempts", method, path, MAX_RETRIES + 1)
+        return None
+
+    async def create_payment(self, user_id: int, amount: int, description: str, action_type: str,
+                             quantity: int) -> dict:
+        idempotence_key = str(uuid.uuid4())
+        payment_data = {
+            "amount": {
+                "value": str(amount),
+                "currency": "RUB"
+            },
+            "confirmation": {
+                "type": "redirect",
+                "return_url": "https://t.me/your_bot_username"  # Замените на ссылку на ваш бот
+            },
+            "capture": True,
+            "description": description,
+            "metadata": {
+                "user_id": str(user_id),
+                "action_type": action_type,
+                "quantity": str(quantity)
+            }
         }
-    }
 
-    logger.info(f"Creating payment for user {user_id}: {payment_data}")
-    async with aiohttp.ClientSession(auth=auth) as session:
-        async with session.post(url, json=payment_data, headers=headers) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                logger.error(f"Payment creation failed: {error_text}")
-                return None
-            result = await response.json()
-            logger.info(f"Payment created: {result['id']}")
-            return result
+        logger.info("Creating payment for user %s: %s RUB for %s %s", user_id, amount, quantity, action_type)
+        result = await self.request("POST", "/payments", json=payment_data, idempotence_key=idempotence_key)
+        if result:
+            logger.info("Payment created: %s", result['id'])
+        return result
+
+    async def check_payment(self, payment_id: str) -> dict:
+        """Возвращает статус платежа.
+
+        Одновременные проверки одного платежа объединяются в один запрос, ответ переиспользуется
+        STATUS_CACHE_TTL секунд, а финальные статусы (succeeded/canceled) больше не запрашиваются.
+        Неудачная проверка (None) переиспользуется FAILED_CHECK_TTL секунд.
+        """
+        cached = self.final_statuses.get(payment_id) or self.recent_statuses.get(payment_id)
+        if cached is not None:
+            return cached
+        if payment_id in self.failed_checks:
+            return None
+
+        task = self.inflight_checks.get(payment_id)
+        if task is None:
+            task = asyncio.create_task(self.fetch_payment(payment_id))
+            self.inflight_checks[payment_id] = task
+            task.add_done_callback(lambda _: self.inflight_checks.pop(payment_id, None))
+        return await asyncio.shield(task)
+
+    async def fetch_payment(self, payment_id: str) -> dict:
+        logger.debug("Checking payment %s", payment_id)
+        result = await self.request("GET", f"/payments/{payment_id}")
+        if result:
+            logger.debug("Payment %s status: %s", payment_id, result['status'])
+            if result["status"] in TERMINAL_STATUSES:
+                self.final_statuses[payment_id] = result
+            else:
+                self.recent_statuses[payment_id] = result
+        else:
+            self.failed_checks[payment_id] = True
+        return result
+
+
+payment_client = YooKassaClient(YOOKASSA_SHOP_ID, YOOKASSA_SECRET_KEY)
+
+
+async def create_payment(user_id: int, amount: int, description: str, action_type: str, quantity: int) -> dict:
+    return await payment_client.create_payment(user_id, amount, description, action_type, quantity)
 
 
 async def check_payment(payment_id: str) -> dict:
-    url = f"https://api.yookassa.ru/v3/payments/{payment_id}"
-    headers = {
-        "Content-Type": "application/json",
-    }
-    auth = aiohttp.BasicAuth(YOOKASSA_SHOP_ID, YOOKASSA_SECRET_KEY)
-
-    logger.info(f"Checking payment {payment_id}")
-    async with aiohttp.ClientSession(auth=auth) as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                logger.error(f"Payment check failed: {error_text}")
-                return None
-            result = await response.json()
-            logger.info(f"Payment status: {result['status']}")
-            return result
\ No newline at end of file
+    return await payment_client.check_payment(payment_id)
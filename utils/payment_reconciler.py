@@ -0,0 +1,101 @@
+import asyncio
+from aiogram import Bot
+from utils.database import get_due_payments, schedule_payment_check, set_payment_status, credit_payment, get_payment
+from utils.payment import check_payment, TERMINAL_STATUSES
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+POLL_INTERVAL = 5  # секунд между выборками due-платежей
+BATCH_SIZE = 50
+CHECK_CONCURRENCY = 10
+BACKOFF_BASE = 5  # секунд до первой повторной проверки, удваивается
+BACKOFF_MAX = 600
+# Пауза между полными пачками: разбор длинной очереди не должен занимать цикл событий целиком
+FULL_BATCH_PAUSE = 0.1
+PAYMENT_EXPIRY = 24 * 60 * 60  # после суток без финального статуса платёж считается просроченным
+
+
+def next_check_delay(attempts: int) -> int:
+    return min(BACKOFF_BASE * 2 ** attempts, BACKOFF_MAX)
+
+
+async def apply_payment_status(bot: Bot, payment_id: str, status: str) -> bool:
+    """Применяет статус из ЮKassa к локальной записи. Возвращает True, если лимиты зачислены сейчас."""
+    if status == "succeeded":
+        if await credit_payment(payment_id):
+            payment = await get_payment(payment_id)
+            action_text = "просмотров" if payment["action_type"] == "view_news" else "постов"
+            logger.info("Credited payment %s to user %s.", payment_id, payment['user_id'])
+            if bot:
+                try:
+                    await bot.send_message(
+                        payment["user_id"],
+                        f"🎉 Оплата прошла успешно!\nВы приобрели {payment['quantity']} {action_text} "
+                        f"за {payment['cost']}₽."
+                    )
+                except Exception as e:
+                    logger.error("Error notifying user %s about payment %s: %s", payment['user_id'], payment_id, e)
+            return True
+        return False
+    if status == "canceled":
+        await set_payment_status(payment_id, "canceled")
+        logger.info("Payment %s was canceled.", payment_id)
+    return False
+
+
+async def refresh_payment(payment_id: str) -> str:
+    """Проверка по запросу пользователя: идёт через общий single-flight кэш клиента ЮKassa.
+
+    Отдельное сообщение об оплате не отправляется — об успехе пользователю сообщает сам обработчик.
+    """
+    result = await check_payment(payment_id)
+    if result and result["status"] in TERMINAL_STATUSES:
+        await apply_payment_status(None, payment_id, result["status"])
+    return result["status"] if result else None
+
+
+async def reconcile_payment(bot: Bot, payment: dict):
+    result = await check_payment(payment["payment_id"])
+    if result and result["status"] in TERMINAL_STATUSES:
+        await apply_payment_status(bot, payment["payment_id"], result["status"])
+    elif payment["age"] > PAYMENT_EXPIRY:
+        await set_payment_status(payment["payment_id"], "expired")
+        logger.info("Payment %s expired without a final status.", payment['payment_id'])
+    else:
+        await schedule_payment_check(payment["payment_id"], next_check_delay(payment["attempts"]))
+
+
+async def reconcile_payments(bot: Bot) -> int:
+    """Проверяет одну пачку платежей, которым подошло время проверки. Возвращает размер пачки."""
+    payments = await get_due_payments(BATCH_SIZE)
+    semaphore = asyncio.Semaphore(CHECK_CONCURRENCY)
+
+    async def run(payment: dict):
+        async with semaphore:
+            try:
+                await reconcile_payment(bot, payment)
+            except Exception as e:
+                logger.error("Error reconciling payment %s: %s", payment['payment_id'], e)
+                # Иначе платёж с ошибкой остаётся первым в очереди и мешает остальным на каждом проходе
+                try:
+                    await schedule_payment_check(payment["payment_id"], next_check_delay(payment["attempts"]))
+                except Exception as reschedule_error:
+                    logger.error("Error rescheduling payment %s: %s", payment['payment_id'], reschedule_error)
+
+    await asyncio.gather(*(run(payment) for payment in payments))
+    return len(payments)
+
+
+async def start_payment_reconciler(bot: Bot):
+    """Фоновая сверка ожидающих платежей с ЮKassa."""
+    while True:
+        try:
+            checked = await reconcile_payments(bot)
+            if checked == BATCH_SIZE:
+                # Очередь не разобрана — берём следующую пачку почти сразу
+                await asyncio.sleep(FULL_BATCH_PAUSE)
+                continue
+        except Exception as e:
+            logger.error("Payment reconciliation cycle failed: %s", e)
+        await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,58 @@
+import html
+import os
+import re
+import zlib
+
+# Длина описания, которое хранится в news.description и показывается в карточках и уведомлениях.
+# С заголовком и служебными строками карточка укладывается и в подпись к фото (1024 символа)
+EXCERPT_CHARS = 600
+# Хранить ли полный текст записи (сжатым, в колонке body); показывается только по кнопке
+STORE_FULL_BODY = os.getenv("STORE_FULL_BODY", "1") == "1"
+BODY_COMPRESSION_LEVEL = 6
+
+SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+# Теги, после которых в тексте начинается новая строка
+LINE_BREAK_RE = re.compile(r"<\s*(?:br|/p|/div|/li|/h[1-6]|/tr|/blockquote)\b[^>]*>", re.IGNORECASE)
+TAG_RE = re.compile(r"<[^>]*>")
+IMG_SRC_RE = re.compile(r"<img\b[^>]*?\bsrc\s*=\s*[\"']([^\"']+)[\"']", re.IGNORECASE)
+SPACES_RE = re.compile(r"[^\S\n]+")
+BLANK_LINES_RE = re.compile(r"\s*\n\s*")
+
+
+def html_to_text(raw: str) -> str:
+    """HTML из ленты -> обычный текст: без тегов и сущностей, с одним пробелом между словами."""
+    if not raw:
+        return ""
+    text = SCRIPT_STYLE_RE.sub(" ", raw)
+    text = COMMENT_RE.sub(" ", text)
+    text = LINE_BREAK_RE.sub("\n", text)
+    text = TAG_RE.sub(" ", text)
+    text = html.unescape(text)
+    text = SPACES_RE.sub(" ", text)
+    return BLANK_LINES_RE.sub("\n", text).strip()
+
+
+def make_excerpt(text: str, limit: int = EXCERPT_CHARS) -> str:
+    """Обрезает текст до limit символов по границе слова."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1]
+    space = cut.rfind(" ")
+    if space > limit * 0.6:
+        cut = cut[:space]
+    return cut.rstrip(" ,.;:—-") + "…"
+
+
+def first_image(raw: str) -> str:
+    """Адрес первой картинки <img> в HTML описания — для лент без enclosure/media:content."""
+    match = IMG_SRC_RE.search(raw or "")
+    return match.group(1) if match else ""
+
+
+def compress_body(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), BODY_COMPRESSION_LEVEL)
+
+
+def decompress_body(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")